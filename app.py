@@ -31,31 +31,13 @@ class SearchResult:
 
 # --- Fonctions de simulation du backend ---
 
-from index import Corpus, InvertedIndex
-from typing import Dict
+from index import Corpus, SearchEngine
 
 @st.cache_resource
-def load_corpus() -> Corpus:
+def load_engine() -> SearchEngine:
     import os
-    with open(os.path.join(os.getcwd(), "output", "corpus_initial.xml"), "r", encoding="utf-8") as f:
-        corpus = Corpus.model_validate_xml(
-            f.read(), 
-            tags={"Corpus": "corpus", "documents": "bulletins", "Document": "bulletin", "Image": "image"}
-        )
-    return corpus
-    
-@st.cache_resource
-def load_index() -> Dict[str, InvertedIndex]:
-    import os, pandas
-    index: Dict[str, InvertedIndex] = {}
-    for zone in ["texte", "legendes", "titre"]:
-        index[zone] = InvertedIndex.from_dataframe(pandas.read_csv(os.path.join(os.getcwd(), "output", "index_files", f"index_{zone}_lemmatized.xml"), sep="\t", encoding="utf-8"))
-    return index
-
-@st.cache_resource
-def load_substitutions() -> Dict[str, str]:
-    import pandas, os
-    return pandas.read_csv(os.path.join(os.getcwd(), "output", "lemmatized_replacement.tsv"), sep="\t", encoding="utf-8", index_col=0, header=None).to_dict()[1]
+    # Recherche multi-champs : les termes sont aussi cherchés dans les titres et les légendes des images
+    return SearchEngine.from_folder(os.path.join(os.getcwd(), "output"), index_type="lemmatized", multi_field=True)
 
 def generate_snippets(text: Union[Optional[str],List[str]], queries: Union[str, List[str]], window_chars: int = 70, max_snippets: int = 3) -> List[str]:
     """
@@ -172,7 +154,7 @@ def display_search_result_item(result_item: SearchResult, query: str):
             f"**Date:** {doc.date.strftime('%d %B %Y')}" if doc.date else None,
             f"**Rubrique:** {doc.rubrique}" if doc.rubrique else None,
             f"**Fichier source:** `{doc.fichier}`" if doc.fichier else None,
-            # f"**Pertinence (score):** {result_item.score:.0f}" # Score, affichage optionnel.
+            f"**Pertinence (score BM25):** {result_item.score:.2f}" if result_item.score else None,
         ]
         st.caption(" | ".join(filter(None, meta_info_parts))) # Filtre les éléments vides.
 
@@ -203,15 +185,15 @@ def display_search_result_item(result_item: SearchResult, query: str):
                 st.markdown(doc.contact)
 
 
-def display_search_results_list(results: List[SearchResult], query: str):
-    """Affiche le titre des résultats et la liste des documents trouvés."""
-    count = len(results)
+def display_search_results_list(results: List[SearchResult], query: str, total: Optional[int] = None):
+    """Affiche le titre des résultats et la liste des documents trouvés (la page courante)."""
+    count = total if total is not None else len(results)
     plural_s = 's' if count > 1 else ''
     st.header(f"Résultats pour \"{query}\" ({count} trouvé{plural_s})")
 
     for i, res_item in enumerate(results):
         display_search_result_item(res_item, query)
-        if i < count - 1: # Ajoute un séparateur entre les résultats.
+        if i < len(results) - 1: # Ajoute un séparateur entre les résultats.
             st.divider()
 
 
@@ -226,8 +208,6 @@ st.set_page_config(
 # Permet de conserver les informations entre les interactions de l'utilisateur.
 if "search_query" not in st.session_state:
     st.session_state.search_query = ""  # Stocke la dernière requête effectivement soumise.
-if "search_results" not in st.session_state:
-    st.session_state.search_results = []  # Conserve les résultats de la dernière recherche.
 if "search_performed" not in st.session_state:
     st.session_state.search_performed = False # True si une recherche a été effectuée.
 if "sort_by" not in st.session_state:
@@ -238,46 +218,52 @@ if "current_query_input" not in st.session_state:
 if "build_query" not in st.session_state:
     # Contenu actuel du champ de texte de recherche
     st.session_state.build_query = None
+if "prepared_query" not in st.session_state:
+    # Requête normalisée pour l'index, réutilisée pour charger chaque page de résultats.
+    st.session_state.prepared_query = None
+if "search_total" not in st.session_state:
+    st.session_state.search_total = 0  # Nombre total de documents trouvés, toutes pages confondues.
+if "search_string_results" not in st.session_state:
+    st.session_state.search_string_results = []
+if "page" not in st.session_state:
+    st.session_state.page = 1  # Page de résultats affichée.
+
+PAGE_SIZE = 10  # Nombre de résultats par page.
 
 # --- Chargement des données ---
-CORPUS = load_corpus() # Charge le corpus au démarrage de l'application.
-INDEX = load_index() # Charge l'index au démarrage de l'application.
-SUBSTITUTIONS = load_substitutions() # Charge les substitutions de lemmatisation.
+ENGINE = load_engine() # Charge le corpus, l'index et les substitutions au démarrage de l'application.
 
-# --- Préparation des pipelines de lemmatisation ---
-from typing import Callable
-from index import Query, Corpus, InvertedIndex, spacy_lemmatize, correct_tokens
+from index import Query
 
-STANDARDIZE = lambda x: re.sub(
-    r"[^\w\s]", "",
-    re.sub(r"[-']", " ", x.strip().lower())
-)
-# CORRECT_TOKENIZE_LEMMATIZE: Callable[[List[str]], List[str]] = lambda x: SUBSTITUTIONS.get(STANDARDIZE(x), None) or spacy_lemmatize(STANDARDIZE(x))[0]
-
-lexicon = set(SUBSTITUTIONS.keys())
-def CORRECT_TOKENIZE_LEMMATIZE(x: str) -> str:
-    token = SUBSTITUTIONS.get(STANDARDIZE(x), None)
-    if token:
-        return token
-    tokens = correct_tokens(tokens=[x], lexicon=lexicon)
-    if tokens[0][0]:
-        token = SUBSTITUTIONS.get(tokens[0][0], None)
-        if token:
-            return token
-    return spacy_lemmatize(STANDARDIZE(x))[0]
-
-def APPLY(q: Query, func: callable, fields: List[str]) -> Query:
-    """Apply a function to the tokens in specified fields of a Query object."""
-    for field in fields:
-        setattr(q, field, [func(token) for token in getattr(q, field)] if isinstance(getattr(q, field), list) else func(getattr(q, field)))
-    return q
-
-def recherche_lemma_ia(query: str) -> List[Document]:
+def recherche_lemma_ia(query: str) -> Union[int, List[str]]:
+    """
+    Prépare la requête et renvoie le nombre de documents trouvés,
+    ou directement la liste des rubriques si la requête les demande.
+    Les documents eux-mêmes ne sont chargés que page par page (voir page_de_resultats).
+    """
     q = Query.build(query)
     st.session_state.build_query = copy.deepcopy(q)  # Stocke la requête pour l'affichage des snippets.
-    APPLY(q, CORRECT_TOKENIZE_LEMMATIZE, ["content_terms", "negated_content_terms", "title_terms"])
-    APPLY(q, STANDARDIZE, ["rubric_terms", "negated_rubric_terms"])
-    return q.search(documents={d.document_id: d for d in CORPUS.documents}, index=INDEX)
+    st.session_state.prepared_query = ENGINE.prepare(q)
+    if q.target_info == "rubriques":
+        return ENGINE.search(st.session_state.prepared_query, prepared=True)
+    return ENGINE.hits(st.session_state.prepared_query, prepared=True, limit=0).total
+
+def page_de_resultats(page: int, sort_by: str) -> List[SearchResult]:
+    """
+    Charge une page de résultats, déjà triés et notés (BM25) par le moteur :
+    seuls les documents affichés sont lus, et les snippets ne sont générés que pour eux.
+    """
+    hits = ENGINE.hits(
+        st.session_state.prepared_query, prepared=True,
+        offset=(page - 1) * PAGE_SIZE, limit=PAGE_SIZE,
+        ascending=sort_by == "Date (plus ancien d'abord)",
+        order_by="pertinence" if sort_by == "Pertinence" else "date",
+    )
+    terms = st.session_state.build_query.content_terms or st.session_state.search_query.lower()
+    return [
+        SearchResult(document=hit.document, score=hit.score, snippets=generate_snippets(hit.document.texte, terms))
+        for hit in hits if hit.document
+    ]
 
 # --- Interface principale de l'application ---
 st.title("📚 Moteur de Recherche de Documents LO17")
@@ -298,40 +284,31 @@ if submitted:
     st.session_state.search_query = st.session_state.current_query_input # Met à jour la requête active.
     st.session_state.search_performed = True
 
+    st.session_state.page = 1 # Revient à la première page.
+
     if not st.session_state.search_query: # Si la requête est vide.
-        st.session_state.search_results = []
+        st.session_state.search_total = 0
+        st.session_state.search_string_results = []
         st.toast("Veuillez entrer des termes de recherche.", icon="ℹ️")
     else:
         with st.spinner(f"Recherche de '{st.session_state.search_query}'..."):
-            # 1) Lancement de la recherche brute
+            # 1) Lancement de la recherche (nombre de résultats seulement, les documents sont chargés par page)
             raw_results = recherche_lemma_ia(st.session_state.search_query)
 
             # 2) Si la recherche renvoie une liste de chaînes, on les stocke séparément
-            if raw_results and isinstance(raw_results[0], str):
+            if isinstance(raw_results, list):
                 st.session_state.search_string_results = raw_results
-                st.session_state.search_results = []
+                st.session_state.search_total = 0
             else:
                 st.session_state.search_string_results = []
-                # 3) Sinon on convertit en SearchResult pour l'affichage classique
-                st.session_state.search_results = [
-                    SearchResult(
-                        document=d,
-                        snippets=generate_snippets(
-                            d.texte,
-                            st.session_state.build_query.content_terms
-                            if st.session_state.build_query.content_terms
-                            else st.session_state.search_query.lower(),
-                        ),
-                    )
-                    for d in raw_results
-                ]
+                st.session_state.search_total = raw_results
             # XXX Formerly : search_documents_enhanced(st.session_state.search_query, corpus_data)
 
         # Toast selon le type de résultat
         if st.session_state.search_string_results:
             st.toast(f"{len(st.session_state.search_string_results)} chaîne(s) brute(s) obtenue(s).", icon="ℹ️")
         else:
-            num_results = len(st.session_state.search_results)
+            num_results = st.session_state.search_total
             if num_results > 0:
                 st.toast(
                     f"{num_results} document{'s' if num_results > 1 else ''} trouvé{'s' if num_results > 1 else ''} !",
@@ -348,7 +325,7 @@ if st.session_state.search_performed and st.session_state.search_query:
         for s in st.session_state.search_string_results:
             st.markdown(f"- `{s}`")
     # 2) Sinon affichage normal des documents
-    elif st.session_state.search_results:
+    elif st.session_state.search_total:
         # Options de tri.
         sort_options = ["Pertinence", "Date (plus récent d'abord)", "Date (plus ancien d'abord)"]
         st.radio(
@@ -358,20 +335,14 @@ if st.session_state.search_performed and st.session_state.search_query:
             horizontal=True,
         )
 
-        # Applique le tri sélectionné.
-        results_to_display = list(st.session_state.search_results) # Copie pour trier sans altérer l'ordre par pertinence.
+        # Pagination : seule la page affichée est chargée, déjà triée par le moteur.
+        page_count = (st.session_state.search_total - 1) // PAGE_SIZE + 1
+        st.number_input(f"Page (sur {page_count}) :", min_value=1, max_value=page_count, key="page")
 
-        if st.session_state.sort_by == "Date (plus récent d'abord)":
-            results_to_display.sort(key=lambda sr: sr.document.date if sr.document.date else datetime.min, reverse=True)
-        elif st.session_state.sort_by == "Date (plus ancien d'abord)":
-            results_to_display.sort(key=lambda sr: sr.document.date if sr.document.date else datetime.max, reverse=False)
-        elif st.session_state.sort_by == "Pertinence":
-            # Le tri par pertinence est déjà effectué par search_documents_enhanced.
-            # Si l'utilisateur re-sélectionne "Pertinence", on retri explicitement.
-            results_to_display.sort(key=lambda sr: sr.score, reverse=True)
+        results_to_display = page_de_resultats(st.session_state.page, st.session_state.sort_by)
 
         st.divider() # Séparateur visuel avant la liste des résultats.
-        display_search_results_list(results_to_display, st.session_state.search_query)
+        display_search_results_list(results_to_display, st.session_state.search_query, total=st.session_state.search_total)
 
     else: # Si la recherche a été effectuée mais n'a retourné aucun résultat.
         st.divider()
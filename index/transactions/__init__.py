@@ -6,9 +6,21 @@ and regroup operations that are related to them.
 from .base.xml_base_model import XMLBaseModel
 from .base.inverted_index import InvertedIndex
 from .base.token_metrics import TokenMetrics
-from .scripts.nlp import spacy_lemmas, spacy_lemmatize, snowball_stem, snowball_stems
+from .base.document_term_matrix import DocumentTermMatrix
+from .base.corpus_statistics import CorpusStatistics
+from .base.substitution_table import SubstitutionTable
+from .base.normalization_cache import NormalizationCache
+from .scripts.nlp import spacy_lemmas, spacy_lemma_pairs, spacy_lemmatize, snowball_stem, snowball_stems
 from .scripts.correction import correct_tokens
 
 from .document import Document, Image
 from .corpus import Corpus
+from .analyzer import Analyzer
 from .query import Query
+from .lookup_tables import LookupTables
+from .search_hit import SearchHit, SearchHits
+from .search_engine import SearchEngine
+from .similarity import SimilarityIndex
+from .neighbors import NearestNeighborsIndex
+from .semantic import LatentSemanticIndex
+from .duplicates import DuplicateIndex
@@ -0,0 +1,110 @@
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Self
+import re, os
+
+import pandas
+
+from .document import Document
+from .base.inverted_index import InvertedIndex
+
+
+class Analyzer:
+    """
+    Chaîne d'analyse compilée une seule fois : standardisation -> anti-dictionnaire -> lemmes (ou stems).
+
+    Les tokens sont produits directement depuis le texte d'origine des documents, sans réécrire
+    texte, titre ni légendes (apply_filter, apply_substitutions) ni passer par des copies du corpus :
+    le résultat est le même que ces étapes suivies de Document.tokens et de la table de remplacement.
+    La même chaîne sert à l'indexation et, dans le SearchEngine, à la normalisation des requêtes.
+    """
+    SEPARATOR = re.compile(r"['’-]")  # Apostrophes et tirets : "aujourd’hui", "États-Unis" donnent deux mots
+    PUNCTUATION = re.compile(r"[^\w\s]")
+    WORD = re.compile(r"\w+")
+
+    def __init__(self, stopwords: Iterable[str] = (), replacements: Optional[Mapping[str, str]] = None):
+        """
+        Parameters:
+            stopwords: Les mots de l'anti-dictionnaire, retirés des tokens.
+            replacements: La table "mot: lemme" (ou "mot: stem"). Les mots absents de la table sont gardés tels quels.
+        """
+        self.stopwords = frozenset(word.lower() for word in stopwords)
+        self.replacements: Dict[str, str] = dict(replacements or {})
+
+    @classmethod
+    def from_files(cls, anti_dict_file: Optional[str] = None, replacements_file: Optional[str] = None) -> Self:
+        """
+        Charge la chaîne depuis les fichiers produits par processing.ipynb (anti_dictionnaire.txt, *_replacement.tsv).
+        Un fichier absent (ou None) laisse l'étape correspondante vide.
+        """
+        stopwords, replacements = [], {}
+        if anti_dict_file is not None and os.path.exists(anti_dict_file):
+            stopwords = pandas.read_csv(anti_dict_file, sep="\t", header=None, na_filter=False)[0].astype(str).tolist()
+        if replacements_file is not None and os.path.exists(replacements_file):
+            replacements = pandas.read_csv(
+                replacements_file, sep="\t", encoding="utf-8", index_col=0, header=None, na_filter=False
+            ).to_dict()[1]
+        return cls(stopwords=stopwords, replacements=replacements)
+
+    @classmethod
+    def standardize(cls, text: str) -> str:
+        """
+        Met le texte en minuscules, remplace les apostrophes et les tirets par des espaces et retire la ponctuation
+        (la fonction STANDARDIZE de processing.ipynb).
+        """
+        return cls.PUNCTUATION.sub("", cls.SEPARATOR.sub(" ", text.strip().lower()))
+
+    def tokens(self, text: str) -> Iterator[str]:
+        """
+        Les tokens d'index du texte, dans l'ordre, produits au fil de la lecture.
+        """
+        stopwords, replacements = self.stopwords, self.replacements
+        for match in self.WORD.finditer(self.standardize(text)):
+            word = match.group(0)
+            if word not in stopwords:
+                yield replacements.get(word) or word
+
+    __call__ = tokens
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """
+        Le nombre d'occurrences de chaque token d'index du texte.
+        """
+        counts: Dict[str, int] = {}
+        for token in self.tokens(text):
+            counts[token] = counts.get(token, 0) + 1
+        return counts
+
+    def document_tokens(self, document: Document, zones: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Les tokens d'index de chaque zone du document (même format que Document.tokens).
+
+        Parameters:
+            document: Le document, dans son texte d'origine.
+            zones: Les zones à analyser. Si None, toutes les zones.
+        """
+        return {
+            zone: self.counts(content) for zone, content in document.read_zones.items()
+            if zones is None or zone in zones
+        }
+
+    def inverted_index(self, documents: Iterable[Document], zones: Optional[List[str]] = None) -> InvertedIndex:
+        """
+        Construit l'index inversé des documents en un seul passage sur leur texte d'origine.
+        Comme dans Corpus.inverted_token_index, un document apparaît une fois par zone qui contient le token.
+
+        Parameters:
+            documents: Les documents (par exemple Corpus.documents).
+            zones: Les zones indexées. Si None, toutes les zones.
+        """
+        index = InvertedIndex()
+        for document in documents:
+            for tokens in self.document_tokens(document, zones).values():
+                for token in tokens:
+                    index.setdefault(token, []).append(document.document_id)
+        return index
+
+    def term(self, term: str) -> Optional[str]:
+        """
+        Le token d'index d'un terme de requête, analysé par la même chaîne que les documents
+        (None si le terme est vide ou dans l'anti-dictionnaire).
+        """
+        return next(self.tokens(term), None)
@@ -2,6 +2,8 @@
 from typing import (
     List,
     Dict,
+    Iterable,
+    Optional,
 )
 from abc import abstractmethod, ABC
 from .base_document import BaseDocument
@@ -18,4 +20,15 @@ class BaseCorpus(ABC):
         """
         for doc in self.documents:
             doc.clear_cache()
-    
\ No newline at end of file
+    
+    def clear_documents_cache(self, documents: Iterable[BaseDocument], fields: Optional[Iterable[str]] = None):
+        """
+        Clear the cached properties of the given documents only (e.g. the documents modified by a filter).
+        
+        Parameters:
+            documents: The modified documents.
+            fields: The fields that changed (see BaseDocument.clear_cache). If None, all of them.
+        """
+        fields = list(fields) if fields is not None else None
+        for doc in documents:
+            doc.clear_cache(fields)
@@ -1,22 +1,69 @@
 from functools import cached_property
-from typing import Any, Dict, Tuple, Callable
+from typing import Any, Dict, Tuple, Callable, Iterable, Optional, Set
 from abc import abstractmethod, ABC
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 import re
 
+from .document_list import DocumentList
+
 class BaseDocument(BaseModel, ABC):
     """
     Represents a document that belongs in a corpus.
     Provide metadata about that document.
     """
-    def clear_cache(self):
+    _zone_tokens: Dict[str, Dict[str, int]] = PrivateAttr(default_factory=dict)  # zone: tokens of the last computation
+    _dirty_zones: Set[str] = PrivateAttr(default_factory=set)  # zones to re-tokenize
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self.clear_cache([name])
+    
+    def clear_cache(self, fields: Optional[Iterable[str]] = None):
         """
-        Reset all the cached properties of the document.
+        Reset the cached properties of the document.
+        
+        Parameters:
+            fields: The fields that changed. Only the zones that depend on them (see zone_fields) will be
+                re-tokenized, the other zones keep their tokens. If None, everything is reset.
         """
-        for attr in ("tokens", "document_id", "read_zones"):
-            if hasattr(self, attr):
-                delattr(self, attr)
+        if fields is None:
+            self.__dict__.pop("document_id", None)
+            DocumentList.id_changed(self)
+            self._zone_tokens = {}
+        else:
+            fields = set(fields)
+            if fields & self.id_fields:
+                self.__dict__.pop("document_id", None)
+                DocumentList.id_changed(self)
+            self._dirty_zones = self._dirty_zones | {zone for zone, zone_fields in self.zone_fields.items() if zone_fields & fields}
+        for attr in ("tokens", "read_zones"):
+            self.__dict__.pop(attr, None)
+    
+    @property
+    def zone_fields(self) -> Dict[str, Set[str]]:
+        """
+        The fields each zone is read from. By default, every zone depends on every field.
+        """
+        return {zone: set(type(self).model_fields) for zone in self.zones}
+    
+    @property
+    def id_fields(self) -> Set[str]:
+        """
+        The fields the document id is computed from. By default, every field.
+        """
+        return set(type(self).model_fields)
+    
+    def _cached_zone_tokens(self, zone: str) -> Optional[Dict[str, int]]:
+        """
+        The tokens of the zone from the last computation, if the zone did not change since.
+        """
+        return self._zone_tokens.get(zone) if zone not in self._dirty_zones else None
+    
+    def _set_zone_tokens(self, tokens: Dict[str, Dict[str, int]]):
+        self._zone_tokens = tokens
+        self._dirty_zones = set()
     
     @cached_property
     @abstractmethod
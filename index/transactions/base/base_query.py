@@ -1,9 +1,10 @@
 
-from typing import Self, Dict, List
+from typing import Self, Dict, List, Union
 from abc import ABC, abstractmethod
 import pydantic
 
 from ..base.base_document import BaseDocument
+from ..base.base_corpus import BaseCorpus
 from ..base.inverted_index import InvertedIndex
 
 
@@ -27,12 +28,13 @@ class BaseQuery(pydantic.BaseModel, ABC):
         pass
     
     @abstractmethod
-    def search(self, documents: Dict[str, BaseDocument], index: Dict[str, InvertedIndex]) -> List[BaseDocument]:
+    def search(self, documents: Union[Dict[str, BaseDocument], BaseCorpus], index: Dict[str, InvertedIndex]) -> List[BaseDocument]:
         """
         Cherche des documents à partir de la requête.
         
         Parameters:
-            documents (Dict[str, BaseDocument]): Un dictionnaire de documents à chercher, indexé par leur identifiant unique.
+            documents (Dict[str, BaseDocument], BaseCorpus): Un dictionnaire de documents à chercher, indexé par leur identifiant unique,
+                ou un corpus qui fournit le même accès par identifiant (get, keys).
             index (Dict[str, InvertedIndex]): Un index inversé "zone: index" pour la recherche.
         
         Returns:
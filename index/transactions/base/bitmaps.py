@@ -0,0 +1,43 @@
+"""
+Ensembles de documents représentés par des bitmaps (entiers Python) :
+le bit n est à 1 si le document de numéro n appartient à l'ensemble.
+
+Les opérations ensemblistes se font alors en C sur des mots machine :
+intersection (a & b), union (a | b), différence (a & ~b), cardinal (a.bit_count()).
+"""
+
+from typing import Iterable
+
+import numpy
+
+
+def from_positions(positions: Iterable[int]) -> int:
+    """
+    Construit le bitmap des numéros de documents fournis.
+    """
+    positions = numpy.fromiter(positions, dtype=numpy.int64)
+    if not len(positions):
+        return 0
+    bits = numpy.zeros(int(positions.max()) + 1, dtype=numpy.uint8)
+    bits[positions] = 1
+    return int.from_bytes(numpy.packbits(bits, bitorder="little").tobytes(), "little")
+
+
+def to_positions(bitmap: int, reverse: bool = False) -> numpy.ndarray:
+    """
+    Liste les numéros de documents d'un bitmap, par ordre croissant (ou décroissant si reverse).
+    """
+    if not bitmap:
+        return numpy.empty(0, dtype=numpy.int64)
+    data = numpy.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"), dtype=numpy.uint8)
+    positions = numpy.flatnonzero(numpy.unpackbits(data, bitorder="little"))
+    return positions[::-1] if reverse else positions
+
+
+def range_mask(lo: int, hi: int) -> int:
+    """
+    Bitmap des numéros de documents de lo (inclus) à hi (exclu).
+    """
+    if hi <= lo:
+        return 0
+    return ((1 << (hi - lo)) - 1) << lo
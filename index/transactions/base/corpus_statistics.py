@@ -0,0 +1,77 @@
+from typing import List, Mapping
+
+import numpy, pandas
+
+from .document_term_matrix import DocumentTermMatrix
+
+
+class CorpusStatistics:
+    """
+    The statistics of a corpus computed once from its token counts:
+    number of documents (N), document frequency (DF), inverse document frequency (IDF),
+    collection frequency and document lengths.
+
+    TF-IDF, the irrelevant terms and the anti-dictionary are all derived from them
+    (see TokenMetrics.statistics), instead of each recomputing the DF table.
+    """
+
+    def __init__(self, counts: Mapping[str, Mapping[str, int]]):
+        """
+        Parameters:
+            counts: A mapping of document ids to a dictionary of tokens and their counts.
+        """
+        self.matrix = DocumentTermMatrix.from_counts(counts)
+        self.n_documents: int = len(self.matrix.document_ids)
+        self.document_frequencies: numpy.ndarray = self.matrix.document_frequencies()
+        self.inverse_document_frequencies: numpy.ndarray = self.matrix.inverse_document_frequencies(self.document_frequencies)
+        self.collection_frequencies: numpy.ndarray = self.matrix.collection_frequencies()
+        self.document_lengths: numpy.ndarray = self.matrix.document_lengths()
+
+    @property
+    def vocabulary(self) -> List[str]:
+        return self.matrix.vocabulary
+
+    def df(self, token: str) -> int:
+        """
+        Number of documents the token appears in (0 if unknown).
+        """
+        column = self.matrix.vocabulary_index.get(token)
+        return int(self.document_frequencies[column]) if column is not None else 0
+
+    def idf(self, token: str) -> float:
+        """
+        IDF of the token: log10(N / df) if 0 < df < N, else 0.0.
+        """
+        column = self.matrix.vocabulary_index.get(token)
+        return float(self.inverse_document_frequencies[column]) if column is not None else 0.0
+
+    @property
+    def tfidf(self) -> pandas.DataFrame:
+        """
+        TF-IDF = tf * idf for each term in each document.
+
+        Returns:
+            A DataFrame with columns ["document_id", "mot", "tf_idf"].
+        """
+        return self.matrix.scale_columns(self.inverse_document_frequencies).to_frame("tf_idf")
+
+    def irrelevant_terms(self, idf_threshold: float = 0.1) -> pandas.Series:
+        """
+        The terms whose idf <= threshold, in vocabulary order.
+        """
+        vocabulary = pandas.Series(self.matrix.vocabulary, dtype=object, name="mot")
+        return vocabulary[self.inverse_document_frequencies <= idf_threshold]
+
+    def to_frame(self) -> pandas.DataFrame:
+        """
+        A DataFrame view of the per-term statistics.
+
+        Returns:
+            A DataFrame with columns ["mot", "df", "idf", "cf"].
+        """
+        return pandas.DataFrame({
+            "mot": self.matrix.vocabulary,
+            "df": self.document_frequencies,
+            "idf": self.inverse_document_frequencies,
+            "cf": self.collection_frequencies,
+        }, columns=["mot", "df", "idf", "cf"])
@@ -0,0 +1,101 @@
+from typing import Any, ClassVar, Dict, Iterable, List, SupportsIndex
+import weakref
+
+
+class DocumentList(list):  # List[BaseDocument]
+    """
+    The list of the documents of a corpus, with a version number incremented by every change of the list
+    (documents added, removed, replaced or moved) and by every change of the id of one of its documents.
+    The tables derived from the list (e.g. the id -> position table of a Corpus) compare the version
+    instead of scanning the documents.
+    """
+    version: int = 0  # Class default: set before the items of an unpickled list are appended
+
+    # id(document): weak references to the lists that contain the document (see id_changed)
+    _containers: ClassVar[Dict[int, List[weakref.ref]]] = {}
+
+    def __init__(self, documents: Iterable[Any] = ()):
+        super().__init__(documents)
+        self._watch(self)
+
+    def _watch(self, documents: Iterable[Any]) -> None:
+        """
+        Registers the list as a container of the documents, so that their id changes bump its version.
+        """
+        for document in documents:
+            key = id(document)
+            containers = self._containers.get(key)
+            if containers is None:
+                containers = self._containers[key] = []
+                weakref.finalize(document, self._containers.pop, key, None)
+            if not any(container() is self for container in containers):
+                containers[:] = [container for container in containers if container() is not None]
+                containers.append(weakref.ref(self))
+
+    def _changed(self, documents: Iterable[Any] = ()) -> None:
+        self.version += 1
+        self._watch(documents)
+
+    @classmethod
+    def id_changed(cls, document: Any) -> None:
+        """
+        Bumps the version of the lists that contain the document, whose id may have changed.
+        """
+        for container in cls._containers.get(id(document), ()):
+            documents = container()
+            if documents is not None:
+                documents.version += 1
+
+    def __setitem__(self, key, value):
+        value = list(value) if isinstance(key, slice) else value
+        super().__setitem__(key, value)
+        self._changed(value if isinstance(key, slice) else [value])
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def __iadd__(self, documents):
+        documents = list(documents)
+        super().__iadd__(documents)
+        self._changed(documents)
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self._changed()
+        return self
+
+    def append(self, document):
+        super().append(document)
+        self._changed([document])
+
+    def extend(self, documents):
+        documents = list(documents)
+        super().extend(documents)
+        self._changed(documents)
+
+    def insert(self, index: SupportsIndex, document):
+        super().insert(index, document)
+        self._changed([document])
+
+    def pop(self, index: SupportsIndex = -1):
+        document = super().pop(index)
+        self._changed()
+        return document
+
+    def remove(self, document):
+        super().remove(document)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
@@ -0,0 +1,147 @@
+from typing import Dict, List, Mapping, Optional, Self
+
+import numpy, pandas
+
+
+class DocumentTermMatrix:
+    """
+    A sparse document-term matrix in CSR (compressed sparse row) format, built with numpy only.
+    Row i holds the token counts of document_ids[i], column j is the token vocabulary[j].
+
+    The non-zero values of row i are data[indptr[i]:indptr[i+1]],
+    and their column indices are indices[indptr[i]:indptr[i+1]].
+    """
+
+    def __init__(
+        self,
+        document_ids: List[str],
+        vocabulary: List[str],
+        data: numpy.ndarray,
+        indices: numpy.ndarray,
+        indptr: numpy.ndarray,
+        vocabulary_index: Optional[Dict[str, int]] = None,
+    ):
+        self.document_ids = document_ids
+        self.vocabulary = vocabulary
+        self.vocabulary_index: Dict[str, int] = (
+            vocabulary_index if vocabulary_index is not None
+            else {token: column for column, token in enumerate(vocabulary)}
+        )
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+
+    @classmethod
+    def from_counts(cls, counts: Mapping[str, Mapping[str, int]]) -> Self:
+        """
+        Builds the matrix from a mapping of document ids to a dictionary of tokens and their counts.
+        Within a row, tokens keep the order of the document's dictionary.
+        """
+        document_ids = list(counts.keys())
+        vocabulary = sorted({token for tokens in counts.values() for token in tokens})
+        vocabulary_index = {token: column for column, token in enumerate(vocabulary)}
+
+        lengths = numpy.fromiter((len(tokens) for tokens in counts.values()), dtype=numpy.int64, count=len(document_ids))
+        indptr = numpy.zeros(len(document_ids) + 1, dtype=numpy.int64)
+        numpy.cumsum(lengths, out=indptr[1:])
+        nnz = int(indptr[-1])
+        indices = numpy.fromiter(
+            (vocabulary_index[token] for tokens in counts.values() for token in tokens), dtype=numpy.int64, count=nnz
+        )
+        data = numpy.fromiter(
+            (count for tokens in counts.values() for count in tokens.values()), dtype=numpy.int64, count=nnz
+        )
+        return cls(document_ids, vocabulary, data, indices, indptr, vocabulary_index)
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.document_ids), len(self.vocabulary))
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored (non-zero) values."""
+        return len(self.data)
+
+    @property
+    def rows(self) -> numpy.ndarray:
+        """Row index of each stored value."""
+        return numpy.repeat(numpy.arange(len(self.document_ids)), numpy.diff(self.indptr))
+
+    def document_frequencies(self) -> numpy.ndarray:
+        """Number of documents each token appears in (DF), by column."""
+        return numpy.bincount(self.indices, minlength=len(self.vocabulary))
+
+    def collection_frequencies(self) -> numpy.ndarray:
+        """Total number of occurrences of each token in the corpus, by column."""
+        return numpy.bincount(self.indices, weights=self.data, minlength=len(self.vocabulary))
+
+    def document_lengths(self) -> numpy.ndarray:
+        """Total number of tokens in each document, by row."""
+        return numpy.bincount(self.rows, weights=self.data, minlength=len(self.document_ids))
+
+    def inverse_document_frequencies(self, document_frequencies: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """
+        IDF of each token, by column: idf = log10(N / df) if 0 < df < N, else 0.0.
+
+        Parameters:
+            document_frequencies: The DF of each token, if already computed.
+        """
+        n = len(self.document_ids)
+        df = document_frequencies if document_frequencies is not None else self.document_frequencies()
+        idf = numpy.zeros(len(self.vocabulary), dtype=numpy.float64)
+        informative = (df > 0) & (df < n)
+        idf[informative] = numpy.log10(n / df[informative])
+        return idf
+
+    def scale_columns(self, factors: numpy.ndarray) -> Self:
+        """
+        Returns a new matrix whose column j is multiplied by factors[j] (e.g. TF * IDF).
+        """
+        return type(self)(
+            self.document_ids, self.vocabulary, self.data * factors[self.indices], self.indices, self.indptr, self.vocabulary_index
+        )
+
+    def dot(self, dense: numpy.ndarray) -> numpy.ndarray:
+        """
+        Matrix product M @ dense, for a dense array of shape (n_terms, k).
+
+        Returns:
+            A dense array of shape (n_documents, k).
+        """
+        return self._sum_by(self.data[:, None] * dense[self.indices], self.indptr)
+
+    def transpose_dot(self, dense: numpy.ndarray) -> numpy.ndarray:
+        """
+        Matrix product M.T @ dense, for a dense array of shape (n_documents, k).
+
+        Returns:
+            A dense array of shape (n_terms, k).
+        """
+        order = numpy.argsort(self.indices, kind="stable")
+        column_ptr = numpy.zeros(len(self.vocabulary) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(self.indices, minlength=len(self.vocabulary)), out=column_ptr[1:])
+        return self._sum_by(self.data[order, None] * dense[self.rows[order]], column_ptr)
+
+    @staticmethod
+    def _sum_by(products: numpy.ndarray, pointers: numpy.ndarray) -> numpy.ndarray:
+        """Sums the consecutive slices products[pointers[i]:pointers[i+1]] (empty slices sum to 0)."""
+        result = numpy.zeros((len(pointers) - 1, products.shape[1]), dtype=products.dtype)
+        non_empty = numpy.flatnonzero(numpy.diff(pointers))
+        if len(non_empty):
+            result[non_empty] = numpy.add.reduceat(products, pointers[non_empty], axis=0)
+        return result
+
+    def to_frame(self, value_name: str) -> pandas.DataFrame:
+        """
+        A long DataFrame view of the stored values, one row per (document, token) pair.
+
+        Returns:
+            A DataFrame with columns ["document_id", "mot", value_name].
+        """
+        document_ids = numpy.asarray(self.document_ids, dtype=object)
+        vocabulary = numpy.asarray(self.vocabulary, dtype=object)
+        return pandas.DataFrame({
+            "document_id": document_ids[self.rows] if self.nnz else [],
+            "mot": vocabulary[self.indices] if self.nnz else [],
+            value_name: self.data,
+        }, columns=["document_id", "mot", value_name])
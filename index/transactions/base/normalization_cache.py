@@ -0,0 +1,167 @@
+from typing import Callable, Dict, Iterable, List, Optional, Self, Tuple
+import atexit, csv, os, tempfile, threading, weakref
+
+
+class NormalizationCache:
+    """
+    A persistent word -> normalized form cache (lemmas or stems), shared by every process that uses the same file.
+
+    - Reads go through the table loaded in memory, which is read again when another process has replaced
+      the file, so words normalized elsewhere are not recomputed.
+    - Missing words are normalized once (spaCy, Snowball...) and written behind: new entries are buffered and
+      saved every flush_every entries, by merging them with the current file into a temporary file that atomically replaces it
+      (os.replace). Readers never see a partial file. Two processes that save at the same time may drop the other's
+      last batch, which is then only computed again.
+
+    The file has the format of the *_replacement.tsv tables (word<TAB>normalized form, without header).
+    The cache can be used as the fallback of a SearchEngine: calling it returns the normalized form as a token list.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        normalize: Callable[[str], List[str]],
+        flush_every: int = 100,
+    ):
+        """
+        Parameters:
+            path: The cache file (created on the first save).
+            normalize: The normalization of a word, returning its tokens (e.g. spacy_lemmatize, snowball_stem).
+                The first token is kept, or the word itself if there is none.
+            flush_every: The number of new entries buffered before they are saved. Buffered entries are also saved
+                at exit, but are lost if the process is killed: a long-running server should save them one by one (1).
+        """
+        self.path = path
+        self.normalize = normalize
+        self.flush_every = flush_every
+        self._stored: Dict[str, str] = {}
+        self._pending: Dict[str, str] = {}
+        self._version: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+        # Buffered entries are saved when the process exits; the hook does not keep the cache alive
+        atexit.register(self._flush_at_exit, weakref.ref(self))
+
+    @staticmethod
+    def _flush_at_exit(reference: "weakref.ref[NormalizationCache]") -> None:
+        cache = reference()
+        if cache is not None:
+            cache.flush()
+
+    def _file_version(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, str]:
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            return {row[0]: row[1] for row in csv.reader(file, delimiter="\t") if len(row) >= 2}
+
+    def _refresh(self) -> None:
+        """
+        Reads the file again if it has changed since it was last read.
+        """
+        version = self._file_version()
+        if version != self._version:
+            self._stored = self._read(self.path) if version is not None else {}
+            self._version = version
+
+    def get(self, word: str) -> str:
+        """
+        The normalized form of the word, computed only if no process has cached it yet.
+        """
+        with self._lock:
+            value = self._pending.get(word)
+            if value is None:
+                self._refresh()
+                value = self._stored.get(word)
+            if value is None:
+                tokens = self.normalize(word)
+                value = tokens[0] if tokens else word
+                self._pending[word] = value
+                if len(self._pending) >= self.flush_every:
+                    self.flush()
+            return value
+
+    __getitem__ = get
+
+    def __call__(self, text: str) -> List[str]:
+        return [self.get(text)]
+
+    def __contains__(self, word: str) -> bool:
+        with self._lock:
+            if word in self._pending:
+                return True
+            self._refresh()
+            return word in self._stored
+
+    def get_many(
+        self,
+        words: Iterable[str],
+        normalize_many: Optional[Callable[[List[str]], Iterable[Tuple[str, str]]]] = None,
+    ) -> Dict[str, str]:
+        """
+        The normalized forms of several words. The words that no process has cached yet are normalized
+        together and saved at once.
+
+        Parameters:
+            words: The words (duplicates are looked up once).
+            normalize_many: Normalizes a list of words into (word, normalized form) pairs, e.g. spacy_lemma_pairs
+                (batched, multi-process). Words missing from its output are kept as is. If None, normalize is
+                called on each word.
+
+        Returns:
+            The "word: normalized form" mapping, in the order of the words.
+        """
+        with self._lock:
+            words = list(dict.fromkeys(words))
+            self._refresh()
+            missing = [word for word in words if word not in self._pending and word not in self._stored]
+            if missing:
+                if normalize_many is not None:
+                    computed = dict(normalize_many(missing))
+                    self._pending.update((word, computed.get(word, word)) for word in missing)
+                else:
+                    for word in missing:
+                        tokens = self.normalize(word)
+                        self._pending[word] = tokens[0] if tokens else word
+                self.flush()
+            return {word: self._pending[word] if word in self._pending else self._stored[word] for word in words}
+
+    def update(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """
+        Adds already normalized words (e.g. the output of spacy_lemma_pairs) and saves them.
+        """
+        with self._lock:
+            self._pending.update(pairs)
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Saves the buffered entries: the file is merged with them and atomically replaced.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            folder = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(folder, exist_ok=True)
+            self._refresh()
+            self._stored.update(self._pending)
+            descriptor, temporary = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8", newline="") as file:
+                    csv.writer(file, delimiter="\t", lineterminator="\n").writerows(sorted(self._stored.items()))
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+            self._version = self._file_version()
+            self._pending.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Mapping, Optional, Self, Tuple
+import re
+
+import pandas
+
+
+class SubstitutionTable:
+    """
+    A word substitution table compiled once and applied in a single pass over the words of a text.
+
+    The words of the text are the \\w+ sequences (the \\b...\\b boundaries of a regex alternation).
+    Each word is looked up in a trie of lowercased words: a word that does not start any key costs one
+    hash lookup, and multi-word keys ("etats unis") are followed word by word. A key is only replaced if
+    its whole text matches, punctuation included ("l'" in "l'école"), with the \\b boundaries of the regex.
+    At each position the longest matching key is replaced (the regex alternation kept the first listed
+    one), and the text around the keys is kept as is.
+    """
+    WORD = re.compile(r"\w+")
+    _KEY = None  # Trie node entry holding the key that ends at this node
+
+    def __init__(self, mapping: Mapping[str, str]):
+        """
+        Parameters:
+            mapping: The words (or phrases) to replace and their replacements. Keys are matched case-insensitively.
+        """
+        self.mapping: Dict[str, str] = {word.lower(): replacement for word, replacement in mapping.items()}
+        self.trie: Dict[Any, Any] = {}
+        for key in self.mapping:
+            words = list(self.WORD.finditer(key))
+            if not words:
+                continue
+            node = self.trie
+            for word in words:
+                node = node.setdefault(word.group(0), {})
+            # Keys with the same words ("l", "l'") share the node, and are told apart by their punctuation
+            leading, trailing = words[0].start(), len(key) - words[-1].end()
+            node.setdefault(self._KEY, []).append((leading, trailing, key))
+
+    @classmethod
+    def from_dataframe(cls, substitutions: pandas.DataFrame) -> Self:
+        """
+        Builds the table from a DataFrame whose first column holds the words and the second their replacements.
+        """
+        return cls({word: replacement for word, replacement in substitutions.itertuples(index=False)})
+
+    def __len__(self) -> int:
+        return len(self.mapping)
+
+    def _is_word(self, text: str, position: int) -> bool:
+        return 0 <= position < len(text) and self.WORD.match(text[position]) is not None
+
+    def _longest_match(self, text: str, words: List[re.Match], lowered: List[str], start: int) -> Optional[Tuple[int, int, int, str]]:
+        """
+        The span (first and last character), the last word and the replacement of the longest key
+        starting at words[start], if any.
+        """
+        match, node, end = None, self.trie.get(lowered[start]), start
+        while node is not None:
+            for leading, trailing, key in node.get(self._KEY, ()):
+                begin, finish = words[start].start() - leading, words[end].end() + trailing
+                # The key also fixes the text between and around its words (as the regex alternation did)
+                if begin < 0 or text[begin:finish].lower() != key:
+                    continue
+                # \b before a leading or after a trailing punctuation: the key must touch a word
+                if (leading and not self._is_word(text, begin - 1)) or (trailing and not self._is_word(text, finish)):
+                    continue
+                if match is None or finish - begin > match[1] - match[0]:
+                    match = (begin, finish, end, self.mapping[key])
+            end += 1
+            if end == len(words):
+                break
+            node = node.get(lowered[end])
+        return match
+
+    def apply(self, text: str) -> str:
+        """
+        Replaces the keys of the table found in the text.
+
+        Parameters:
+            text: The text to process.
+
+        Returns:
+            The text with the substitutions applied.
+        """
+        words = list(self.WORD.finditer(text))
+        lowered = [word.group(0).lower() for word in words]
+        pieces, position, start = [], 0, 0
+        while start < len(words):
+            match = self._longest_match(text, words, lowered, start) if lowered[start] in self.trie else None
+            if match is None:
+                start += 1
+                continue
+            begin, finish, end, replacement = match
+            if begin < position:  # The leading punctuation belongs to the previous replacement
+                start += 1
+                continue
+            pieces.append(text[position:begin])
+            pieces.append(replacement)
+            position = finish
+            start = end + 1
+        if not pieces:
+            return text
+        pieces.append(text[position:])
+        return "".join(pieces)
+
+    __call__ = apply
@@ -1,14 +1,134 @@
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-import math, pandas
+import pandas
+
+from .document_term_matrix import DocumentTermMatrix
+from .corpus_statistics import CorpusStatistics
+
+
+class TokenCounts(dict):  # Dict[str, int]  : {token: count}
+    """
+    The token counts of one document of a TokenMetrics.
+    Modifying them in place (e.g. metrics["a.htm"]["chat"] += 1) discards the cached statistics of the metrics.
+    """
+
+    def __init__(self, metrics: "TokenMetrics", counts=()):
+        super().__init__(counts)
+        self._metrics = metrics
+
+    def __reduce__(self):
+        # The counts are restored with their metrics (pickle, deepcopy), not item by item before it is set
+        return TokenCounts, (self._metrics, dict(self))
+
+    def __setitem__(self, key, value):
+        self._metrics.invalidate()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._metrics.invalidate()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._metrics.invalidate()
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs):
+        self._metrics.invalidate()
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._metrics.invalidate()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._metrics.invalidate()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._metrics.invalidate()
+        return super().popitem()
+
+    def clear(self):
+        self._metrics.invalidate()
+        super().clear()
 
 
 class TokenMetrics(dict):  # Dict[str, Dict[str, int]]  : { document_id: {token: count} }
     """
     A mapping of document ids to a dictionary of tokens and their counts.
     This class is used to compute term frequencies (TF) and TF-IDF scores for a corpus of documents.
+
+    The corpus statistics (N, DF, IDF, ...) are computed once on a sparse document-term matrix
+    and shared by tfidf, get_irrelevant_terms and build_anti_dict.
+    They are invalidated whenever a document is added, replaced or removed, and whenever the counts
+    of a document are modified in place: the counts are stored as TokenCounts, copies of the given dictionaries.
     """
+    _statistics: Optional[CorpusStatistics] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def _counts(self, counts) -> TokenCounts:
+        if isinstance(counts, TokenCounts) and counts._metrics is self:
+            return counts
+        return TokenCounts(self, counts)
+
+    @property
+    def statistics(self) -> CorpusStatistics:
+        """
+        The statistics of the documents, computed on first access and then cached.
+        """
+        if self._statistics is None:
+            self._statistics = CorpusStatistics(self)
+        return self._statistics
+
+    def invalidate(self) -> None:
+        """
+        Discard the cached statistics.
+        Called by every modification of the documents or of their token counts.
+        """
+        self._statistics = None
+
+    def __setitem__(self, key, value):
+        self.invalidate()
+        super().__setitem__(key, self._counts(value))
+
+    def __delitem__(self, key):
+        self.invalidate()
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        self.invalidate()
+        super().update((key, self._counts(value)) for key, value in dict(*args, **kwargs).items())
+
+    def setdefault(self, key, default=None):
+        self.invalidate()
+        return super().setdefault(key, self._counts(default if default is not None else {}))
+
+    def pop(self, *args):
+        self.invalidate()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.invalidate()
+        return super().popitem()
+
+    def clear(self):
+        self.invalidate()
+        super().clear()
+
+    @property
+    def matrix(self) -> DocumentTermMatrix:
+        """
+        The sparse (CSR) document-term matrix of the token counts, with its vocabulary index.
+        """
+        return self.statistics.matrix
 
     @property
     def term_frequencies(self) -> pandas.DataFrame:
@@ -18,12 +138,7 @@ class TokenMetrics(dict):  # Dict[str, Dict[str, int]]  : { document_id: {token:
         Returns:
             A DataFrame with columns ["document_id", "mot", "tf"].
         """
-        tf_rows = []
-        for doc_id, tokens in self.items():
-            for token, count in tokens.items():
-                tf_rows.append({"document_id": doc_id, "mot": token, "tf": count})
-                
-        return pandas.DataFrame(tf_rows, columns=["document_id", "mot", "tf"])
+        return self.matrix.to_frame("tf")
 
     @property
     def tfidf(self) -> pandas.DataFrame:
@@ -31,33 +146,14 @@ class TokenMetrics(dict):  # Dict[str, Dict[str, int]]  : { document_id: {token:
         Computes TF-IDF scores for each term in each document.
 
         Internally this function:
-        (a) compute self.tf to get the term frequencies,
-        (b) computes the document frequency (DF) for each term and then
-            the inverse document frequency (IDF) as idf = log10(N / df)
-        (c) merges the two to yield TF-IDF = tf * idf.
+        (a) uses the sparse document-term matrix of the term frequencies (self.statistics),
+        (b) and the inverse document frequency (IDF) of each term, idf = log10(N / df),
+        (c) multiplies each column by its IDF to yield TF-IDF = tf * idf.
 
         Returns:
             A DataFrame with columns ["document_id", "mot", "tf_idf"].
         """
-        tf_df = self.term_frequencies
-        N = len(self.keys())
-        if tf_df.empty or N == 0:
-            return pandas.DataFrame(columns=["document_id", "mot", "tf_idf"])
-
-        # Compute DF (number of documents each token appears in)
-        df_count = (
-            tf_df.groupby("mot")["document_id"]
-            .nunique()
-            .reset_index(name="df")
-        )
-        # Compute IDF: if 0 < df < N then idf = log10(N / df), else 0.0.
-        df_count["idf"] = df_count["df"].apply(
-            lambda df_val: math.log10(N / df_val) if 0 < df_val < N else 0.0
-        )
-        # Merge TF and IDF to compute TF-IDF.
-        tfidf_df = pandas.merge(tf_df, df_count[["mot", "idf"]], on="mot", how="left")
-        tfidf_df["tf_idf"] = tfidf_df["tf"] * tfidf_df["idf"]
-        return tfidf_df[["document_id", "mot", "tf_idf"]]
+        return self.statistics.tfidf
 
     def get_irrelevant_terms(self, idf_threshold: float = 0.1) -> List[str]:
         """
@@ -69,25 +165,7 @@ class TokenMetrics(dict):  # Dict[str, Dict[str, int]]  : { document_id: {token:
         Returns:
             A list of irrelevant terms.
         """
-        tf_df = self.term_frequencies
-        N = len(self.keys())
-        if tf_df.empty or N == 0:
-            idf_df = pandas.DataFrame(columns=["mot", "idf"])
-        else:
-            df_count = (
-                tf_df.groupby("mot")["document_id"]
-                .nunique()
-                .reset_index(name="df")
-            )
-            df_count["idf"] = df_count["df"].apply(
-                lambda df_val: math.log10(N / df_val) if 0 < df_val < N else 0.0
-            )
-            idf_df = df_count[["mot", "idf"]]
-
-        # Select candidate words with IDF <= threshold.
-        irrelevant_words = idf_df[idf_df["idf"] <= idf_threshold]["mot"]
-        
-        return irrelevant_words
+        return self.statistics.irrelevant_terms(idf_threshold)
         
     def build_anti_dict(self, idf_threshold: float = 0.1) -> pandas.DataFrame:
         """
@@ -3,10 +3,13 @@ import re
 from typing import (
     List,
     Dict,
+    Iterator,
     Optional,
     Self,
+    Tuple,
     TYPE_CHECKING
 )
+from pydantic import PrivateAttr, field_validator
 from xml.dom import minidom
 import xml.etree.ElementTree as ET
 import pandas as pd
@@ -15,9 +18,11 @@ if TYPE_CHECKING:
 
 from .document import Document
 from .base.xml_base_model import XMLBaseModel
+from .base.document_list import DocumentList
 from .base.base_corpus import BaseCorpus
+from .base.corpus_statistics import CorpusStatistics
 from .corpus_modules.post_processing import CorpusPostProcessing
-from .corpus_modules.indexing import CorpusIndex
+from .corpus_modules.indexing import CorpusIndex, TokenAggregates
 
 
 class Corpus(
@@ -33,6 +38,21 @@ class Corpus(
     """
     documents: List[Document]  # Utilise le type de base abstrait
     
+    _positions: Dict[str, int] = PrivateAttr(default_factory=dict)  # document_id: position dans self.documents
+    _positions_stamp: Tuple[Optional[DocumentList], int] = PrivateAttr(default=(None, -1))  # (liste, version) de la table
+    _statistics: Dict[Optional[Tuple[str, ...]], Tuple[List[Document], CorpusStatistics]] = PrivateAttr(default_factory=dict)  # zones: (documents, statistiques)
+    _token_aggregates: Dict[Optional[Tuple[str, ...]], TokenAggregates] = PrivateAttr(default_factory=dict)  # zones: agrégats
+    
+    @field_validator("documents", mode="after")
+    @classmethod
+    def _versioned_documents(cls, documents: List[Document]) -> DocumentList:
+        return documents if isinstance(documents, DocumentList) else DocumentList(documents)
+    
+    def __setattr__(self, name, value):
+        if name == "documents" and not isinstance(value, DocumentList):
+            value = DocumentList(value)  # Une liste affectée directement est aussi versionnée
+        super().__setattr__(name, value)
+    
     @classmethod
     def from_folder(cls, 
         process_client: "FileProcessClient", 
@@ -44,12 +64,86 @@ class Corpus(
         """
         return cls(documents = process_client.process_folder(folder_path=folder_path, limit=limit))
     
+    def _position(self, document_id: str) -> Optional[int]:
+        """
+        Retourne la position d'un document dans self.documents, ou None s'il est absent.
+        
+        La table id -> position n'est reconstruite que si elle est obsolète : la liste des documents
+        (DocumentList) a une version, incrémentée à chaque ajout, suppression, remplacement ou déplacement
+        d'un document, et à chaque changement d'identifiant d'un de ses documents.
+        Un identifiant absent d'une table à jour ne coûte qu'une recherche.
+        """
+        position = self._positions.get(document_id)
+        if (
+            position is not None 
+            and position < len(self.documents) 
+            and self.documents[position].document_id == document_id
+        ):
+            return position
+        
+        documents, version = self._positions_stamp
+        if position is None and documents is self.documents and version == self.documents.version:
+            return None  # Document absent du corpus
+        
+        # Table obsolète : reconstruction complète
+        positions: Dict[str, int] = {}
+        for i, doc in enumerate(self.documents):
+            positions.setdefault(doc.document_id, i)  # Le premier document l'emporte en cas de doublon
+        self._positions = positions
+        self._positions_stamp = (self.documents, self.documents.version)
+        return positions.get(document_id)
+    
+    def view(self) -> Self:
+        """
+        Une variante légère du corpus (copie sur écriture), par exemple pour un corpus filtré, lemmatisé ou racinisé.
+        
+        Chaque document de la vue est une copie superficielle de celui du corpus : les champs non modifiés
+        (textes, images...) sont partagés, et seuls les champs réécrits par la suite occupent de la mémoire.
+        apply_filter et apply_substitutions copient les images avant de modifier leurs légendes ;
+        les listes partagées (images) ne doivent pas être modifiées en place directement.
+        """
+        return type(self)(documents=[doc.model_copy() for doc in self.documents])
+    
+    def clear_cache(self):
+        super().clear_cache()
+        self._positions = {}
+        self._positions_stamp = (None, -1)
+        self._statistics = {}
+        self._token_aggregates = {}
+    
+    def clear_documents_cache(self, documents, fields=None):
+        documents = list(documents)
+        super().clear_documents_cache(documents, fields)
+        if documents:
+            # Les statistiques du corpus dépendent du contenu des documents modifiés
+            # (la table des positions se vérifie d'elle-même à chaque accès)
+            self._statistics = {}
+    
     def __getitem__(self, index: str) -> Document:
         """
         Permet d'accéder à un document par son index.
         """
-        for doc in self.documents:
-            if doc.document_id == index:
-                return doc
-        raise IndexError("Document not found in the corpus.")
-    
\ No newline at end of file
+        position = self._position(index)
+        if position is None:
+            raise IndexError("Document not found in the corpus.")
+        return self.documents[position]
+    
+    def __contains__(self, index: str) -> bool:
+        return self._position(index) is not None
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    def get(self, index: str, default: Optional[Document] = None) -> Optional[Document]:
+        """
+        Équivalent de dict.get : retourne le document d'identifiant "index", ou "default" s'il est absent.
+        """
+        position = self._position(index)
+        return self.documents[position] if position is not None else default
+    
+    def keys(self) -> Iterator[str]:
+        """
+        Les identifiants des documents du corpus, dans l'ordre du corpus (sans construire de liste).
+        Permet d'utiliser le corpus à la place d'un dictionnaire "document_id: document".
+        """
+        return (doc.document_id for doc in self.documents)
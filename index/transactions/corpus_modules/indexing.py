@@ -1,21 +1,146 @@
 
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Set, Tuple
 
 import pandas
 
 from ..base.base_corpus import BaseCorpus
+from ..base.base_document import BaseDocument
 from ..base.inverted_index import InvertedIndex
 from ..base.token_metrics import TokenMetrics
+from ..base.corpus_statistics import CorpusStatistics
+
+
+class _Contribution(NamedTuple):
+    document: BaseDocument
+    document_id: str
+    zones: Tuple[Dict[str, int], ...]  # Les tokens des zones du document, tels que lus au dernier calcul
+    counts: Dict[str, int]  # Leur somme
+    occurrences: Dict[str, int]  # Le nombre de zones qui contiennent chaque token
+
+
+class TokenAggregates:
+    """
+    Les agrégats d'un corpus pour une liste de zones : nombre total d'occurrences de chaque token,
+    tokens de chaque document et listes de documents de chaque token. Comme dans Corpus.inverted_token_index,
+    un document apparaît dans la liste d'un token une fois par zone qui le contient.
+    
+    Ils sont mis à jour à partir des seuls documents dont une zone a changé : un document garde
+    le même dictionnaire de tokens pour une zone qui n'a pas été modifiée (voir BaseDocument.clear_cache),
+    ses anciennes contributions sont retirées et les nouvelles ajoutées.
+    """
+    
+    def __init__(self, zones: Optional[List[str]] = None):
+        self.zones = zones
+        self.contributions: Dict[int, _Contribution] = {}  # id(document): contribution
+        self.totals: Dict[str, int] = {}
+        self.postings: Dict[str, Dict[int, Tuple[str, int]]] = {}  # token: {id(document): (document_id, nombre de zones)}
+        self._unordered: Set[str] = set()  # tokens dont la liste n'est plus dans l'ordre du corpus
+        self.order: Dict[int, int] = {}  # id(document): position dans le corpus
+    
+    def _add(self, key: int, contribution: _Contribution):
+        self.contributions[key] = contribution
+        for token, count in contribution.counts.items():
+            self.totals[token] = self.totals.get(token, 0) + count
+            self.postings.setdefault(token, {})[key] = (contribution.document_id, contribution.occurrences[token])
+    
+    def _remove(self, key: int):
+        contribution = self.contributions.pop(key)
+        for token, count in contribution.counts.items():
+            total = self.totals[token] - count
+            if total:
+                self.totals[token] = total
+            else:
+                del self.totals[token]
+            documents = self.postings[token]
+            del documents[key]
+            if not documents:
+                del self.postings[token]
+                self._unordered.discard(token)
+    
+    def update(self, documents: List[BaseDocument]) -> int:
+        """
+        Met les agrégats à jour pour cette liste de documents.
+        
+        Returns:
+            Le nombre de documents dont la contribution a été recalculée.
+        """
+        updated, order = 0, {}
+        initial = not self.contributions  # Premier calcul : les documents sont ajoutés dans l'ordre du corpus
+        previous, reordered = -1, False
+        for position, doc in enumerate(documents):
+            key = id(doc)
+            order[key] = position
+            if key in self.order:
+                reordered = reordered or self.order[key] < previous
+                previous = self.order[key]
+            zones = tuple(tokens for zone, tokens in doc.tokens.items() if self.zones is None or zone in self.zones)
+            contribution = self.contributions.get(key)
+            if (
+                contribution is not None
+                and contribution.document is doc
+                and contribution.document_id == doc.document_id
+                and len(contribution.zones) == len(zones)
+                and all(a is b for a, b in zip(contribution.zones, zones))
+            ):
+                continue
+            
+            counts: Dict[str, int] = {}
+            occurrences: Dict[str, int] = {}
+            for tokens in zones:
+                for token, count in tokens.items():
+                    counts[token] = counts.get(token, 0) + count
+                    occurrences[token] = occurrences.get(token, 0) + 1
+            if contribution is not None:
+                self._remove(key)
+            if not initial:
+                self._unordered.update(counts)
+            self._add(key, _Contribution(doc, doc.document_id, zones, counts, occurrences))
+            updated += 1
+        
+        # Documents retirés du corpus
+        for key in [key for key in self.contributions if key not in order]:
+            self._remove(key)
+        if reordered:
+            self._unordered = set(self.postings)
+        self.order = order
+        return updated
+    
+    def inverted_index(self) -> InvertedIndex:
+        """
+        L'index inversé "token: [document_ids]", les documents de chaque liste dans l'ordre du corpus,
+        chacun répété autant de fois que de zones qui contiennent le token.
+        """
+        for token in self._unordered:
+            self.postings[token] = dict(sorted(self.postings[token].items(), key=lambda item: self.order[item[0]]))
+        self._unordered = set()
+        return InvertedIndex({
+            token: [document_id for document_id, zones in documents.values() for _ in range(zones)]
+            for token, documents in self.postings.items()
+        })
 
 
 class CorpusIndex(BaseCorpus):
     """
     A couple methods to compute metrics and indexes on a corpus of documents.
     """
+    
+    def _aggregates(self, zones: Optional[List[str]] = None) -> TokenAggregates:
+        """
+        Les agrégats du corpus pour ces zones, mis à jour à partir des seuls documents modifiés depuis le dernier appel.
+        Les statistiques en cache pour ces zones sont invalidées dès qu'un document a été recalculé.
+        """
+        key = tuple(zones) if zones is not None else None
+        aggregates = self._token_aggregates.get(key)
+        if aggregates is None:
+            aggregates = self._token_aggregates[key] = TokenAggregates(zones)
+        if aggregates.update(self.documents):
+            self._statistics.pop(key, None)
+        return aggregates
 
     def tokens(self, zones: Optional[List[str]] = None) -> Dict[str, int]:
         """
         List all the words occurring in this corpus and the number of times they occurred.
+        Les totaux sont mis à jour à partir des zones modifiées, sans tout recalculer (voir TokenAggregates).
 
         Parameters:
             zones (List[str], None): 
@@ -24,20 +149,12 @@ class CorpusIndex(BaseCorpus):
         Returns:
             A dictionary of words and their counts.
         """
-        word_counts = {}
-        for doc in self.documents:
-            for zone, tokens in doc.tokens.items():
-                
-                if zones is None or zone in zones:
-                    
-                    for word, count in tokens.items():
-                        word_counts[word] = word_counts.get(word, 0) + count
-                        
-        return word_counts
+        return dict(self._aggregates(zones).totals)
     
     def token_index(self, zones: Optional[List[str]] = None) -> TokenMetrics:  # Dict[str, Dict[str, int]]
         """
         Generate a mapping of document ids to a dictionary of tokens and their counts.
+        Seuls les documents modifiés sont recalculés (voir TokenAggregates).
         
         Parameters:
             zones (List[str], None): 
@@ -46,19 +163,53 @@ class CorpusIndex(BaseCorpus):
         Returns:
             A dictionary where each key is a document id and the value is a dictionary of tokens and their counts.
         """
+        aggregates = self._aggregates(zones)
         index = TokenMetrics()
         for doc in self.documents:
-            for zone, tokens in doc.tokens.items():
-                    
-                    if zones is None or zone in zones:
-                        
-                        for token, count in tokens.items():
-                            if doc.document_id not in index.keys():
-                                index[doc.document_id] = {}
-                            index[doc.document_id][token] = index[doc.document_id].get(token, 0) + count
-                            
+            contribution = aggregates.contributions[id(doc)]
+            if contribution.counts:
+                index[contribution.document_id] = contribution.counts  # Copié (voir TokenCounts)
+        
+        # Réutilise les statistiques déjà calculées sur le corpus, si elles sont à jour (agrégats tout juste mis à jour)
+        index._statistics = self._stored_statistics(zones)
         return index
 
+    def _stored_statistics(self, zones: Optional[List[str]] = None) -> Optional[CorpusStatistics]:
+        """
+        Les statistiques en cache pour ces zones, si la liste des documents n'a pas changé depuis.
+        Les agrégats doivent avoir été mis à jour juste avant (voir _aggregates), pour que les modifications
+        des documents eux-mêmes aient invalidé le cache.
+        """
+        documents, statistics = self._statistics.get(tuple(zones) if zones is not None else None, ((), None))
+        if len(documents) == len(self.documents) and all(a is b for a, b in zip(documents, self.documents)):
+            return statistics
+        return None
+
+    def _cached_statistics(self, zones: Optional[List[str]] = None) -> Optional[CorpusStatistics]:
+        """
+        Les statistiques du corpus en cache pour ces zones, si aucun document n'a changé depuis.
+        """
+        self._aggregates(zones)
+        return self._stored_statistics(zones)
+
+    def statistics(self, zones: Optional[List[str]] = None) -> CorpusStatistics:
+        """
+        Les statistiques du corpus (N, DF, IDF, fréquences dans la collection, longueurs des documents),
+        calculées une seule fois puis partagées par tfidf, get_irrelevant_terms et build_anti_dict
+        (voir TokenMetrics). Le cache est invalidé par clear_cache, lorsque la liste des documents change
+        et lorsqu'une zone d'un document est modifiée (voir TokenAggregates).
+
+        Parameters:
+            zones (List[str], None): 
+                Une liste de noms de zones à prendre en compte dans le résultat.
+                Si None, toutes les zones sont prises en compte.
+        """
+        statistics = self._cached_statistics(zones)
+        if statistics is None:
+            statistics = self.token_index(zones).statistics
+            self._statistics[tuple(zones) if zones is not None else None] = (list(self.documents), statistics)
+        return statistics
+
     def inverted_token_index_flattened(self, zones: Optional[List[str]] = None) -> pandas.DataFrame:
         """
         Parameters:
@@ -81,6 +232,9 @@ class CorpusIndex(BaseCorpus):
     
     def inverted_token_index(self, zones: Optional[List[str]] = None) -> InvertedIndex:
         """
+        Les listes de documents sont mises à jour à partir des documents modifiés (voir TokenAggregates).
+        Un document apparaît dans la liste d'un token une fois par zone qui le contient.
+        
         Parameters:
             zones (List[str], None): 
                 Une liste de noms de zones à prendre en compte dans le résultat.
@@ -88,16 +242,4 @@ class CorpusIndex(BaseCorpus):
         Returns:
             Une dataframe avec tous les tokens du corpus au format (mot, space separated document_ids).
         """
-        index: Dict[str, List[str]] = InvertedIndex()
-        for doc in self.documents:
-            for zone, tokens in doc.tokens.items():
-                
-                if zones is None or zone in zones:
-                    
-                    for token, _ in tokens.items():
-                        if token not in index.keys():
-                            index[token] = []
-                        index[token].append(doc.document_id)
-        
-        return index
-    
\ No newline at end of file
+        return self._aggregates(zones).inverted_index()
@@ -1,9 +1,11 @@
 
-from typing import List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
 
-import re, pandas
+import re, math, pickle, pandas
 
 from ..base.base_corpus import BaseCorpus
+from ..base.substitution_table import SubstitutionTable
 from ..base.base_document import BaseDocument
 from abc import abstractmethod
 
@@ -14,31 +16,21 @@ class CorpusPostProcessing(BaseCorpus):
     """
     
     @staticmethod
-    def substitution(texte: str, substitutions: pandas.DataFrame) -> str:
+    def substitution(texte: str, substitutions: Union[pandas.DataFrame, SubstitutionTable]) -> str:
         """
         Applique des substitutions simples sur un texte donné.
 
         Parameters:
             texte: Le texte à traiter
-            substitutions: Un DataFrame contenant les mots à remplacer et leurs remplacements
+            substitutions: Un DataFrame contenant les mots à remplacer et leurs remplacements,
+                ou une SubstitutionTable déjà compilée (à préférer pour traiter plusieurs textes).
 
         Returns:
             Le texte avec les substitutions appliquées.
         """
-        mapping = {
-            mot.lower(): remplacement
-            for mot, remplacement in substitutions.itertuples(index=False)
-        }
-        pattern = re.compile(
-            r'\b(' + '|'.join(map(re.escape, mapping.keys())) + r')\b',
-            flags=re.IGNORECASE
-        )
-        def _replacer(match):
-            # match.group(0) est le mot trouvé (dans la casse originale)
-            key = match.group(0).lower()
-            return mapping.get(key, match.group(0))
-        
-        return pattern.sub(_replacer, texte)
+        if isinstance(substitutions, pandas.DataFrame):
+            substitutions = SubstitutionTable.from_dataframe(substitutions)
+        return substitutions.apply(texte)
     
     @staticmethod
     def standardize(texte: str) -> str:
@@ -57,80 +49,127 @@ class CorpusPostProcessing(BaseCorpus):
         texte = re.sub(r"[^\w\s]", "", texte)
         return re.sub(r"'", " ", texte)
     
-    def apply_substitutions(self, attributes: List[str], substitutions: pandas.DataFrame) -> None:
+    def _fields(self, attributes: List[str]) -> List[Tuple[int, object, str, str, Optional[int]]]:
         """
-        Applique des substitutions sur les attributs spécifiés de chaque document.
-
-        Parameters:
-            attributes: Liste des noms d'attributs à traiter (formuler "attr1.attr2" pour les attributs de type List[Other])
-            substitutions: DataFrame contenant les mots à remplacer et leurs remplacements
+        Les champs texte à traiter : (position du document, objet qui porte le champ, nom du champ,
+        champ du document concerné ("images" pour "images.legende"), position de l'objet dans cette liste ou None).
+        Les attributs qui ne sont pas des strings (ou des listes, pour "attr1.attr2") sont signalés et ignorés.
         """
-        print("Application des substitutions sur les attributs spécifiés...")
-        
-        mapping = {
-            mot.lower(): remplacement
-            for mot, remplacement in substitutions.itertuples(index=False)
-        }
-        pattern = re.compile(
-            r'\b(' + '|'.join(map(re.escape, mapping.keys())) + r')\b',
-            flags=re.IGNORECASE
-        )
-        def _replacer(match):
-            # match.group(0) est le mot trouvé (dans la casse originale)
-            key = match.group(0).lower()
-            return mapping.get(key, match.group(0))
-        
-        # Applique les substitutions sur chaque document
-        
-        for doc in self.documents:
+        fields = []
+        for position, doc in enumerate(self.documents):
             for attr in attributes:
                 if "." in attr:
                     attr1, attr2 = attr.split(".")
                     if hasattr(doc, attr1) and isinstance(getattr(doc, attr1), list):
-                        for item in getattr(doc, attr1):
+                        for index, item in enumerate(getattr(doc, attr1)):
                             if hasattr(item, attr2) and isinstance(getattr(item, attr2), str):
-                                texte = getattr(item, attr2)
-                                setattr(item, attr2, pattern.sub(_replacer, texte))
+                                fields.append((position, item, attr2, attr1, index))
                             else:
                                 print(f"Avertissement: Attribut '{attr2}' n'est pas une string dans le document {doc.document_id}.")
                     else:
                         print(f"Avertissement: Attribut '{attr1}' n'est pas une liste dans le document {doc.document_id}.")
                 else:
                     if hasattr(doc, attr) and isinstance(getattr(doc, attr), str):
-                        texte = getattr(doc, attr)
-                        setattr(doc, attr, pattern.sub(_replacer, texte))
+                        fields.append((position, doc, attr, attr, None))
                     else:
                         print(f"Avertissement: Attribut '{attr}' n'est pas une string dans le document {doc.document_id}.")
+        return fields
     
-        self.clear_cache()
+    def _apply(self, attributes: List[str], function: Callable[[str], str], processes: Optional[int] = None) -> None:
+        """
+        Applique la fonction sur les champs texte des attributs spécifiés de chaque document.
+        Seuls les champs modifiés sont réécrits, et seuls les caches des documents modifiés sont invalidés.
+        
+        Parameters:
+            attributes: Liste des noms d'attributs à traiter (formuler "attr1.attr2" pour les attributs de type List[Other])
+            function: La fonction appliquée à chaque texte.
+            processes: Si supérieur à 1, les textes sont répartis par blocs sur autant de processus.
+                La fonction doit alors pouvoir être sérialisée (pickle) : sinon, le traitement reste séquentiel.
+        """
+        fields = self._fields(attributes)
+        texts = [getattr(target, attr) for _, target, attr, _, _ in fields]
+        
+        if processes is not None and processes > 1 and len(texts) > 1:
+            try:
+                pickle.dumps(function)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                print("Avertissement: La fonction ne peut pas être envoyée aux processus, traitement séquentiel.")
+                processes = None
+        
+        if processes is not None and processes > 1 and len(texts) > 1:
+            # Quelques blocs par processus, pour équilibrer la charge
+            size = max(1, math.ceil(len(texts) / (processes * 4)))
+            chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+            with ProcessPoolExecutor(max_workers=processes, initializer=_set_worker_function, initargs=(function,)) as pool:
+                results = [text for chunk in pool.map(_apply_worker_function, chunks) for text in chunk]
+        else:
+            results = [function(text) for text in texts]
+        
+        # Champs modifiés de chaque document : seules les zones qui en dépendent seront recalculées
+        touched: Dict[int, Set[str]] = {}
+        copied: Dict[Tuple[int, str], list] = {}
+        for (position, target, attr, field, index), before, after in zip(fields, texts, results):
+            if after == before:
+                continue
+            if index is None:
+                setattr(target, attr, after)
+            else:
+                # Copie sur écriture : la liste et l'objet modifié sont copiés, pour ne pas modifier
+                # un corpus qui les partage (voir Corpus.view)
+                items = copied.get((position, field))
+                if items is None:
+                    items = copied[(position, field)] = list(getattr(self.documents[position], field))
+                    setattr(self.documents[position], field, items)
+                items[index] = target.model_copy(update={attr: after})
+            touched.setdefault(position, set()).add(field)
+        for position, changed in sorted(touched.items()):
+            self.clear_documents_cache([self.documents[position]], changed)
     
-    def apply_filter(self, attributes: List[str], filter: Callable[[str], str]) -> None:
+    def apply_substitutions(
+        self, 
+        attributes: List[str], 
+        substitutions: Union[pandas.DataFrame, SubstitutionTable], 
+        processes: Optional[int] = None,
+    ) -> None:
+        """
+        Applique des substitutions sur les attributs spécifiés de chaque document.
+        La table est compilée une seule fois (voir SubstitutionTable) et appliquée en un seul passage sur chaque texte.
+
+        Parameters:
+            attributes: Liste des noms d'attributs à traiter (formuler "attr1.attr2" pour les attributs de type List[Other])
+            substitutions: DataFrame contenant les mots à remplacer et leurs remplacements, ou une SubstitutionTable
+            processes: Nombre de processus (par exemple os.cpu_count()). Si None, traitement séquentiel.
+        """
+        print("Application des substitutions sur les attributs spécifiés...")
+        
+        table = (
+            SubstitutionTable.from_dataframe(substitutions) if isinstance(substitutions, pandas.DataFrame)
+            else substitutions
+        )
+        self._apply(attributes, table.apply, processes=processes)
+    
+    def apply_filter(self, attributes: List[str], filter: Callable[[str], str], processes: Optional[int] = None) -> None:
         """
         Applique la fonction "filter" sur les attributs spécifiés de chaque document.
         
         Parameters:
             attributes: Liste des noms d'attributs à traiter (formuler "attr1.attr2" pour les attributs de type List[Other])
+            filter: La fonction appliquée à chaque texte.
+            processes: Nombre de processus (par exemple os.cpu_count()). Si None, traitement séquentiel.
+                Le filtre doit être une fonction définie au niveau d'un module (pas une lambda) pour être envoyé aux processus.
         """
         print("Application du filtre sur les attributs spécifiés...")
-        for doc in self.documents:
-            for attr in attributes:
-                if "." in attr:
-                    attr1, attr2 = attr.split(".")
-                    if hasattr(doc, attr1) and isinstance(getattr(doc, attr1), list):
-                        for item in getattr(doc, attr1):
-                            if hasattr(item, attr2) and isinstance(getattr(item, attr2), str):
-                                texte = getattr(item, attr2)
-                                setattr(item, attr2, filter(texte))
-                            else:
-                                print(f"Avertissement: Attribut '{attr2}' n'est pas une string dans le document {doc.document_id}.")
-                    else:
-                        print(f"Avertissement: Attribut '{attr1}' n'est pas une liste dans le document {doc.document_id}.")
-                else:
-                    if hasattr(doc, attr) and isinstance(getattr(doc, attr), str):
-                        texte = getattr(doc, attr)
-                        setattr(doc, attr, filter(texte))
-                    else:
-                        print(f"Avertissement: Attribut '{attr}' n'est pas une string dans le document {doc.document_id}.")
-    
-        self.clear_cache()
-    
\ No newline at end of file
+        self._apply(attributes, filter, processes=processes)
+
+
+# Fonction appliquée par chaque processus de _apply, envoyée une seule fois à son démarrage
+_worker_function: Optional[Callable[[str], str]] = None
+
+
+def _set_worker_function(function: Callable[[str], str]) -> None:
+    global _worker_function
+    _worker_function = function
+
+
+def _apply_worker_function(texts: List[str]) -> List[str]:
+    return [_worker_function(text) for text in texts]
@@ -1,5 +1,5 @@
 
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Set
 from datetime import datetime
 from pydantic import Field
 
@@ -109,6 +109,12 @@ class Document(XMLBaseModel, BaseDocument):
         tokens = {}
         
         for zone_name, zone_content in self.read_zones.items():
+            
+            # Les zones qui n'ont pas changé depuis le dernier calcul gardent leurs tokens (voir clear_cache)
+            cached = self._cached_zone_tokens(zone_name)
+            if cached is not None:
+                tokens[zone_name] = cached
+                continue
         
             word_counts = {}
             # Utilise \w+, trouve directement toutes les séquences alphanumériques
@@ -118,4 +124,13 @@ class Document(XMLBaseModel, BaseDocument):
             
             tokens[zone_name] = word_counts
         
+        self._set_zone_tokens(tokens)
         return tokens
+    
+    @property
+    def zone_fields(self) -> Dict[str, Set[str]]:
+        return {"titre": {"titre"}, "texte": {"texte"}, "legendes": {"images"}}
+    
+    @property
+    def id_fields(self) -> Set[str]:
+        return {"fichier"}
@@ -0,0 +1,184 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+import re, zlib
+from collections import defaultdict
+
+import numpy
+
+from .document import Document
+from .corpus import Corpus
+from .search_hit import SearchHit
+
+Result = TypeVar("Result", SearchHit, Document, str)
+
+
+class DuplicateIndex:
+    """
+    Détection des quasi-doublons du corpus (articles réimprimés ou légèrement modifiés d'un numéro à l'autre)
+    par MinHash et LSH, sans comparer toutes les paires de documents.
+
+    - Chaque document est réduit à l'ensemble de ses shingles : les suites de shingle_size mots consécutifs
+      de ses zones, découpées comme Document.tokens.
+    - Sa signature MinHash est le minimum de num_perm fonctions de hachage sur ces shingles : la proportion
+      de valeurs égales entre deux signatures estime la similarité de Jaccard des deux ensembles.
+    - Les signatures sont découpées en bands bandes ; deux documents qui ont une bande identique (même seau)
+      sont candidats, et seuls les candidats sont comparés. Le seuil de détection est d'environ
+      (1 / bands) ** (1 / lignes par bande).
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        zones: Optional[List[str]] = None,
+        shingle_size: int = 3,
+        num_perm: int = 128,
+        bands: int = 16,
+        threshold: float = 0.8,
+        seed: int = 0,
+    ):
+        """
+        Parameters:
+            corpus: Le corpus de documents.
+            zones: Les zones dont les mots forment les shingles. Si None, le titre et le texte.
+            shingle_size: Le nombre de mots consécutifs d'un shingle.
+            num_perm: Le nombre de fonctions de hachage (longueur des signatures).
+            bands: Le nombre de bandes de la LSH (doit diviser num_perm).
+            threshold: La similarité de Jaccard estimée à partir de laquelle deux documents sont des doublons.
+            seed: Graine aléatoire des fonctions de hachage.
+        """
+        if num_perm % bands:
+            raise ValueError("The number of bands must divide num_perm.")
+        self.zones = zones if zones is not None else ["titre", "texte"]
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.threshold = threshold
+
+        # Fonctions de hachage h(x) = (a * x + b) mod 2^64, dont on garde les 32 bits de poids fort
+        random = numpy.random.default_rng(seed)
+        self._a = random.integers(1, 2 ** 63, size=num_perm, dtype=numpy.uint64) | numpy.uint64(1)
+        self._b = random.integers(0, 2 ** 63, size=num_perm, dtype=numpy.uint64)
+
+        self.document_ids: List[str] = [document.document_id for document in corpus.documents]
+        self.document_numbers = {doc_id: row for row, doc_id in enumerate(self.document_ids)}
+        self.signatures = numpy.vstack([self.signature(document) for document in corpus.documents]) \
+            if self.document_ids else numpy.empty((0, num_perm), dtype=numpy.uint64)
+
+        # Seaux de la LSH : (bande, valeurs de la bande) -> lignes des documents
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        rows_per_band = num_perm // bands
+        empty = numpy.iinfo(numpy.uint64).max
+        for row, signature in enumerate(self.signatures):
+            if signature[0] == empty:  # Document sans mots : n'est le doublon d'aucun autre
+                continue
+            for band in range(bands):
+                self.buckets[(band, signature[band * rows_per_band:(band + 1) * rows_per_band].tobytes())].append(row)
+
+        self._groups: Optional[Dict[str, int]] = None
+
+    def shingles(self, document: Document) -> Set[int]:
+        """
+        Les empreintes (CRC32) des shingles du document. Un texte plus court qu'un shingle en forme un seul.
+        """
+        words = [
+            word.lower() for zone, content in document.read_zones.items() if zone in self.zones
+            for word in re.findall(r"\w+", content)
+        ]
+        size = min(self.shingle_size, len(words))
+        return {
+            zlib.crc32(" ".join(words[start:start + size]).encode("utf-8"))
+            for start in range(len(words) - size + 1)
+        } if words else set()
+
+    def signature(self, document: Document) -> numpy.ndarray:
+        """
+        La signature MinHash du document (num_perm valeurs). Un document sans mots a une signature maximale.
+        """
+        shingles = numpy.fromiter(self.shingles(document), dtype=numpy.uint64)
+        if not len(shingles):
+            return numpy.full(len(self._a), numpy.iinfo(numpy.uint64).max, dtype=numpy.uint64)
+        hashes = (shingles[:, None] * self._a[None, :] + self._b[None, :]) >> numpy.uint64(32)
+        return hashes.min(axis=0)
+
+    def similarity(self, first_id: str, second_id: str) -> float:
+        """
+        La similarité de Jaccard estimée de deux documents (proportion de valeurs égales de leurs signatures).
+        """
+        first, second = self.signatures[self.document_numbers[first_id]], self.signatures[self.document_numbers[second_id]]
+        return float(numpy.mean(first == second))
+
+    def candidate_pairs(self) -> Set[Tuple[str, str]]:
+        """
+        Les paires de documents qui partagent au moins un seau de la LSH.
+        """
+        pairs = set()
+        for rows in self.buckets.values():
+            for i, first in enumerate(rows):
+                for second in rows[i + 1:]:
+                    pairs.add((self.document_ids[first], self.document_ids[second]))
+        return pairs
+
+    def duplicates(self, threshold: Optional[float] = None) -> List[Tuple[str, str, float]]:
+        """
+        Les paires de quasi-doublons : les candidats dont la similarité estimée dépasse le seuil.
+
+        Parameters:
+            threshold: Le seuil de similarité. Si None, celui de l'index.
+
+        Returns:
+            Les triplets (document_id, document_id, similarité), par similarité décroissante.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        pairs = [(first, second, self.similarity(first, second)) for first, second in self.candidate_pairs()]
+        return sorted(
+            (pair for pair in pairs if pair[2] >= threshold),
+            key=lambda pair: (-pair[2], self.document_numbers[pair[0]], self.document_numbers[pair[1]]),
+        )
+
+    @property
+    def groups(self) -> Dict[str, int]:
+        """
+        Le groupe de quasi-doublons de chaque document qui en a au moins un (composantes connexes
+        des paires de doublons). Un groupe est numéroté par la ligne de son premier document.
+        """
+        if self._groups is None:
+            parents = list(range(len(self.document_ids)))
+
+            def find(row: int) -> int:
+                while parents[row] != row:
+                    parents[row] = parents[parents[row]]
+                    row = parents[row]
+                return row
+
+            for first, second, _ in self.duplicates():
+                first, second = find(self.document_numbers[first]), find(self.document_numbers[second])
+                parents[max(first, second)] = min(first, second)
+            roots = [find(row) for row in range(len(self.document_ids))]
+            sizes = numpy.bincount(roots, minlength=len(self.document_ids))
+            self._groups = {doc_id: root for doc_id, root in zip(self.document_ids, roots) if sizes[root] > 1}
+        return self._groups
+
+    def group_members(self) -> List[List[str]]:
+        """
+        Les groupes de quasi-doublons (au moins deux documents chacun), dans l'ordre du corpus.
+        """
+        members = defaultdict(list)
+        for doc_id, group in self.groups.items():
+            members[group].append(doc_id)
+        return [members[group] for group in sorted(members)]
+
+    def collapse(self, results: Iterable[Result]) -> List[Result]:
+        """
+        Regroupe les quasi-doublons d'une liste de résultats : seul le premier résultat de chaque groupe
+        (le mieux classé) est gardé, l'ordre des résultats est conservé.
+
+        Parameters:
+            results: Des SearchHit, des Document ou des identifiants de documents.
+        """
+        seen, collapsed = set(), []
+        for result in results:
+            doc_id = result if isinstance(result, str) else result.document_id
+            group = self.groups.get(doc_id)
+            if group is None or group not in seen:
+                collapsed.append(result)
+                if group is not None:
+                    seen.add(group)
+        return collapsed
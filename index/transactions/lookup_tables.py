@@ -0,0 +1,211 @@
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import reduce
+from operator import or_
+import datetime
+
+import numpy
+
+from .document import Document
+from .corpus import Corpus
+from .base.inverted_index import InvertedIndex
+from .base import bitmaps
+
+
+class LookupTables:
+    """
+    Structures précalculées une seule fois sur un ensemble de documents,
+    puis partagées par toutes les requêtes (Query.search).
+
+    Chaque requête ne paie ainsi que le travail propre à la requête,
+    jamais la préparation des attributs des documents (dates, rubriques, images...).
+
+    Les ensembles de documents sont des bitmaps (voir base/bitmaps.py)
+    sur les numéros internes des documents : leur position dans self.doc_ids.
+
+    Les numéros internes sont attribués dans l'ordre chronologique :
+    d'abord les documents sans date, puis les documents datés du plus ancien au plus récent
+    (à date égale, dans l'ordre inverse du corpus, pour que le parcours décroissant le respecte).
+    Parcourir un bitmap dans un sens ou dans l'autre donne donc directement les résultats triés par date,
+    et une période de dates correspond à une plage contiguë de numéros.
+    """
+    EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+    # Attributs booléens des documents, précalculés en bitmaps (même nom que le champ correspondant de Query)
+    FLAGS: Dict[str, Callable[[Document], bool]] = {
+        "has_image": lambda doc: any(img.url for img in doc.images),
+        "has_contact": lambda doc: bool(doc.contact and doc.contact.strip()),
+        "has_auteur": lambda doc: bool(doc.auteur and doc.auteur.strip()),
+        "has_legende": lambda doc: any(img.legende and img.legende.strip() for img in doc.images),
+    }
+
+    def __init__(self, documents: Union[Dict[str, Document], Corpus], index: Optional[Dict[str, InvertedIndex]] = None):
+        """
+        Parameters:
+            documents: Dictionnaire des documents par ID, ou directement le Corpus.
+            index: Un index inversé "zone: index", dont les listes de documents sont converties en bitmaps à la demande.
+        """
+        self.documents = documents
+        self.index: Dict[str, InvertedIndex] = index or {}
+
+        undated: List[str] = []
+        dated: List[Tuple[int, int, str]] = []  # (date ordinale, position inverse dans le corpus, document_id)
+        for position, doc_id in enumerate(documents.keys()):
+            doc = documents.get(doc_id)
+            if doc.date:
+                dated.append((self.date_ordinal(doc.date), -position, doc_id))
+            else:
+                undated.append(doc_id)
+        dated.sort()
+
+        self.doc_ids: List[str] = undated + [doc_id for _, _, doc_id in dated]  # numéro interne: document_id
+        self.doc_numbers: Dict[str, int] = {doc_id: number for number, doc_id in enumerate(self.doc_ids)}
+        self.all_documents: int = bitmaps.range_mask(0, len(self.doc_ids))
+        # Documents sans date : les numéros 0 à dated_offset (exclu)
+        self.dated_offset: int = len(undated)
+        self.undated: int = bitmaps.range_mask(0, self.dated_offset)
+        # Colonne des dates des documents datés (par numéro croissant, donc triée),
+        # pour résoudre une période en une plage de numéros par recherche dichotomique.
+        self.date_ordinals = array("q", (ordinal for ordinal, _, _ in dated))
+
+        rubrics: Dict[str, List[int]] = {}
+        flags: Dict[str, List[int]] = {flag: [] for flag in self.FLAGS}
+
+        for number, doc_id in enumerate(self.doc_ids):
+            doc = documents.get(doc_id)
+
+            if doc.rubrique:
+                rubrics.setdefault(doc.rubrique.lower(), []).append(number)
+
+            for flag, has_flag in self.FLAGS.items():
+                if has_flag(doc):
+                    flags[flag].append(number)
+
+        # Dictionnaire des rubriques : rubrique en minuscules -> bitmap des documents de cette rubrique
+        self.rubrics: Dict[str, int] = {rubric: bitmaps.from_positions(numbers) for rubric, numbers in rubrics.items()}
+        # Attribut -> bitmap des documents qui le possèdent
+        self.flags: Dict[str, int] = {flag: bitmaps.from_positions(numbers) for flag, numbers in flags.items()}
+
+        self._postings: Dict[Tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def posting_length(self, zone: str, token: str) -> int:
+        """
+        Nombre d'entrées de la liste de documents du token dans l'index de la zone (sans conversion).
+        """
+        return len(self.index[zone].get(token, ())) if zone in self.index else 0
+
+    def postings(self, zone: str, token: str) -> int:
+        """
+        Bitmap des documents qui contiennent le token dans la zone, mis en cache.
+        """
+        key = (zone, token)
+        postings = self._postings.get(key)
+        if postings is None:
+            doc_ids = self.index[zone].get(token, ()) if zone in self.index else ()
+            postings = bitmaps.from_positions(self.doc_numbers[doc_id] for doc_id in doc_ids if doc_id in self.doc_numbers)
+            self._postings[key] = postings
+        return postings
+
+    def field_posting_length(self, zones: Sequence[str], token: str) -> int:
+        """
+        Borne supérieure du nombre de documents qui contiennent le token dans au moins une des zones.
+        """
+        return min(sum(self.posting_length(zone, token) for zone in zones), len(self))
+
+    def field_postings(self, zones: Sequence[str], token: str) -> int:
+        """
+        Bitmap des documents qui contiennent le token dans au moins une des zones.
+        """
+        return reduce(or_, (self.postings(zone, token) for zone in zones), 0)
+
+    def rubric_postings(self, terms: List[str], match: Callable[[Iterable[bool]], bool] = any) -> int:
+        """
+        Bitmap des documents dont la rubrique contient les termes (recherche de sous-chaînes).
+        Les termes sont comparés une fois à chaque rubrique distincte du dictionnaire, pas à chaque document.
+
+        Parameters:
+            terms: Les termes recherchés, en minuscules.
+            match: any si une rubrique doit contenir au moins un des termes, all si elle doit tous les contenir.
+        """
+        return reduce(or_, (
+            postings for rubric, postings in self.rubrics.items()
+            if match(term in rubric for term in terms)
+        ), 0)
+
+    @classmethod
+    def date_ordinal(cls, date: datetime.datetime) -> int:
+        """
+        Représentation entière d'une date (microsecondes depuis 1970, UTC si la date est naïve).
+        """
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return (date - cls.EPOCH) // datetime.timedelta(microseconds=1)
+
+    def date_ranges(
+            self,
+            start: Optional[datetime.datetime],
+            end: Optional[datetime.datetime],
+            excluded: Iterable[Tuple[datetime.datetime, datetime.datetime]] = ()
+    ) -> List[Tuple[int, int]]:
+        """
+        Résout une période (bornes incluses) privée des périodes exclues
+        en plages disjointes [début, fin[ de positions dans la colonne des dates (self.date_ordinals).
+
+        Parameters:
+            start: Début de la période, ou None pour ne pas borner.
+            end: Fin de la période, ou None pour ne pas borner.
+            excluded: Périodes (début, fin) à retirer, bornes incluses.
+        """
+        lo = bisect_left(self.date_ordinals, self.date_ordinal(start)) if start else 0
+        hi = bisect_right(self.date_ordinals, self.date_ordinal(end)) if end else len(self.date_ordinals)
+        ranges = [(lo, hi)] if lo < hi else []
+
+        for excluded_start, excluded_end in excluded:
+            ex_lo = bisect_left(self.date_ordinals, self.date_ordinal(excluded_start))
+            ex_hi = bisect_right(self.date_ordinals, self.date_ordinal(excluded_end))
+            if ex_lo >= ex_hi:
+                continue
+            remaining = []
+            for range_lo, range_hi in ranges:
+                if ex_hi <= range_lo or ex_lo >= range_hi:
+                    remaining.append((range_lo, range_hi))
+                    continue
+                if range_lo < ex_lo:
+                    remaining.append((range_lo, ex_lo))
+                if ex_hi < range_hi:
+                    remaining.append((ex_hi, range_hi))
+            ranges = remaining
+
+        return ranges
+
+    def date_postings(self, ranges: List[Tuple[int, int]]) -> int:
+        """
+        Bitmap des documents compris dans des plages de la colonne des dates (voir date_ranges).
+        Les numéros suivant l'ordre chronologique, chaque plage est un simple masque.
+        """
+        return reduce(or_, (bitmaps.range_mask(self.dated_offset + lo, self.dated_offset + hi) for lo, hi in ranges), 0)
+
+    def by_date(self, bitmap: int, ascending: bool = False) -> numpy.ndarray:
+        """
+        Les numéros des documents d'un bitmap triés par date, sans tri : le bitmap est simplement
+        parcouru dans un sens ou dans l'autre. Les documents sans date viennent toujours en dernier.
+
+        Parameters:
+            bitmap: Le bitmap des documents.
+            ascending: Si True, du plus ancien au plus récent. Sinon, du plus récent au plus ancien.
+        """
+        if not ascending:
+            return bitmaps.to_positions(bitmap, reverse=True)
+        numbers = bitmaps.to_positions(bitmap)
+        first_dated = numpy.searchsorted(numbers, self.dated_offset)
+        return numpy.concatenate((numbers[first_dated:], numbers[:first_dated]))
+
+    def documents_of(self, bitmap: int) -> List[Document]:
+        """
+        Les documents d'un bitmap, par numéro croissant.
+        """
+        return [self.documents.get(self.doc_ids[number]) for number in bitmaps.to_positions(bitmap)]
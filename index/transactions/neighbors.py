@@ -0,0 +1,216 @@
+from typing import Optional, Self, Tuple
+import os
+
+import numpy
+
+
+def _assign(points: numpy.ndarray, centroids: numpy.ndarray, chunk_size: int = 65536) -> numpy.ndarray:
+    """
+    L'indice du centroïde le plus proche (distance euclidienne) de chaque point, calculé par blocs.
+    """
+    assignments = numpy.empty(len(points), dtype=numpy.int64)
+    centroid_norms = (centroids ** 2).sum(axis=1)
+    for start in range(0, len(points), chunk_size):
+        block = points[start:start + chunk_size]
+        assignments[start:start + chunk_size] = numpy.argmin(centroid_norms - 2 * block @ centroids.T, axis=1)
+    return assignments
+
+
+def _kmeans(points: numpy.ndarray, n_clusters: int, iterations: int, random: numpy.random.Generator) -> numpy.ndarray:
+    """
+    Algorithme de Lloyd : n_clusters centroïdes initialisés sur des points tirés au hasard.
+    Un centroïde qui ne reçoit aucun point est réinitialisé sur un point tiré au hasard.
+    """
+    centroids = points[random.choice(len(points), n_clusters, replace=False)].astype(numpy.float32)
+    for _ in range(iterations):
+        assignments = _assign(points, centroids)
+        sizes = numpy.bincount(assignments, minlength=n_clusters)
+        sums = numpy.zeros_like(centroids)
+        numpy.add.at(sums, assignments, points)
+        empty = sizes == 0
+        centroids[~empty] = sums[~empty] / sizes[~empty, None]
+        if empty.any():
+            centroids[empty] = points[random.choice(len(points), int(empty.sum()), replace=False)]
+    return centroids
+
+
+class NearestNeighborsIndex:
+    """
+    Index approché des plus proches voisins (produit scalaire) sur des vecteurs denses de norme 1,
+    par fichier inversé et quantification produit (IVF-PQ).
+
+    - Un k-means grossier répartit les vecteurs en n_lists listes ; une requête ne parcourt que les
+      n_probe listes dont les centroïdes sont les plus proches.
+    - Le résidu de chaque vecteur (vecteur - centroïde de sa liste) est découpé en n_subspaces
+      sous-vecteurs, chacun remplacé par le code (uint8) du plus proche de 256 centroïdes de son sous-espace.
+    - Le score approché d'un vecteur est q.c + somme des q_m.r_m, lus dans une table calculée une fois
+      par requête ; les meilleurs candidats sont ensuite notés exactement (rerank) sur les vecteurs d'origine.
+    """
+    FILE = "ann.npz"
+
+    def __init__(
+        self,
+        vectors: numpy.ndarray,
+        centroids: numpy.ndarray,
+        codebooks: numpy.ndarray,
+        list_indptr: numpy.ndarray,
+        list_rows: numpy.ndarray,
+        codes: numpy.ndarray,
+    ):
+        """
+        Parameters:
+            vectors: Les vecteurs indexés (lignes), utilisés pour la notation exacte des candidats.
+            centroids: Les centroïdes des listes (n_lists x d).
+            codebooks: Les centroïdes de chaque sous-espace (n_subspaces x 256 x d / n_subspaces).
+            list_indptr: Les lignes de la liste i sont list_rows[list_indptr[i]:list_indptr[i+1]].
+            list_rows: Les lignes des vecteurs, rangées par liste.
+            codes: Les codes PQ des vecteurs, dans l'ordre de list_rows (n_vectors x n_subspaces).
+        """
+        self.vectors = vectors
+        self.centroids = centroids
+        self.codebooks = codebooks
+        self.list_indptr = list_indptr
+        self.list_rows = list_rows
+        self.codes = codes
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def n_subspaces(self) -> int:
+        return self.codebooks.shape[0]
+
+    def _split(self, vectors: numpy.ndarray) -> numpy.ndarray:
+        """Découpe des vecteurs (n x d) en sous-vecteurs (n x n_subspaces x d'), complétés par des zéros."""
+        width = self.codebooks.shape[2]
+        padded = numpy.zeros((len(vectors), self.n_subspaces * width), dtype=numpy.float32)
+        padded[:, :vectors.shape[1]] = vectors
+        return padded.reshape(len(vectors), self.n_subspaces, width)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: numpy.ndarray,
+        n_lists: Optional[int] = None,
+        n_subspaces: int = 20,
+        iterations: int = 20,
+        seed: int = 0,
+    ) -> Self:
+        """
+        Construit l'index (étape hors ligne).
+
+        Parameters:
+            vectors: Les vecteurs à indexer (n x d, de norme 1), par exemple LatentSemanticIndex.document_embeddings.
+            n_lists: Le nombre de listes du fichier inversé. Si None, environ la racine carrée du nombre de vecteurs.
+            n_subspaces: Le nombre de sous-espaces de la quantification produit (octets par vecteur).
+            iterations: Le nombre d'itérations des k-means.
+            seed: Graine aléatoire, pour un résultat reproductible.
+        """
+        points = numpy.asarray(vectors, dtype=numpy.float32)
+        n_vectors, dimension = points.shape
+        random = numpy.random.default_rng(seed)
+        n_lists = max(1, min(n_lists or int(round(numpy.sqrt(n_vectors))), n_vectors))
+        n_subspaces = max(1, min(n_subspaces, dimension))
+        n_codes = min(256, n_vectors)
+
+        centroids = _kmeans(points, n_lists, iterations, random)
+        assignments = _assign(points, centroids)
+        list_rows = numpy.argsort(assignments, kind="stable")
+        list_indptr = numpy.zeros(n_lists + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(assignments, minlength=n_lists), out=list_indptr[1:])
+
+        width = -(-dimension // n_subspaces)
+        index = cls(
+            vectors, centroids, numpy.zeros((n_subspaces, n_codes, width), dtype=numpy.float32),
+            list_indptr, list_rows, numpy.zeros((n_vectors, n_subspaces), dtype=numpy.uint8),
+        )
+        residuals = index._split(points[list_rows] - centroids[assignments[list_rows]])
+        for subspace in range(n_subspaces):
+            index.codebooks[subspace] = _kmeans(residuals[:, subspace], n_codes, iterations, random)
+            index.codes[:, subspace] = _assign(residuals[:, subspace], index.codebooks[subspace])
+        return index
+
+    def search(
+        self,
+        query: numpy.ndarray,
+        k: int = 10,
+        n_probe: int = 8,
+        rerank: Optional[int] = None,
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Les k vecteurs de plus grand produit scalaire avec la requête (approché).
+
+        Parameters:
+            query: Le vecteur de la requête (d).
+            k: Le nombre de voisins à renvoyer.
+            n_probe: Le nombre de listes parcourues (plus il est grand, meilleur est le rappel).
+            rerank: Le nombre de candidats notés exactement (par défaut 4 * k).
+
+        Returns:
+            Les lignes des voisins et leurs scores exacts, par score décroissant.
+        """
+        query = numpy.asarray(query, dtype=numpy.float32)
+        if k <= 0:
+            return numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.float32)
+        coarse = self.centroids @ query
+        n_probe = min(n_probe, self.n_lists)
+        probes = numpy.argpartition(-coarse, n_probe - 1)[:n_probe]
+
+        # Table des produits scalaires requête / centroïdes de chaque sous-espace
+        table = numpy.einsum("md,mcd->mc", self._split(query[None])[0], self.codebooks)
+        subspaces = numpy.arange(self.n_subspaces)
+        positions = numpy.concatenate([numpy.arange(self.list_indptr[p], self.list_indptr[p + 1]) for p in probes])
+        lists = numpy.repeat(probes, self.list_indptr[probes + 1] - self.list_indptr[probes])
+        approximate = coarse[lists] + table[subspaces, self.codes[positions]].sum(axis=1)
+
+        rerank = min(max(rerank or 4 * k, k), len(positions))
+        if rerank < len(positions):
+            positions = positions[numpy.argpartition(-approximate, rerank - 1)[:rerank]]
+        rows = numpy.sort(self.list_rows[positions])
+        scores = numpy.asarray(self.vectors[rows] @ query)
+        order = numpy.lexsort((rows, -scores))[:k]
+        return rows[order], scores[order]
+
+    def recall(self, queries: numpy.ndarray, k: int = 10, **parameters) -> float:
+        """
+        Le rappel moyen de la recherche approchée : la part des k vrais plus proches voisins
+        (recherche exacte sur tous les vecteurs) retrouvés par search.
+
+        Parameters:
+            queries: Les vecteurs de requête (n x d).
+            k: Le nombre de voisins.
+            parameters: Les paramètres de search (n_probe, rerank).
+        """
+        found = 0
+        for query in numpy.asarray(queries, dtype=numpy.float32):
+            exact = numpy.asarray(self.vectors @ query)
+            expected = numpy.argpartition(-exact, min(k, len(exact)) - 1)[:k]
+            found += len(numpy.intersect1d(expected, self.search(query, k, **parameters)[0]))
+        return found / (len(queries) * min(k, len(self.vectors))) if len(queries) else 1.0
+
+    def save(self, folder: str) -> None:
+        """
+        Sauvegarde l'index (sans les vecteurs d'origine, sauvegardés à part) dans un dossier.
+        """
+        os.makedirs(folder, exist_ok=True)
+        numpy.savez(
+            os.path.join(folder, self.FILE), centroids=self.centroids, codebooks=self.codebooks,
+            list_indptr=self.list_indptr, list_rows=self.list_rows, codes=self.codes,
+        )
+
+    @classmethod
+    def exists(cls, folder: str) -> bool:
+        return os.path.exists(os.path.join(folder, cls.FILE))
+
+    @classmethod
+    def load(cls, folder: str, vectors: numpy.ndarray) -> Self:
+        """
+        Charge un index sauvegardé par save.
+
+        Parameters:
+            folder: Le dossier de l'index.
+            vectors: Les vecteurs indexés (éventuellement un numpy.memmap).
+        """
+        with numpy.load(os.path.join(folder, cls.FILE)) as arrays:
+            return cls(vectors, **{name: arrays[name] for name in arrays.files})
@@ -2,11 +2,17 @@ from typing import List, Dict, Set, Optional, Literal, Tuple, Union
 import pydantic
 import datetime
 import calendar  # Utilise pour monthrange
+import numpy
 
 from .document import Document
+from .corpus import Corpus
+from .lookup_tables import LookupTables
+from .search_hit import SearchHit, SearchHits
 from .base.inverted_index import InvertedIndex
 from .base.base_query import BaseQuery
 
+from .query_modules.planner import Predicate, QueryPlan
+from .query_modules.bm25 import BM25, Impacts
 from .scripts.query_parser import QueryParser
 
 
@@ -63,6 +69,18 @@ class Query(BaseQuery):
         default=False,
         description="Indique si l'article doit avoir une image."
     )
+    has_contact: bool = pydantic.Field(
+        default=False,
+        description="Indique si l'article doit mentionner des informations de contact."
+    )
+    has_auteur: bool = pydantic.Field(
+        default=False,
+        description="Indique si l'article doit avoir un auteur renseigné."
+    )
+    has_legende: bool = pydantic.Field(
+        default=False,
+        description="Indique si l'article doit avoir au moins une image légendée."
+    )
     target_info: Literal['articles', 'rubriques'] = pydantic.Field(
         default='articles',
         description="Type d'information principal demandé ('articles' ou 'rubriques')."
@@ -112,6 +130,9 @@ class Query(BaseQuery):
         pydantic_input['title_terms'] = parser_output.get('title_terms', [])
         pydantic_input['title_operator'] = parser_output.get('title_operator')
         pydantic_input['has_image'] = parser_output.get('has_image', False)
+        pydantic_input['has_contact'] = parser_output.get('has_contact', False)
+        pydantic_input['has_auteur'] = parser_output.get('has_auteur', False)
+        pydantic_input['has_legende'] = parser_output.get('has_legende', False)
 
         pydantic_input['target_info'] = 'rubriques' if parser_output.get('return_fields') == ['rubric'] else 'articles'
 
@@ -249,6 +270,7 @@ class Query(BaseQuery):
                 - Interprète attentivement les expressions de date et de période : 'entre J1 et J2', 'après J', 'avant J', 'depuis AAAA', 'à partir de AAAA', 'en AAAA', 'le mois de M AAAA', 'l'année AAAA'. Détermine `date_start` et `date_end`. Normalise les dates au format AAAA-MM-JJ si possible, sinon AAAA-MM ou AAAA. Si seule une année est donnée (ex: 'en 2012'), utilise AAAA-01-01 pour `date_start` et AAAA-12-31 pour `date_end`. Pour 'après JJ/MM/AAAA', détermine la date de début appropriée. Pour 'à partir de AAAA', date_start est AAAA-01-01. Pour 'mois de Juin 2013', date_start=2013-06-01, date_end=2013-06-30.
                 - Si des mots spécifiques sont requis explicitement dans le *titre* (ex: "titre contient X", "dont le titre traite de Y"), utilise le champ `title_terms`. Ne mets pas ces mots dans `content_terms` sauf s'ils sont aussi des sujets généraux.
                 - Si la présence d'une *image* est explicitement mentionnée comme requise ("avec image", "contenant une image"), règle `has_image` à `true`. Sinon, laisse-le à `false`.
+                - De même, règle `has_contact`, `has_auteur` ou `has_legende` à `true` uniquement si la requête exige explicitement des contacts, un auteur ou une image légendée.
                 - Si la question principale de l'utilisateur est de savoir "quelles rubriques" contiennent quelque chose (ex: "Dans quelles rubriques trouve-t-on..."), règle `target_info` à 'rubriques'. Sinon, laisse la valeur par défaut 'articles'.
                 - Ignore les formules de politesse.
                 - Si la requête spécifie explicitement une EXCLUSION de période temporelle (ex: 'mais pas en juin', 'sauf décembre 2012', 'hormis la semaine du X au Y'), identifie cette période et ajoute-la à la liste `excluded_date_periods`. Essaie de normaliser au format 'AAAA-MM-JJ/AAAA-MM-JJ' si possible, sinon 'AAAA-MM' ou 'AAAA'. Par exemple, 'pas en juin 2012' devrait devenir '2012-06'. 'entre 2012 et 2014 sauf l'été 2013' pourrait générer date_start='2012-01-01', date_end='2014-12-31', excluded_date_periods=['2013-06-21/2013-09-22'].
@@ -267,51 +289,85 @@ class Query(BaseQuery):
         return pydantic_query
 
     @staticmethod
-    def _get_doc_ids_for_terms(
+    def _field_zone(field_name: str, tables: LookupTables) -> Optional[str]:
+        """Nom de la zone d'index utilisée pour un champ de la requête ('content' -> 'texte', 'title' -> 'titre')."""
+        fallbacks = {'content': 'texte', 'title': 'titre'}
+        for zone in (field_name, fallbacks.get(field_name)):
+            if zone and tables.index.get(zone):
+                return zone
+        return None
+
+    @staticmethod
+    def _field_zones(field_name: str, tables: LookupTables, multi_field: bool = False) -> List[str]:
+        """
+        Zones d'index consultées pour un champ de la requête.
+        En mode multi-champs, le contenu est cherché à la fois dans le texte, le titre et les légendes.
+        """
+        field_names = ['content', 'title', 'legendes'] if multi_field and field_name == 'content' else [field_name]
+        return [zone for zone in dict.fromkeys(Query._field_zone(name, tables) for name in field_names) if zone]
+
+    @staticmethod
+    def _terms_predicate(
+            name: str,
             terms: List[str],
             operator: Optional[Literal['AND', 'OR']],
             field_name: str,
             default_operator_if_none: Literal['AND', 'OR'],
-            index: Dict[str, InvertedIndex],
-            all_doc_ids_in_corpus: Set[str],
-            debug: bool = False
-    ) -> Set[str]:
-        """Récupère les IDs de documents pour des termes donnés dans un champ indexé."""
-        if not terms:
-            return all_doc_ids_in_corpus
-
-        field_idx: Optional[InvertedIndex] = None
-        actual_field_name_used = field_name
-
-        if field_name == 'content':
-            field_idx = index.get('content')
-            if not field_idx:
-                field_idx = index.get('texte')
-                if field_idx: actual_field_name_used = 'texte'
-        elif field_name == 'title':
-            field_idx = index.get('title')
-            if not field_idx:
-                field_idx = index.get('titre')
-                if field_idx: actual_field_name_used = 'titre'
-        else:
-            field_idx = index.get(field_name)
-
-        if not field_idx:
-            if debug: print(f"Search_Helper: Index for field '{field_name}' (tried '{actual_field_name_used}') not found. No results for this criterion.")
-            return set()
+            tables: LookupTables,
+            negated: bool = False,
+            debug: bool = False,
+            multi_field: bool = False,
+    ) -> Predicate:
+        """
+        Critère sur des termes d'un champ indexé (d'une des zones du champ en mode multi-champs).
+        La sélectivité est estimée à partir de la longueur des listes de documents de chaque terme.
+        """
+        zones = Query._field_zones(field_name, tables, multi_field)
+        if not zones:
+            if debug: print(f"Search_Helper: Index for field '{field_name}' not found. No results for this criterion.")
+            return Predicate(name, 0, lambda candidates: 0, negated)
 
         effective_operator = operator
         if effective_operator is None:
             effective_operator = default_operator_if_none if len(terms) > 1 else 'AND'
+        lengths = {term: tables.field_posting_length(zones, term) for term in terms}
 
         if effective_operator == 'AND':
-            return set(field_idx.find_docs(terms))
+            ordered_terms = sorted(lengths, key=lengths.get)  # Intersections du terme le plus rare au plus fréquent
+
+            def select(candidates: Optional[int]) -> int:
+                result = candidates if candidates is not None else tables.all_documents
+                for term in ordered_terms:
+                    result &= tables.field_postings(zones, term)
+                    if not result:
+                        break
+                return result
+
+            return Predicate(name, min(lengths.values()), select, negated)
+
         elif effective_operator == 'OR':
-            current_term_doc_ids = set()
-            for term in terms:
-                current_term_doc_ids.update(field_idx.get(term, []))
-            return current_term_doc_ids
-        return set()
+            def select(candidates: Optional[int]) -> int:
+                result = 0
+                for term in terms:
+                    result |= tables.field_postings(zones, term)
+                return result & candidates if candidates is not None else result
+
+            return Predicate(name, min(sum(lengths.values()), len(tables)), select, negated)
+
+        return Predicate(name, 0, lambda candidates: 0, negated)
+
+    @staticmethod
+    def _bitmap_predicate(name: str, bitmap: int, negated: bool = False) -> Predicate:
+        """
+        Critère dont les documents sont déjà connus sous forme de bitmap (rubriques, attributs, dates...).
+        Son estimation est exacte et son évaluation est une seule opération ensembliste.
+        """
+        return Predicate(
+            name,
+            bitmap.bit_count(),
+            lambda candidates: bitmap & candidates if candidates is not None else bitmap,
+            negated,
+        )
 
     @staticmethod
     def _parse_excluded_period_str(period_str: str, default_tz: datetime.tzinfo, debug: bool = False) -> Optional[
@@ -341,138 +397,219 @@ class Query(BaseQuery):
             if debug: print(f"Error parsing excluded period string '{period_str}': {e}")
         return None
 
-    def search(self, documents: Dict[str, Document], index: Dict[str, InvertedIndex], debug: bool = False) -> Union[List[Document], List[str]]:
+    def plan(self, tables: LookupTables, debug: bool = False, multi_field: bool = False) -> QueryPlan:
         """
-        Exécute une recherche basée sur les critères de la requête.
-
-        Args:
-            documents: Dictionnaire des documents par ID.
-            index: Dictionnaire des index inversés par nom de champ ('content', 'rubric', 'title').
-            debug: Active les messages de débogage.
-
-        Returns:
-            Une liste de Document objects ou une liste de chaînes de rubriques
-            selon la valeur de `target_info`.
+        Traduit la requête en un plan d'exécution dont les critères sont ordonnés
+        selon leur sélectivité estimée (listes de documents de l'index, histogrammes des attributs).
+        En mode multi-champs, les termes du contenu peuvent apparaître dans le texte, le titre ou les légendes.
         """
-        if not documents:
-            return []
-
-        all_doc_ids_in_corpus = set(documents.keys())
-        candidate_doc_ids: Set[str] = all_doc_ids_in_corpus.copy()
+        predicates: List[Predicate] = []
+        default_tz = datetime.timezone.utc
 
-        # 1. Filtres par termes positifs (Content, Rubric, Title)
+        # 1. Critères positifs sur les termes (Content, Rubric, Title)
         if self.content_terms:
-            content_ids = self._get_doc_ids_for_terms(
-                self.content_terms, self.content_operator, 'content', 'AND', index, all_doc_ids_in_corpus, debug
-            )
-            candidate_doc_ids.intersection_update(content_ids)
-            if debug: print(f"Search: After content_terms: {len(candidate_doc_ids)} candidates.")
+            predicates.append(self._terms_predicate(
+                'content_terms', self.content_terms, self.content_operator, 'content', 'AND', tables,
+                debug=debug, multi_field=multi_field
+            ))
 
         if self.rubric_terms:
             # Note: La recherche par rubrique utilise une correspondance de sous-chaîne sur l'attribut `rubrique`
             # du document, et non un index inversé, pour permettre des recherches plus flexibles.
-            rubric_matched_ids = set()
+            # La correspondance est évaluée une fois par rubrique distincte du dictionnaire des rubriques.
             effective_rubric_op = self.rubric_operator if self.rubric_operator is not None else ('OR' if len(self.rubric_terms) > 1 else 'AND')
             query_rubrics_lower = [term.lower() for term in self.rubric_terms]
-
-            for doc_id in candidate_doc_ids.copy(): # Itérer sur une copie si des suppressions directes étaient envisagées
-                doc = documents.get(doc_id)
-                if not doc or not doc.rubrique:
-                    continue
-                doc_rubric_lower = doc.rubrique.lower()
-
-                match = False
-                if effective_rubric_op == 'OR':
-                    if any(query_term in doc_rubric_lower for query_term in query_rubrics_lower):
-                        match = True
-                elif effective_rubric_op == 'AND':
-                    if all(query_term in doc_rubric_lower for query_term in query_rubrics_lower):
-                        match = True
-                if match:
-                    rubric_matched_ids.add(doc_id)
-
-            candidate_doc_ids.intersection_update(rubric_matched_ids)
-            if debug: print(f"Search: After rubric_terms: {len(candidate_doc_ids)} candidates.")
+            match = any if effective_rubric_op == 'OR' else all
+            predicates.append(self._bitmap_predicate('rubric_terms', tables.rubric_postings(query_rubrics_lower, match)))
 
         if self.title_terms:
-            title_ids = self._get_doc_ids_for_terms(
-                self.title_terms, self.title_operator, 'title', 'AND', index, all_doc_ids_in_corpus, debug
-            )
-            candidate_doc_ids.intersection_update(title_ids)
-            if debug: print(f"Search: After title_terms: {len(candidate_doc_ids)} candidates.")
-
-        # 2. Filtres par termes négatifs
-        if self.negated_content_terms:
-            ids_to_exclude = set()
-            neg_content_idx = index.get('content')
-            if not neg_content_idx: # <--- AJOUT DE CETTE VÉRIFICATION ET FALLBACK
-                neg_content_idx = index.get('texte')
-            if neg_content_idx:
-                for neg_expression in self.negated_content_terms:
-                    sub_terms = [st.lower() for st in neg_expression.split()]
-                    if sub_terms:
-                        ids_to_exclude.update(neg_content_idx.find_docs(sub_terms))
-            candidate_doc_ids.difference_update(ids_to_exclude)
-            if debug: print(f"Search: After negated_content_terms: {len(candidate_doc_ids)} candidates.")
+            predicates.append(self._terms_predicate(
+                'title_terms', self.title_terms, self.title_operator, 'title', 'AND', tables, debug=debug
+            ))
+
+        # 2. Critères négatifs
+        # Les termes exclus ne sont cherchés que dans le texte, même en mode multi-champs :
+        # "sans X" n'écarte pas un document qui ne mentionne X que dans son titre ou ses légendes
+        for neg_expression in self.negated_content_terms:
+            sub_terms = [st.lower() for st in neg_expression.split()]
+            if sub_terms and self._field_zone('content', tables):
+                predicates.append(self._terms_predicate(
+                    f"negated_content_terms[{neg_expression}]", sub_terms, 'AND', 'content', 'AND', tables,
+                    negated=True, debug=debug
+                ))
 
         if self.negated_rubric_terms:
-            ids_to_exclude = set()
             query_neg_rubrics_lower = [term.lower() for term in self.negated_rubric_terms]
-            for doc_id in candidate_doc_ids.copy():
-                doc = documents.get(doc_id)
-                if not doc or not doc.rubrique:
-                    continue
-                doc_rubric_lower = doc.rubrique.lower()
-                if any(neg_term in doc_rubric_lower for neg_term in query_neg_rubrics_lower):
-                    ids_to_exclude.add(doc_id)
-            candidate_doc_ids.difference_update(ids_to_exclude)
-            if debug: print(f"Search: After negated_rubric_terms: {len(candidate_doc_ids)} candidates.")
-
-        # 3. Filtres sur les attributs des documents
-        final_results: List[Document] = []
-        default_tz = datetime.timezone.utc
+            predicates.append(self._bitmap_predicate('negated_rubric_terms', tables.rubric_postings(query_neg_rubrics_lower), negated=True))
+
+        # 3. Critères sur les attributs des documents
+        for flag, bitmap in tables.flags.items():
+            if getattr(self, flag, False):
+                predicates.append(self._bitmap_predicate(flag, bitmap))
+
+        if self.date_start or self.date_end or self.excluded_date_periods:
+            # Les périodes exclues sont analysées une seule fois, puis la période entière
+            # est résolue en plages de la colonne des dates triées (recherche dichotomique).
+            excluded_periods = [
+                parsed_period for parsed_period in (
+                    self._parse_excluded_period_str(period_str, default_tz, debug) for period_str in self.excluded_date_periods
+                ) if parsed_period
+            ]
+            date_ranges = tables.date_ranges(self.date_start, self.date_end, excluded_periods)
+            date_postings = tables.date_postings(date_ranges)
+            # Les documents sans date ne passent que s'il n'y a pas de bornes (seulement des exclusions)
+            if not (self.date_start or self.date_end):
+                date_postings |= tables.undated
+            predicates.append(self._bitmap_predicate('dates', date_postings))
+
+        return QueryPlan(predicates)
+
+    def _candidates(self, tables: LookupTables, debug: bool = False, multi_field: bool = False) -> int:
+        """Bitmap des documents qui satisfont tous les critères de la requête."""
+        candidates = self.plan(tables, debug=debug, multi_field=multi_field).execute(universe=tables.all_documents, debug=debug)
+        if debug: print(f"Search: Final results count: {candidates.bit_count()}")
+        return candidates
+
+    def impacts(self, tables: LookupTables, scorer: BM25, multi_field: bool = False) -> List[Impacts]:
+        """
+        Contributions au score de pertinence de chaque terme de la requête :
+        les termes du contenu et les termes du titre, chacun dans sa zone.
+        En mode multi-champs, les termes du contenu sont notés par BM25F sur le texte, le titre et les légendes.
+        """
+        impacts: List[Impacts] = []
+        if multi_field:
+            zones = self._field_zones('content', tables, multi_field)
+            impacts += [scorer.field_impacts(zones, term) for term in dict.fromkeys(self.content_terms)]
+        else:
+            zone_impacts = scorer.impacts.get(self._field_zone('content', tables), {})
+            impacts += [zone_impacts[term] for term in dict.fromkeys(self.content_terms) if term in zone_impacts]
+        zone_impacts = scorer.impacts.get(self._field_zone('title', tables), {})
+        impacts += [zone_impacts[term] for term in dict.fromkeys(self.title_terms) if term in zone_impacts]
+        return impacts
 
-        for doc_id in candidate_doc_ids:
-            doc = documents.get(doc_id)
-            if not doc: continue
-
-            if self.has_image and not (doc.images and any(img.url for img in doc.images if img.url)):
-                if debug: print(f"Search: Doc {doc_id} excluded by has_image=True.")
-                continue
-
-            doc_date = doc.date
-            if doc_date and doc_date.tzinfo is None:
-                doc_date = doc_date.replace(tzinfo=default_tz)
-
-            if self.date_start and (not doc_date or doc_date < self.date_start):
-                if debug: print(f"Search: Doc {doc_id} excluded by date_start {self.date_start}.")
-                continue
-
-            if self.date_end and (not doc_date or doc_date > self.date_end):
-                if debug: print(f"Search: Doc {doc_id} excluded by date_end {self.date_end}.")
-                continue
-
-            if doc_date and self.excluded_date_periods:
-                excluded_by_period_flag = False
-                for period_str in self.excluded_date_periods:
-                    parsed_period = self._parse_excluded_period_str(period_str, default_tz)
-                    if parsed_period and parsed_period[0] <= doc_date <= parsed_period[1]:
-                        if debug: print(f"Search: Doc {doc_id} excluded by period '{period_str}'.")
-                        excluded_by_period_flag = True
-                        break
-                if excluded_by_period_flag:
-                    continue
+    def scores(self, tables: LookupTables, scorer: BM25, candidates: int, multi_field: bool = False) -> numpy.ndarray:
+        """
+        Scores de pertinence BM25 des candidats, indexés par numéro interne (voir Query.impacts).
+        """
+        return scorer.accumulate(self.impacts(tables, scorer, multi_field), candidates)
+
+    def hits(
+            self,
+            documents: Union[Dict[str, Document], Corpus],
+            index: Dict[str, InvertedIndex],
+            debug: bool = False,
+            tables: Optional[LookupTables] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            ascending: bool = False,
+            scorer: Optional[BM25] = None,
+            order_by: Literal['date', 'pertinence'] = 'date',
+            multi_field: bool = False,
+    ) -> SearchHits:
+        """
+        Exécute la recherche et renvoie une page de résultats légers, notés si un scorer est fourni.
+        Triés par date, le bitmap des résultats est simplement parcouru dans l'ordre chronologique
+        (voir LookupTables.by_date), sans tri. Triés par pertinence avec une limite, seuls les
+        offset + limit meilleurs sont calculés et triés (MaxScore, voir BM25.max_score).
+        Aucun Document n'est lu avant l'affichage de la page.
+
+        Args:
+            documents: Dictionnaire des documents par ID, ou directement le Corpus.
+            index: Dictionnaire des index inversés par nom de champ ('content', 'rubric', 'title').
+            debug: Active les messages de débogage.
+            tables: Structures précalculées sur les documents (voir SearchEngine).
+            offset: Nombre de résultats à sauter (pagination).
+            limit: Nombre maximal de résultats de la page. Si None, tous les résultats restants.
+            ascending: Si True, du plus ancien au plus récent. Sinon, du plus récent au plus ancien.
+            scorer: Le modèle BM25 du moteur (voir SearchEngine). Si None, tous les scores sont nuls.
+            order_by: 'date', ou 'pertinence' pour trier par score décroissant (puis par date, selon ascending).
+            multi_field: Si True, les termes du contenu sont cherchés et notés (BM25F) dans toutes les zones.
+
+        Returns:
+            Les résultats de la page, avec le nombre total de résultats dans l'attribut total.
+        """
+        if not documents:
+            return SearchHits()
+
+        if tables is None:
+            tables = LookupTables(documents, index)
+
+        candidates = self._candidates(tables, debug=debug, multi_field=multi_field)
+        # Les numéros internes suivent l'ordre chronologique : aucun tri n'est nécessaire
+        numbers = tables.by_date(candidates, ascending=ascending)
+
+        if scorer is not None and order_by == 'pertinence':
+            if limit is not None:
+                # Seuls les offset + limit meilleurs sont calculés et triés (à score égal, l'ordre chronologique est conservé)
+                numbers, page_scores = scorer.max_score(self.impacts(tables, scorer, multi_field), numbers, offset + limit)
+                numbers, page_scores = numbers[offset:], page_scores[offset:]
+            else:
+                # Tri stable : à score égal, l'ordre chronologique est conservé
+                scores = self.scores(tables, scorer, candidates, multi_field)
+                numbers = numbers[numpy.argsort(-scores[numbers], kind='stable')][offset:]
+                page_scores = scores[numbers]
+        else:
+            # Triés par date : seuls les documents de la page sont notés (aucun pour un simple comptage, limit=0)
+            numbers = numbers[offset:] if limit is None else numbers[offset:offset + limit]
+            if scorer is not None and len(numbers):
+                page_scores = scorer.scores_of(self.impacts(tables, scorer, multi_field), numbers)
+            else:
+                page_scores = numpy.zeros(len(numbers))
+        selected = [(float(score), number) for score, number in zip(page_scores, numbers)]
+
+        return SearchHits(
+            (SearchHit(tables.doc_ids[number], score, documents=tables.documents) for score, number in selected),
+            total=candidates.bit_count(),
+        )
+
+    def search(
+            self,
+            documents: Union[Dict[str, Document], Corpus],
+            index: Dict[str, InvertedIndex],
+            debug: bool = False,
+            tables: Optional[LookupTables] = None,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            scorer: Optional[BM25] = None,
+            order_by: Literal['date', 'pertinence'] = 'date',
+            multi_field: bool = False,
+    ) -> Union[List[Document], List[str]]:
+        """
+        Exécute une recherche basée sur les critères de la requête.
+        Les critères sont exécutés du plus sélectif au moins sélectif (voir Query.plan),
+        et la recherche s'arrête dès que plus aucun document ne peut correspondre.
 
-            final_results.append(doc)
+        Args:
+            documents: Dictionnaire des documents par ID, ou directement le Corpus
+                (dont la table id -> position évite de reconstruire un dictionnaire à chaque requête).
+            index: Dictionnaire des index inversés par nom de champ ('content', 'rubric', 'title').
+            debug: Active les messages de débogage.
+            tables: Structures précalculées sur les documents (voir SearchEngine).
+                Si None, elles sont calculées pour cette seule requête.
+            offset: Nombre de résultats à sauter (pagination).
+            limit: Nombre maximal de résultats renvoyés. Si None, tous les résultats restants.
+            scorer: Le modèle BM25 du moteur, nécessaire au tri par pertinence (voir Query.hits pour les scores).
+            order_by: 'date' (du plus récent au plus ancien) ou 'pertinence' (score BM25 décroissant).
+            multi_field: Si True, les termes du contenu sont cherchés dans le texte, le titre et les légendes.
+
+        Returns:
+            Une liste de Document objects ou une liste de chaînes de rubriques
+            selon la valeur de `target_info`.
+        """
+        if not documents:
+            return []
 
-        if debug: print(f"Search: Final results count: {len(final_results)}")
+        if tables is None:
+            tables = LookupTables(documents, index)
 
         if self.target_info == 'rubriques':
-            rubric_set: Set[str] = {doc_item.rubrique for doc_item in final_results if doc_item.rubrique}
-            return sorted(list(rubric_set))
+            candidates = self._candidates(tables, debug=debug, multi_field=multi_field)
+            rubric_set: Set[str] = {doc_item.rubrique for doc_item in tables.documents_of(candidates) if doc_item and doc_item.rubrique}
+            rubrics = sorted(list(rubric_set))
+            return rubrics[offset:offset + limit] if limit is not None else rubrics[offset:]
         else:
-            final_results.sort(
-                key=lambda d: d.date if d.date else datetime.datetime.min.replace(tzinfo=default_tz),
-                reverse=True
+            hits = self.hits(
+                documents, index, debug=debug, tables=tables, offset=offset, limit=limit, scorer=scorer, order_by=order_by,
+                multi_field=multi_field,
             )
-            return final_results
\ No newline at end of file
+            return [hit.document for hit in hits if hit.document]
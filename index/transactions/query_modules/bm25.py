@@ -0,0 +1,316 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import math
+
+import numpy
+
+from ..lookup_tables import LookupTables
+from ..analyzer import Analyzer
+from ..base import bitmaps
+
+
+# (numéros des documents par ordre croissant, contribution d'un terme à ces documents, contribution maximale)
+Impacts = Tuple[numpy.ndarray, numpy.ndarray, float]
+
+
+class BM25:
+    """
+    Score de pertinence BM25 des documents, calculé zone par zone sur les index inversés,
+    ou sur plusieurs zones à la fois avec des poids par zone (BM25F, voir field_scores).
+
+    Les fréquences des termes et la longueur de chaque document dans chaque zone
+    sont calculées une seule fois à la construction, et l'IDF de chaque terme est mis en cache :
+    noter une requête ne demande alors qu'un passage sur les listes de documents de ses termes.
+
+    La contribution de chaque terme à chaque document (son "impact") est aussi précalculée :
+    noter les candidats revient à additionner ces tableaux, et top_k n'en trie que les k meilleurs.
+    Avec une limite, max_score s'appuie sur la contribution maximale de chaque terme pour ne lire
+    entièrement que les listes des termes qui peuvent encore changer le top-k.
+    """
+    # Poids par défaut de chaque zone en BM25F (un mot du titre compte double)
+    BOOSTS: Dict[str, float] = {"titre": 2.0, "title": 2.0, "texte": 1.0, "content": 1.0, "legendes": 1.0}
+
+    def __init__(
+        self,
+        tables: LookupTables,
+        substitutions: Optional[Dict[str, str]] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        boosts: Optional[Dict[str, float]] = None,
+        analyzer: Optional[Analyzer] = None,
+    ):
+        """
+        Parameters:
+            tables: Les structures précalculées du moteur (numéros internes des documents, index par zone).
+            substitutions: La table "mot: lemme" (ou "mot: stem") utilisée pour construire l'index,
+                qui ramène les mots des documents aux termes de l'index. Si None, les mots sont gardés tels quels.
+            k1: Saturation de la fréquence des termes.
+            b: Importance de la normalisation par la longueur du document.
+            boosts: Poids de chaque zone en BM25F, qui complètent (ou remplacent) BM25.BOOSTS.
+            analyzer: La chaîne d'analyse qui a produit l'index (voir Analyzer). Si fournie, les fréquences et
+                les longueurs sont comptées sur ses tokens (comme l'index), et substitutions n'est pas utilisée.
+        """
+        self.tables = tables
+        self.k1 = k1
+        self.b = b
+        self.boosts: Dict[str, float] = {**self.BOOSTS, **(boosts or {})}
+        substitutions = substitutions or {}
+
+        # zone: terme: (numéros des documents, fréquences du terme dans ces documents)
+        self.postings: Dict[str, Dict[str, Tuple[numpy.ndarray, numpy.ndarray]]] = {}
+        # zone: nombre de termes indexés de chaque document, par numéro
+        self.lengths: Dict[str, numpy.ndarray] = {}
+        # zone: 1 - b + b * longueur / longueur moyenne, la normalisation propre à chaque document
+        self._norms: Dict[str, numpy.ndarray] = {}
+        self._idf: Dict[Tuple[str, str], float] = {}
+        self._field_idf: Dict[Tuple[Tuple[str, ...], str], float] = {}
+        # zone: terme: (numéros des documents, contribution BM25 du terme à ces documents, contribution maximale)
+        self.impacts: Dict[str, Dict[str, Impacts]] = {}
+        self._field_impacts: Dict[Tuple[Tuple[str, ...], str], Impacts] = {}
+
+        # Tokens de chaque document, dans le vocabulaire de l'index
+        zones = list(tables.index)
+        if analyzer is not None:
+            document_tokens = [analyzer.document_tokens(tables.documents.get(doc_id), zones) for doc_id in tables.doc_ids]
+        else:
+            document_tokens = [tables.documents.get(doc_id).tokens for doc_id in tables.doc_ids]
+
+        for zone, index in tables.index.items():
+            frequencies: Dict[str, Dict[int, int]] = {}
+            lengths = numpy.zeros(len(tables), dtype=numpy.float64)
+
+            for number, tokens in enumerate(document_tokens):
+                for word, count in tokens.get(zone, {}).items():
+                    term = word if analyzer is not None else substitutions.get(word) or word
+                    if term not in index:
+                        continue
+                    term_frequencies = frequencies.setdefault(term, {})
+                    term_frequencies[number] = term_frequencies.get(number, 0) + count
+                    lengths[number] += count
+
+            self.postings[zone] = {
+                term: (
+                    numpy.fromiter(term_frequencies.keys(), dtype=numpy.int64, count=len(term_frequencies)),
+                    numpy.fromiter(term_frequencies.values(), dtype=numpy.float64, count=len(term_frequencies)),
+                )
+                for term, term_frequencies in frequencies.items()
+            }
+            self.lengths[zone] = lengths
+            average_length = lengths.mean() if len(lengths) and lengths.mean() > 0 else 1.0
+            self._norms[zone] = 1 - b + b * lengths / average_length
+
+            self.impacts[zone] = {}
+            for term, (numbers, term_frequencies) in self.postings[zone].items():
+                impacts = self.idf(zone, term) * term_frequencies * (k1 + 1) / (term_frequencies + k1 * self._norms[zone][numbers])
+                self.impacts[zone][term] = (numbers, impacts, float(impacts.max()))
+
+    def document_frequency(self, zone: str, term: str) -> int:
+        """
+        Nombre de documents qui contiennent le terme dans la zone.
+        """
+        numbers, _ = self.postings.get(zone, {}).get(term, ((), ()))
+        return len(numbers)
+
+    def idf(self, zone: str, term: str) -> float:
+        """
+        IDF BM25 du terme dans la zone (toujours positive), mise en cache.
+        """
+        key = (zone, term)
+        idf = self._idf.get(key)
+        if idf is None:
+            df = self.document_frequency(zone, term)
+            idf = math.log(1 + (len(self.tables) - df + 0.5) / (df + 0.5))
+            self._idf[key] = idf
+        return idf
+
+    def scores(self, zone: Optional[str], terms: Iterable[str], candidates: int) -> numpy.ndarray:
+        """
+        Scores BM25 des documents candidats pour les termes dans la zone.
+
+        Parameters:
+            zone: La zone de l'index. Si None ou inconnue, tous les scores sont nuls.
+            terms: Les termes de la requête, déjà normalisés pour l'index.
+            candidates: Le bitmap des documents à noter (les autres gardent un score nul).
+
+        Returns:
+            Le tableau des scores de tous les documents, indexé par numéro interne.
+        """
+        impacts = self.impacts.get(zone)
+        if not impacts:
+            return numpy.zeros(len(self.tables), dtype=numpy.float64)
+        # Chaque terme distinct n'est compté qu'une fois
+        return self.accumulate([impacts[term] for term in dict.fromkeys(terms) if term in impacts], candidates)
+
+    def field_idf(self, zones: Sequence[str], term: str) -> float:
+        """
+        IDF BM25F du terme : les documents qui le contiennent dans au moins une des zones, mise en cache.
+        """
+        key = (tuple(zones), term)
+        idf = self._field_idf.get(key)
+        if idf is None:
+            numbers = [self.postings[zone][term][0] for zone in zones if term in self.postings.get(zone, {})]
+            df = len(numpy.unique(numpy.concatenate(numbers))) if numbers else 0
+            idf = math.log(1 + (len(self.tables) - df + 0.5) / (df + 0.5))
+            self._field_idf[key] = idf
+        return idf
+
+    def field_impacts(self, zones: Sequence[str], term: str) -> Impacts:
+        """
+        Contribution BM25F du terme à chaque document qui le contient dans au moins une des zones, mise en cache.
+        Les fréquences de toutes les zones sont normalisées par la longueur de la zone, pondérées par
+        le poids de la zone (self.boosts) et additionnées avant la saturation BM25 : les listes de documents
+        des zones sont fusionnées en un seul parcours, au lieu d'une recherche par zone.
+
+        Returns:
+            (numéros des documents par ordre croissant, contribution du terme à ces documents, contribution maximale)
+        """
+        zones = tuple(zone for zone in zones if zone in self.postings and self.boosts.get(zone, 0) > 0)
+        key = (zones, term)
+        impacts = self._field_impacts.get(key)
+        if impacts is None:
+            postings = [(zone, *self.postings[zone][term]) for zone in zones if term in self.postings[zone]]
+            if not postings:
+                impacts = (numpy.empty(0, dtype=numpy.int64), numpy.empty(0, dtype=numpy.float64), 0.0)
+            else:
+                numbers = numpy.concatenate([zone_numbers for _, zone_numbers, _ in postings])
+                weights = numpy.concatenate([
+                    self.boosts[zone] * frequencies / self._norms[zone][zone_numbers]
+                    for zone, zone_numbers, frequencies in postings
+                ])
+                numbers, inverse = numpy.unique(numbers, return_inverse=True)
+                frequencies = numpy.bincount(inverse, weights=weights)
+                term_impacts = self.field_idf(zones, term) * frequencies * (self.k1 + 1) / (frequencies + self.k1)
+                impacts = (numbers, term_impacts, float(term_impacts.max()))
+            self._field_impacts[key] = impacts
+        return impacts
+
+    def field_scores(self, zones: Sequence[str], terms: Iterable[str], candidates: int) -> numpy.ndarray:
+        """
+        Scores BM25F des documents candidats (voir field_impacts).
+
+        Parameters:
+            zones: Les zones de l'index à combiner.
+            terms: Les termes de la requête, déjà normalisés pour l'index.
+            candidates: Le bitmap des documents à noter (les autres gardent un score nul).
+
+        Returns:
+            Le tableau des scores de tous les documents, indexé par numéro interne.
+        """
+        return self.accumulate([self.field_impacts(zones, term) for term in dict.fromkeys(terms)], candidates)
+
+    def accumulate(self, impacts: List[Impacts], candidates: int) -> numpy.ndarray:
+        """
+        Somme les contributions de plusieurs termes (voir impacts et field_impacts) pour les documents candidats.
+
+        Returns:
+            Le tableau des scores de tous les documents, indexé par numéro interne.
+        """
+        scores = numpy.zeros(len(self.tables), dtype=numpy.float64)
+        if not candidates:
+            return scores
+
+        is_candidate = numpy.zeros(len(self.tables), dtype=bool)
+        is_candidate[bitmaps.to_positions(candidates)] = True
+
+        for numbers, term_impacts, _ in impacts:
+            kept = is_candidate[numbers]
+            scores[numbers[kept]] += term_impacts[kept]
+
+        return scores
+
+    def scores_of(self, impacts: List[Impacts], numbers: numpy.ndarray) -> numpy.ndarray:
+        """
+        Les scores des seuls documents numbers (par exemple une page de résultats triés par date) :
+        chaque document est cherché par dichotomie dans la liste de chaque terme, sans noter les autres candidats.
+
+        Returns:
+            Le score de chaque document de numbers, dans le même ordre.
+        """
+        scores = numpy.zeros(len(numbers), dtype=numpy.float64)
+        for term_numbers, term_impacts, _ in impacts:
+            if not len(term_numbers) or not len(numbers):
+                continue
+            positions = numpy.minimum(numpy.searchsorted(term_numbers, numbers), len(term_numbers) - 1)
+            found = term_numbers[positions] == numbers
+            scores[found] += term_impacts[positions[found]]
+        return scores
+
+    def max_score(self, impacts: List[Impacts], numbers: numpy.ndarray, k: int) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Les k meilleurs documents sans noter tous les candidats (MaxScore, vectorisé par terme).
+
+        Les listes sont additionnées de la contribution maximale la plus forte à la plus faible. Dès que la
+        somme des contributions maximales des termes restants est inférieure au k-ième score partiel (un
+        minorant du k-ième score final), ces termes ne sont plus essentiels : un document qui ne contient
+        qu'eux ne peut pas entrer dans le top-k. Leurs contributions ne sont alors cherchées (par dichotomie,
+        voir scores_of) que pour les documents déjà vus dont le score partiel, plus ce reste, atteint le seuil.
+        Le résultat est celui de top_k sur les scores complets.
+
+        Parameters:
+            impacts: Les contributions des termes de la requête (voir impacts et field_impacts).
+            numbers: Les numéros des documents candidats, dans l'ordre de départage (par date).
+            k: Le nombre de documents à renvoyer.
+
+        Returns:
+            Les numéros des k meilleurs documents, par score décroissant, et leurs scores.
+        """
+        scores = numpy.zeros(len(self.tables), dtype=numpy.float64)
+        if k <= 0 or not len(numbers):
+            return numbers[:0], scores[:0]
+
+        is_candidate = numpy.zeros(len(self.tables), dtype=bool)
+        is_candidate[numbers] = True
+        impacts = sorted(impacts, key=lambda term: term[2], reverse=True)
+        # rests[i] : somme des contributions maximales des termes i, i + 1...
+        rests = numpy.append(numpy.cumsum([bound for _, _, bound in impacts][::-1])[::-1], 0.0)
+
+        essential, threshold = 0, 0.0
+        while essential < len(impacts):
+            term_numbers, term_impacts, _ = impacts[essential]
+            kept = is_candidate[term_numbers]
+            term_numbers = term_numbers[kept]
+            scores[term_numbers] += term_impacts[kept]
+            essential += 1
+            if essential == len(impacts):
+                break
+            # Le k-ième score partiel des documents de cette liste minore le k-ième score final
+            # (les scores ne font que croître), sans parcourir tous les documents
+            if len(term_numbers) >= k:
+                partial = scores[term_numbers]
+                threshold = max(threshold, numpy.partition(partial, len(partial) - k)[len(partial) - k])
+            if rests[essential] < threshold:
+                # Seuls les documents vus qui peuvent encore atteindre le seuil sont complétés et départagés
+                scored = numpy.flatnonzero(scores + rests[essential] >= threshold)
+                scores[scored] += self.scores_of(impacts[essential:], scored)
+                in_pool = numpy.zeros(len(self.tables), dtype=bool)
+                in_pool[scored] = True
+                numbers = numbers[in_pool[numbers]]
+                break
+        top = self.top_k(scores, numbers, k)
+        return top, scores[top]
+
+    @staticmethod
+    def top_k(scores: numpy.ndarray, numbers: numpy.ndarray, k: int) -> numpy.ndarray:
+        """
+        Les k documents de meilleur score parmi numbers, sans trier tous les candidats :
+        numpy.partition trouve le k-ième score, puis seuls les k documents retenus sont triés.
+        Le résultat est celui du tri stable complet (à score égal, l'ordre de numbers est conservé).
+
+        Parameters:
+            scores: Les scores de tous les documents, indexés par numéro interne (voir accumulate).
+            numbers: Les numéros des documents candidats, dans l'ordre de départage (par date).
+            k: Le nombre de documents à renvoyer.
+
+        Returns:
+            Les numéros des k meilleurs documents, par score décroissant.
+        """
+        keys = -scores[numbers]
+        if k <= 0:
+            return numbers[:0]
+        if len(keys) > k:
+            kth = numpy.partition(keys, k - 1)[k - 1]
+            better = numpy.flatnonzero(keys < kth)
+            ties = numpy.flatnonzero(keys == kth)[:k - len(better)]
+            positions = numpy.concatenate([better, ties])
+        else:
+            positions = numpy.arange(len(keys))
+        return numbers[positions[numpy.lexsort((positions, keys[positions]))]]
@@ -0,0 +1,71 @@
+from typing import Callable, Iterable, List, Optional
+from dataclasses import dataclass
+
+
+@dataclass
+class Predicate:
+    """
+    Un critère élémentaire d'une requête (termes du contenu, rubriques, dates, ...).
+    """
+    name: str
+    estimate: int  # Borne supérieure du nombre de documents qui satisfont le critère
+    select: Callable[[Optional[int]], int]  # bitmap des candidats (None = tout le corpus) -> bitmap des documents qui satisfont le critère
+    negated: bool = False  # Si True, les documents sélectionnés sont retirés du résultat
+
+
+class QueryPlan:
+    """
+    Ordonne les critères d'une requête selon leur sélectivité estimée
+    et les exécute en s'arrêtant dès que le résultat est vide.
+
+    Les critères positifs sont exécutés du plus sélectif au moins sélectif :
+    le premier produit l'ensemble initial, les suivants ne font que le filtrer,
+    si bien que le coût de la requête est proportionnel à son critère le plus sélectif.
+    Les critères négatifs ne sont évalués que sur les candidats restants.
+    """
+
+    def __init__(self, predicates: Iterable[Predicate]):
+        predicates = list(predicates)
+        self.positives: List[Predicate] = sorted((p for p in predicates if not p.negated), key=lambda p: p.estimate)
+        self.negatives: List[Predicate] = sorted((p for p in predicates if p.negated), key=lambda p: p.estimate, reverse=True)
+
+    def __repr__(self) -> str:
+        steps = [f"{p.name}(~{p.estimate})" for p in self.positives]
+        steps += [f"NOT {p.name}(~{p.estimate})" for p in self.negatives]
+        return f"QueryPlan({' -> '.join(steps)})"
+
+    def execute(self, universe: int, debug: bool = False) -> int:
+        """
+        Exécute le plan.
+
+        Parameters:
+            universe: Le bitmap de tous les documents, si aucun critère positif ne l'a réduit.
+            debug: Active les messages de débogage.
+
+        Returns:
+            Le bitmap des documents qui satisfont la requête.
+        """
+        if debug: print(f"Search: {self}")
+        candidates: Optional[int] = None
+
+        for predicate in self.positives:
+            if predicate.estimate == 0:
+                if debug: print(f"Search: {predicate.name} cannot match any document.")
+                return 0
+            candidates = predicate.select(candidates)
+            if debug: print(f"Search: After {predicate.name}: {candidates.bit_count()} candidates.")
+            if not candidates:
+                return 0
+
+        if candidates is None:
+            candidates = universe
+
+        for predicate in self.negatives:
+            if not candidates:
+                break
+            if predicate.estimate == 0:
+                continue
+            candidates &= ~predicate.select(candidates)
+            if debug: print(f"Search: After NOT {predicate.name}: {candidates.bit_count()} candidates.")
+
+        return candidates
@@ -1,7 +1,15 @@
+from typing import Dict, Iterable, Tuple
 import subprocess
 import sys
+import threading
 import spacy
 
+# Pipeline components that lemmatization does not need (the French lemmatizer only uses the POS tags)
+UNUSED_PIPES: Tuple[str, ...] = ("parser", "ner")
+
+_models: Dict[Tuple[str, Tuple[str, ...]], spacy.Language] = {}
+_lock = threading.Lock()
+
 
 def download_model(name: str) -> None:
     """
@@ -15,15 +23,32 @@ def download_model(name: str) -> None:
         print(f"spaCy model '{name}' downloaded successfully.")
     except subprocess.CalledProcessError as error:
         print(f"Error downloading spaCy model {name}:", error)
-        
 
-def get_spacy(model_name: str) -> spacy.Language:
-    """
-    A special class for managing the spaCy model download.
-    """
+
+def _load(model_name: str, exclude: Tuple[str, ...]) -> spacy.Language:
     try:
-        return spacy.load(model_name)
+        return spacy.load(model_name, exclude=list(exclude))
     except OSError:
         download_model(model_name)
-        return spacy.load(model_name)
-    
\ No newline at end of file
+        return spacy.load(model_name, exclude=list(exclude))
+
+
+def get_spacy(model_name: str, exclude: Iterable[str] = UNUSED_PIPES) -> spacy.Language:
+    """
+    Returns the spaCy model, loaded (and downloaded if needed) once per process.
+
+    The models are kept in a process-wide registry: later calls return the same pipeline, without
+    reloading it. The registry is thread-safe, so concurrent sessions (Streamlit) share one model.
+
+    Parameters:
+        model_name: The name of the spaCy model (e.g. "fr_core_news_sm").
+        exclude: The pipeline components that are not loaded (by default the parser and the NER).
+    """
+    key = (model_name, tuple(sorted(exclude)))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _models[key] = _load(model_name, key[1])
+    return model
@@ -1,11 +1,24 @@
 
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
+from functools import lru_cache
 
 import pandas
 
+from ..base.normalization_cache import NormalizationCache
+
+
+@lru_cache(maxsize=None)
+def _snowball(language: str = "french"):
+    """
+    The Snowball stemmer, built once per process.
+    """
+    from nltk.stem import SnowballStemmer
+    return SnowballStemmer(language)
+
 def spacy_lemmatize(text: str) -> List[str]:
     """
     Lemmatize the input text using spaCy.
+    The model is loaded once per process (see get_spacy), so this is a warm call after the first one.
     
     Args:
         text (str): The input text.
@@ -28,38 +41,79 @@ def snowball_stem(text: str) -> List[str]:
     Returns:
         List[str]: List of stemmed words.
     """
-    from nltk.stem import SnowballStemmer
-    stemmer = SnowballStemmer("french")
+    stemmer = _snowball("french")
     return [stemmer.stem(w) for w in text.split() if w.isalpha()]
 
-def spacy_lemmas(tokens: List[str]) -> pandas.DataFrame:
+def spacy_lemma_pairs(
+    tokens: Iterable[str],
+    batch_size: int = 1000,
+    n_process: int = 1,
+) -> Iterator[Tuple[str, str]]:
+    """
+    Lemmatize a vocabulary with spaCy, in batches and optionally across several processes.
+    
+    Each unique alphabetic word is sent once through nlp.pipe, in the order of its first occurrence,
+    and the (word, lemma) pairs are yielded as soon as their batch is processed.
+    
+    Parameters:
+        tokens (Iterable[str]): The input tokens (duplicates are lemmatized once).
+        batch_size (int): The number of words sent to the pipeline at a time.
+        n_process (int): The number of worker processes used by spaCy (-1 for all the cores).
+    
+    Returns:
+        Iterator[Tuple[str, str]]: The (word, lemma) pairs.
+    """
+    from .get_spacy import get_spacy
+    nlp = get_spacy("fr_core_news_sm")
+    words = list(dict.fromkeys(w for w in tokens if w.isalpha()))
+    # nlp.pipe keeps the order of its input, even with several processes
+    for word, doc in zip(words, nlp.pipe(words, batch_size=batch_size, n_process=n_process)):
+        yield word, doc[0].lemma_ if len(doc) else word
+
+def spacy_lemmas(
+    tokens: Iterable[str],
+    batch_size: int = 1000,
+    n_process: int = 1,
+    cache: Optional[NormalizationCache] = None,
+) -> pandas.DataFrame:
     """
     Create a DataFrame mapping each unique word in the input text to its spaCy lemma.
     
     Parameters:
         tokens (str): The input tokens.
+        batch_size (int): The number of words sent to the pipeline at a time (see spacy_lemma_pairs).
+        n_process (int): The number of worker processes used by spaCy.
+        cache (NormalizationCache): The persistent lemma cache. If given, only the words it does not hold yet
+            are lemmatized, and their lemmas are saved in it.
     
     Returns:
         pandas.DataFrame: DataFrame with columns ['word', 'stem'] where 'stem' is the spaCy lemma.
     """
-    from .get_spacy import get_spacy
-    nlp = get_spacy("fr_core_news_sm")
-    words = {w for w in tokens if w.isalpha()}
-    mapping = {word: doc[0].lemma_ for word, doc in zip(words, nlp.pipe(words)) if word.isalpha()}
-    return pandas.DataFrame(sorted(mapping.items()), columns=["word", "stem"])
+    if cache is not None:
+        pairs = cache.get_many(
+            (w for w in tokens if w.isalpha()),
+            lambda words: spacy_lemma_pairs(words, batch_size=batch_size, n_process=n_process),
+        ).items()
+    else:
+        pairs = spacy_lemma_pairs(tokens, batch_size=batch_size, n_process=n_process)
+    return pandas.DataFrame(sorted(pairs), columns=["word", "stem"])
 
-def snowball_stems(tokens: List[str]) -> pandas.DataFrame:
+def snowball_stems(tokens: List[str], cache: Optional[NormalizationCache] = None) -> pandas.DataFrame:
     """
     Create a DataFrame mapping each unique word in the input text to its Snowball stem.
     
     Parameters:
         tokens (str): The input tokens.
+        cache (NormalizationCache): The persistent stem cache. If given, only the words it does not hold yet
+            are stemmed, and their stems are saved in it.
     
     Returns:
         pandas.DataFrame: DataFrame with columns ['word', 'stem'] where 'stem' is the Snowball stem.
     """
-    from nltk.stem import SnowballStemmer
-    stemmer = SnowballStemmer("french")
+    stemmer = _snowball("french")
     words = {w for w in tokens if w.isalpha()}
-    mapping = {w: stemmer.stem(w) for w in words}
+    if cache is not None:
+        mapping = cache.get_many(words, lambda missing: ((w, stemmer.stem(w)) for w in missing))
+    else:
+        mapping = {w: stemmer.stem(w) for w in words}
     return pandas.DataFrame(sorted(mapping.items()), columns=["word", "stem"])
@@ -200,6 +200,25 @@ class QueryParser:
     _RUBRIC_TERM_CAPTURE_PATTERN = r"(\"(?:[^\"]+)\"|(?:[\w'-]+(?:[\s][\w'-]+){0,3}?))"
     _RUBRIC_LOOKAHEAD_PATTERN = r"(?=\s+et\s+(?:la\s+|de\s+la\s+|dans\s+la\s+)?rubrique|\s+ou\s+(?:la\s+|de\s+la\s+|dans\s+la\s+)?rubrique|\s+et|\s+ou|\s+qui|\s+parlant|\s+mentionnant|\s+contenant|publiés\s+en|écrit\s+en|paru\s+en|$|,|\.|\?|!|\(|\s+dans\s+le\s+domaine)"
 
+    # Demandes d'attributs de document (voir Query.has_contact, has_auteur, has_legende).
+    # Les images légendées sont cherchées avant `_extract_has_image`, qui consommerait "avec des images".
+    _DOCUMENT_FLAG_PATTERNS = {
+        "has_legende": [
+            r"\b(?:avec|contenant|comportant)\s+(?:une|des)\s+(?:images?|photos?)\s+l[ée]gend[ée]e?s?\b",
+            r"\b(?:avec|contenant|comportant)\s+(?:une|des)\s+l[ée]gendes?\b",
+            r"\b(?:qui\s+)?(?:a|ont)\s+(?:une|des)\s+(?:images?\s+l[ée]gend[ée]e?s?|l[ée]gendes?)\b",
+        ],
+        "has_contact": [
+            r"\b(?:avec|contenant|comportant|donnant)\s+(?:un|des|les)\s+(?:contacts?|coordonn[ée]es)\b",
+            r"\b(?:qui\s+)?(?:a|ont|donnent|donne|indiquent|indique)\s+(?:un|des|les)\s+(?:contacts?|coordonn[ée]es)\b",
+        ],
+        "has_auteur": [
+            r"\b(?:avec|ayant)\s+(?:un|des)\s+auteurs?\b",
+            r"\b(?:qui\s+)?(?:a|ont)\s+(?:un|des)\s+auteurs?\b",
+            r"\bdont\s+l'auteur\s+est\s+(?:connu|renseign[ée]|indiqu[ée])\b",
+        ],
+    }
+
     def __init__(self):
         """Initialise le parser avec sa configuration."""
         self.config = QueryParserConfig()
@@ -430,6 +449,20 @@ class QueryParser:
                 break
         return query_work
 
+    def _extract_document_flags(self, query_work: str, structured_query: dict) -> str:
+        """
+        Détecte les demandes d'articles avec contact, auteur ou image légendée.
+        Les clés correspondantes ne sont ajoutées à la requête structurée que si elles sont demandées.
+        """
+        for flag, flag_patterns in self._DOCUMENT_FLAG_PATTERNS.items():
+            for flag_pattern in flag_patterns:
+                match = re.search(flag_pattern, query_work, flags=self.config.REGEX_FLAGS_I)
+                if match:
+                    structured_query[flag] = True
+                    query_work = self._remove_and_cleanup_match_from_text(query_work, match)
+                    break
+        return query_work
+
     def _extract_negated_terms(self, query_work: str, structured_query: dict) -> str:
         """Extrait les termes de contenu niés (ex: "mais pas X") et les négations de mois."""
         # Capture de termes à nier (entre guillemets ou 1-3 mots).
@@ -901,7 +934,8 @@ class QueryParser:
         is_search_criteria_empty = not any([
             structured_query["content_terms"], structured_query["title_terms"],
             structured_query["rubric_terms"], structured_query["date_conditions"],
-            structured_query["negated_content_terms"], structured_query["has_image"]
+            structured_query["negated_content_terms"], structured_query["has_image"],
+            *(structured_query.get(flag, False) for flag in self._DOCUMENT_FLAG_PATTERNS)
         ])
 
         # Si aucun critère et pas de demande de champ spécifique (ex: juste "rubriques des articles").
@@ -998,9 +1032,10 @@ class QueryParser:
         # 1. Pré-traitement initial de la requête.
         query_work = self._preprocess_query_input(query_input)
 
-        # 2. Extractions spécifiques (champs à retourner, images, négations, dates).
+        # 2. Extractions spécifiques (champs à retourner, contact/auteur/légende, images, négations, dates).
         # L'ordre peut être important car chaque extraction modifie `query_work`.
         query_work = self._extract_return_fields(query_work, structured_query)
+        query_work = self._extract_document_flags(query_work, structured_query)
         query_work = self._extract_has_image(query_work, structured_query)
         query_work = self._extract_negated_terms(query_work, structured_query)
         query_work = self._extract_date_conditions(query_work, structured_query)
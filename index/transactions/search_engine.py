@@ -0,0 +1,349 @@
+from typing import Callable, Dict, List, Literal, Optional, Self, Union
+import os
+from functools import cached_property
+
+import pandas
+
+from .document import Document
+from .corpus import Corpus
+from .query import Query
+from .lookup_tables import LookupTables
+from .search_hit import SearchHit, SearchHits
+from .similarity import SimilarityIndex
+from .semantic import LatentSemanticIndex
+from .duplicates import DuplicateIndex
+from .analyzer import Analyzer
+from .query_modules.bm25 import BM25
+from .base.inverted_index import InvertedIndex
+from .base.normalization_cache import NormalizationCache
+from .scripts.nlp import spacy_lemmatize, snowball_stem
+from .scripts.correction import correct_tokens
+
+
+class SearchEngine:
+    """
+    Moteur de recherche persistant.
+    Possède le corpus, les index inversés par zone et la table de substitutions (lemmes ou stems),
+    et précalcule une fois pour toutes les structures utilisées par chaque requête.
+    """
+    STORAGE_TAGS = {"Corpus": "corpus", "documents": "bulletins", "Document": "bulletin", "Image": "image"}
+    ZONES = ["texte", "legendes", "titre"]
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        index: Dict[str, InvertedIndex],
+        substitutions: Dict[str, str],
+        fallback: Callable[[str], List[str]] = spacy_lemmatize,
+        multi_field: bool = False,
+        boosts: Optional[Dict[str, float]] = None,
+        semantic: Optional[LatentSemanticIndex] = None,
+        analyzer: Optional[Analyzer] = None,
+        correction: bool = True,
+    ):
+        """
+        Parameters:
+            corpus: Le corpus de documents à interroger.
+            index: Un index inversé "zone: index" pour la recherche.
+            substitutions: La table "mot: lemme" (ou "mot: stem") utilisée pour construire l'index.
+            fallback: Normalisation appliquée aux mots absents de la table (spacy_lemmatize, snowball_stem...).
+            multi_field: Si True, les termes du contenu sont cherchés dans le texte, le titre et les légendes,
+                et notés par BM25F avec les poids de zone boosts.
+            boosts: Poids de chaque zone en BM25F (voir BM25.BOOSTS pour les valeurs par défaut).
+            semantic: L'index sémantique latent (LSA) précalculé. Si None, il est calculé à la première utilisation.
+            analyzer: La chaîne d'analyse qui a produit l'index (voir Analyzer). Si fournie, les termes des requêtes
+                sont standardisés par la même chaîne que les documents.
+            correction: Si True, un terme absent de la table est d'abord corrigé sur le lexique de la table
+                (voir correct_tokens) avant le fallback.
+        """
+        self.corpus = corpus
+        self.index = index
+        self.substitutions = substitutions
+        self.lexicon = set(substitutions.keys())
+        self.fallback = fallback
+        self.multi_field = multi_field
+        self.boosts = boosts
+        self.analyzer = analyzer
+        self.correction = correction
+        self.tables = LookupTables(corpus, index)
+        self.scorer = BM25(self.tables, substitutions, boosts=boosts, analyzer=analyzer)
+        self._semantic = semantic
+
+    def refresh(self) -> None:
+        """
+        Recalcule les structures précalculées après une modification du corpus.
+        """
+        self.tables = LookupTables(self.corpus, self.index)
+        self.scorer = BM25(self.tables, self.substitutions, boosts=self.boosts, analyzer=self.analyzer)
+        self.__dict__.pop("similarity", None)
+        self.__dict__.pop("duplicates", None)
+        self._semantic = None
+
+    @classmethod
+    def from_folder(
+        cls,
+        output_folder: str,
+        index_type: Literal["lemmatized", "stemmed"] = "lemmatized",
+        multi_field: bool = False,
+        boosts: Optional[Dict[str, float]] = None,
+    ) -> Self:
+        """
+        Charge le moteur depuis les fichiers produits par processing.ipynb.
+
+        Parameters:
+            output_folder: Le dossier qui contient corpus_initial.xml, les tables de substitution et index_files/.
+            index_type: Le type d'index à charger ("lemmatized" ou "stemmed").
+            multi_field: Recherche et notation multi-champs (voir __init__).
+            boosts: Poids de chaque zone en BM25F.
+
+        L'index sémantique latent est chargé depuis index_files/lsa_{index_type}/ s'il y a été sauvegardé.
+        Les mots de requête absents de la table sont normalisés par spaCy (ou Snowball) au travers du cache
+        persistant {index_type}_cache.tsv (voir NormalizationCache).
+        """
+        with open(os.path.join(output_folder, "corpus_initial.xml"), "r", encoding="utf-8") as f:
+            corpus = Corpus.model_validate_xml(f.read(), tags=cls.STORAGE_TAGS)
+
+        index: Dict[str, InvertedIndex] = {}
+        for zone in cls.ZONES:
+            index[zone] = InvertedIndex.from_dataframe(pandas.read_csv(
+                os.path.join(output_folder, "index_files", f"index_{zone}_{index_type}.xml"), sep="\t", encoding="utf-8"
+            ))
+
+        analyzer = Analyzer.from_files(
+            anti_dict_file=os.path.join(output_folder, "anti_dictionnaire.txt"),
+            replacements_file=os.path.join(output_folder, f"{index_type}_replacement.tsv"),
+        )
+
+        semantic_folder = os.path.join(output_folder, "index_files", f"lsa_{index_type}")
+        semantic = LatentSemanticIndex.load(semantic_folder) if LatentSemanticIndex.exists(semantic_folder) else None
+
+        return cls(
+            corpus=corpus,
+            index=index,
+            substitutions=analyzer.replacements,
+            # Les mots absents de la table sont normalisés une seule fois, tous processus confondus.
+            # Ils sont rares à l'exécution des requêtes : chacun est sauvegardé aussitôt, pour ne pas être
+            # perdu si le serveur est arrêté brutalement
+            fallback=NormalizationCache(
+                os.path.join(output_folder, f"{index_type}_cache.tsv"),
+                spacy_lemmatize if index_type == "lemmatized" else snowball_stem,
+                flush_every=1,
+            ),
+            multi_field=multi_field,
+            boosts=boosts,
+            semantic=semantic,
+            analyzer=analyzer,
+            # La correction orthographique n'a jamais été appliquée aux stems
+            correction=index_type == "lemmatized",
+        )
+
+    @staticmethod
+    def standardize(text: str) -> str:
+        """
+        Standardise le texte comme les documents à l'indexation (voir Analyzer.standardize) :
+        minuscules, apostrophes et tirets remplacés par des espaces, ponctuation retirée.
+        """
+        return Analyzer.standardize(text)
+
+    def normalize(self, term: str) -> Optional[str]:
+        """
+        Ramène un terme de requête au vocabulaire de l'index :
+        table de substitutions, puis correction orthographique sur le lexique, puis fallback.
+        Si le moteur a une chaîne d'analyse, le terme passe par la même chaîne que les documents :
+        un terme de l'anti-dictionnaire (absent de l'index) donne None.
+        """
+        if self.analyzer is not None:
+            if self.analyzer.term(term) is None:
+                return None
+            standardized = self.analyzer.standardize(term)
+        else:
+            standardized = self.standardize(term)
+        token = self.substitutions.get(standardized)
+        if token:
+            return token
+        corrected = correct_tokens(tokens=[term], lexicon=self.lexicon)[0][0] if self.correction else None
+        if corrected:
+            token = self.substitutions.get(corrected)
+            if token:
+                return token
+        tokens = self.fallback(standardized)
+        return tokens[0] if tokens else standardized
+
+    def terms(self, term: str) -> List[str]:
+        """
+        Les tokens d'index d'un terme de requête. Comme à l'indexation, un mot composé
+        ("États-Unis", "aujourd’hui") donne un token par mot, sauf s'il est dans la table de substitutions.
+        Les mots de l'anti-dictionnaire sont retirés.
+        """
+        if self.substitutions.get(self.standardize(term)) or not Analyzer.SEPARATOR.search(term):
+            words = [term]
+        else:
+            words = [word for word in Analyzer.SEPARATOR.split(term) if word.strip()]
+        return [token for token in map(self.normalize, words) if token is not None]
+
+    def prepare(self, query: Query) -> Query:
+        """
+        Retourne une copie de la requête dont les termes sont normalisés pour l'index.
+        Les termes de l'anti-dictionnaire, qui ne sont pas indexés, sont retirés. Si tous les termes
+        d'un champ le sont, le champ garde leur forme standardisée, absente de l'index :
+        la requête ne renvoie aucun document au lieu de perdre son critère.
+        """
+        query = query.model_copy(deep=True)
+        for field in ["content_terms", "title_terms"]:
+            terms = getattr(query, field)
+            tokens = [token for term in terms for token in self.terms(term)]
+            setattr(query, field, tokens or [self.standardize(term) for term in terms])
+        # Une expression exclue reste une seule expression, dont tous les mots doivent être présents
+        expressions = (" ".join(self.terms(expression)) for expression in query.negated_content_terms)
+        query.negated_content_terms = [expression for expression in expressions if expression]
+        for field in ["rubric_terms", "negated_rubric_terms"]:
+            setattr(query, field, [self.standardize(term) for term in getattr(query, field)])
+        return query
+
+    def _query(self, query: Union[str, Query], llm: bool = False, prepared: bool = False) -> Query:
+        if isinstance(query, str):
+            query = Query.llm_build(query) if llm else Query.build(query)
+            prepared = False
+        return query if prepared else self.prepare(query)
+
+    def search(
+            self,
+            query: Union[str, Query],
+            llm: bool = False,
+            debug: bool = False,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            prepared: bool = False,
+            order_by: Literal["date", "pertinence"] = "date",
+    ) -> Union[List[Document], List[str]]:
+        """
+        Exécute une requête sur le corpus.
+
+        Parameters:
+            query: La requête en langage naturel, ou une Query déjà construite.
+            llm: Si True et que query est une chaîne, la requête est construite par Query.llm_build.
+            debug: Active les messages de débogage.
+            offset: Nombre de résultats à sauter (pagination).
+            limit: Nombre maximal de résultats renvoyés. Si None, tous les résultats restants.
+            prepared: Si True, la Query fournie est déjà normalisée (voir prepare).
+            order_by: "date" (du plus récent au plus ancien) ou "pertinence" (score BM25 décroissant).
+
+        Returns:
+            Une liste de Document objects ou une liste de chaînes de rubriques
+            selon la valeur de `target_info`.
+        """
+        return self._query(query, llm, prepared).search(
+            documents=self.corpus, index=self.index, debug=debug, tables=self.tables, offset=offset, limit=limit,
+            scorer=self.scorer, order_by=order_by, multi_field=self.multi_field,
+        )
+
+    def hits(
+            self,
+            query: Union[str, Query],
+            llm: bool = False,
+            debug: bool = False,
+            offset: int = 0,
+            limit: Optional[int] = None,
+            ascending: bool = False,
+            prepared: bool = False,
+            order_by: Literal["date", "pertinence"] = "date",
+            collapse_duplicates: bool = False,
+    ) -> SearchHits:
+        """
+        Exécute une requête sur le corpus et renvoie seulement une page de résultats légers,
+        notés par le modèle BM25 du moteur (voir Query.hits).
+
+        Parameters:
+            query: La requête en langage naturel, ou une Query déjà construite.
+            llm: Si True et que query est une chaîne, la requête est construite par Query.llm_build.
+            debug: Active les messages de débogage.
+            offset: Nombre de résultats à sauter (pagination).
+            limit: Nombre maximal de résultats de la page. Si None, tous les résultats restants.
+            ascending: Si True, du plus ancien au plus récent. Sinon, du plus récent au plus ancien.
+            prepared: Si True, la Query fournie est déjà normalisée (voir prepare).
+            order_by: "date", ou "pertinence" pour trier par score décroissant.
+            collapse_duplicates: Si True, seul le premier résultat de chaque groupe de quasi-doublons est gardé
+                (voir DuplicateIndex), avant la pagination.
+        """
+        query = self._query(query, llm, prepared)
+        if not collapse_duplicates:
+            return query.hits(
+                documents=self.corpus, index=self.index, debug=debug, tables=self.tables,
+                offset=offset, limit=limit, ascending=ascending, scorer=self.scorer, order_by=order_by,
+                multi_field=self.multi_field,
+            )
+        hits = self.duplicates.collapse(query.hits(
+            documents=self.corpus, index=self.index, debug=debug, tables=self.tables,
+            ascending=ascending, scorer=self.scorer, order_by=order_by, multi_field=self.multi_field,
+        ))
+        return SearchHits(hits[offset:None if limit is None else offset + limit], total=len(hits))
+
+    @cached_property
+    def similarity(self) -> SimilarityIndex:
+        """
+        L'index de similarité entre documents (vecteurs TF-IDF normalisés), construit à la première utilisation.
+        """
+        return SimilarityIndex(self.corpus.statistics())
+
+    def similar(self, document_id: str, k: int = 10) -> SearchHits:
+        """
+        Les k documents les plus similaires à un document du corpus ("plus comme celui-ci").
+
+        Parameters:
+            document_id: L'identifiant du document source.
+            k: Le nombre de documents à renvoyer.
+
+        Returns:
+            Les résultats, notés par leur similarité cosinus au document source.
+        """
+        similar = self.similarity.similar(document_id, k)
+        return SearchHits(
+            (SearchHit(doc_id, score, documents=self.corpus) for doc_id, score in similar),
+            total=len(similar),
+        )
+
+    @cached_property
+    def duplicates(self) -> DuplicateIndex:
+        """
+        L'index des quasi-doublons du corpus (MinHash et LSH), construit à la première utilisation.
+        """
+        return DuplicateIndex(self.corpus)
+
+    @property
+    def semantic(self) -> LatentSemanticIndex:
+        """
+        L'index sémantique latent (LSA) du corpus, calculé à la première utilisation s'il n'a pas été chargé.
+        """
+        if self._semantic is None:
+            self._semantic = LatentSemanticIndex.from_corpus(
+                self.corpus, self.substitutions, zones=self.ZONES, analyzer=self.analyzer
+            )
+        return self._semantic
+
+    def semantic_hits(
+            self,
+            query: Union[str, Query],
+            llm: bool = False,
+            k: int = 10,
+            prepared: bool = False,
+    ) -> SearchHits:
+        """
+        Recherche par concepts : les k documents les plus proches de la requête dans l'espace latent (LSA),
+        même s'ils ne contiennent aucun de ses termes ("santé" retrouve des articles qui ne parlent que de "médical").
+        Seuls les termes du contenu et du titre sont utilisés, sans les filtres de la requête.
+
+        Parameters:
+            query: La requête en langage naturel, ou une Query déjà construite.
+            llm: Si True et que query est une chaîne, la requête est construite par Query.llm_build.
+            k: Le nombre de documents à renvoyer.
+            prepared: Si True, la Query fournie est déjà normalisée (voir prepare).
+
+        Returns:
+            Les résultats, notés par leur similarité cosinus à la requête.
+        """
+        query = self._query(query, llm, prepared)
+        similar = self.semantic.search(query.content_terms + query.title_terms, k)
+        return SearchHits(
+            (SearchHit(doc_id, score, documents=self.corpus) for doc_id, score in similar),
+            total=len(similar),
+        )
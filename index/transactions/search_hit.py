@@ -0,0 +1,32 @@
+from typing import Dict, Iterable, Optional, Union
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from .document import Document
+from .corpus import Corpus
+
+
+@dataclass
+class SearchHit:
+    """
+    Un résultat de recherche léger : seul l'identifiant du document est conservé,
+    le document n'est récupéré dans le corpus qu'à sa première lecture (affichage de la page).
+    """
+    document_id: str
+    score: float = 0.0
+    documents: Union[Dict[str, Document], Corpus, None] = field(default=None, repr=False, compare=False)
+
+    @cached_property
+    def document(self) -> Optional[Document]:
+        return self.documents.get(self.document_id) if self.documents is not None else None
+
+
+class SearchHits(list):  # List[SearchHit]
+    """
+    Une page de résultats de recherche.
+    L'attribut total donne le nombre de documents qui correspondent à la requête, toutes pages confondues.
+    """
+
+    def __init__(self, hits: Iterable[SearchHit] = (), total: int = 0):
+        super().__init__(hits)
+        self.total = total
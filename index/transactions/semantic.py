@@ -0,0 +1,271 @@
+from typing import Dict, Iterable, List, Mapping, Optional, Self, Tuple
+import os
+from collections import Counter
+
+import numpy, pandas
+
+from .corpus import Corpus
+from .analyzer import Analyzer
+from .neighbors import NearestNeighborsIndex
+from .base.corpus_statistics import CorpusStatistics
+
+
+class LatentSemanticIndex:
+    """
+    Index sémantique latent (LSA) d'un corpus.
+
+    La matrice TF-IDF (documents x termes, lignes normalisées) est factorisée par une SVD tronquée
+    M ~ U_k S_k V_k^T : chaque document est représenté par un vecteur dense de rang k (ligne de U_k S_k),
+    et une requête est projetée dans le même espace par q V_k. Des termes qui apparaissent dans les mêmes
+    contextes ("santé", "médical"...) sont proches dans cet espace, même s'ils ne sont jamais cooccurrents
+    avec la requête.
+
+    Les vecteurs des documents sont stockés en float32 et, une fois sauvegardés, relus en mémoire partagée
+    (numpy.memmap) : seules les pages nécessaires sont chargées. Un index approché des plus proches voisins
+    (voir index_neighbors) évite de parcourir tous les vecteurs à chaque requête.
+    """
+    DOCUMENTS_FILE = "lsa_documents.npy"
+    TERMS_FILE = "lsa_terms.npy"
+    VOCABULARY_FILE = "lsa_vocabulary.tsv"
+    DOCUMENT_IDS_FILE = "lsa_document_ids.tsv"
+
+    def __init__(
+        self,
+        document_ids: List[str],
+        vocabulary: List[str],
+        inverse_document_frequencies: numpy.ndarray,
+        term_components: numpy.ndarray,
+        document_embeddings: numpy.ndarray,
+        neighbors: Optional[NearestNeighborsIndex] = None,
+    ):
+        """
+        Parameters:
+            document_ids: L'identifiant du document de chaque ligne de document_embeddings.
+            vocabulary: Le terme de chaque ligne de term_components.
+            inverse_document_frequencies: L'IDF de chaque terme du vocabulaire.
+            term_components: La matrice V_k (termes x k) qui projette un vecteur TF-IDF dans l'espace latent.
+            document_embeddings: Les vecteurs des documents (documents x k), de norme 1.
+            neighbors: L'index approché des plus proches voisins sur document_embeddings, s'il a été construit.
+        """
+        self.document_ids = document_ids
+        self.document_numbers = {doc_id: row for row, doc_id in enumerate(document_ids)}
+        self.vocabulary = vocabulary
+        self.vocabulary_index = {token: column for column, token in enumerate(vocabulary)}
+        self.inverse_document_frequencies = inverse_document_frequencies
+        self.term_components = term_components
+        self.document_embeddings = document_embeddings
+        self.neighbors = neighbors
+
+    @property
+    def rank(self) -> int:
+        return self.term_components.shape[1]
+
+    @staticmethod
+    def counts(
+        corpus: Corpus,
+        substitutions: Optional[Mapping[str, str]] = None,
+        zones: Optional[List[str]] = None,
+        analyzer: Optional[Analyzer] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Le nombre d'occurrences de chaque terme dans chaque document, les mots étant ramenés
+        au vocabulaire de l'index par la table de substitutions (lemmes ou stems).
+
+        Parameters:
+            corpus: Le corpus de documents.
+            substitutions: La table "mot: lemme" (ou "mot: stem"). Si None, les mots sont gardés tels quels.
+            zones: Les zones prises en compte. Si None, toutes les zones.
+            analyzer: La chaîne d'analyse des index inversés (voir Analyzer). Si fournie, les tokens sont produits
+                par cette chaîne depuis le texte d'origine des documents (sans l'anti-dictionnaire, avec ses
+                lemmes ou stems), et substitutions n'est pas utilisée.
+        """
+        substitutions = substitutions or {}
+        counts = {}
+        for document in corpus.documents:
+            tokens = Counter()
+            if analyzer is not None:
+                for words in analyzer.document_tokens(document, zones).values():
+                    tokens.update(words)
+            else:
+                for zone, words in document.tokens.items():
+                    if zones is None or zone in zones:
+                        for word, count in words.items():
+                            tokens[substitutions.get(word) or word] += count
+            counts[document.document_id] = dict(tokens)
+        return counts
+
+    @classmethod
+    def build(
+        cls,
+        statistics: CorpusStatistics,
+        rank: int = 100,
+        oversampling: int = 10,
+        power_iterations: int = 4,
+        seed: int = 0,
+    ) -> Self:
+        """
+        Calcule l'index par une SVD tronquée randomisée (Halko et al.) de la matrice TF-IDF,
+        avec NumPy seulement : la matrice creuse n'est jamais convertie en matrice dense.
+
+        Parameters:
+            statistics: Les statistiques du corpus (voir CorpusStatistics), dont la matrice document-terme.
+            rank: La dimension k de l'espace latent (réduite au rang de la matrice si nécessaire).
+            oversampling: Nombre de dimensions supplémentaires échantillonnées pour la précision.
+            power_iterations: Nombre d'itérations de puissance (utile quand le spectre décroît lentement).
+            seed: Graine aléatoire, pour un résultat reproductible.
+        """
+        matrix = statistics.matrix
+        n_documents, n_terms = matrix.shape
+        idf = statistics.inverse_document_frequencies
+
+        # Matrice TF-IDF à lignes normalisées, pour que les documents longs ne dominent pas la factorisation
+        tfidf = matrix.scale_columns(idf)
+        norms = numpy.sqrt(numpy.bincount(tfidf.rows, weights=tfidf.data ** 2, minlength=n_documents))
+        norms[norms == 0] = 1.0
+        tfidf.data = tfidf.data / norms[tfidf.rows]
+
+        rank = max(0, min(rank, n_documents, n_terms))
+        sketch = min(rank + oversampling, n_documents, n_terms)
+        random = numpy.random.default_rng(seed)
+
+        # Base orthonormée Q de l'image de M, puis SVD exacte de la petite matrice B = Q^T M
+        basis, _ = numpy.linalg.qr(tfidf.dot(random.standard_normal((n_terms, sketch))))
+        for _ in range(power_iterations):
+            basis, _ = numpy.linalg.qr(tfidf.transpose_dot(basis))
+            basis, _ = numpy.linalg.qr(tfidf.dot(basis))
+        _, singular_values, components = numpy.linalg.svd(tfidf.transpose_dot(basis).T, full_matrices=False)
+        term_components = components[:rank].T
+
+        document_embeddings = tfidf.dot(term_components)  # = U_k S_k
+        return cls(
+            document_ids=list(matrix.document_ids),
+            vocabulary=list(matrix.vocabulary),
+            inverse_document_frequencies=idf,
+            term_components=term_components.astype(numpy.float32),
+            document_embeddings=cls._normalize(document_embeddings).astype(numpy.float32),
+        )
+
+    @classmethod
+    def from_corpus(
+        cls,
+        corpus: Corpus,
+        substitutions: Optional[Mapping[str, str]] = None,
+        zones: Optional[List[str]] = None,
+        rank: int = 100,
+        analyzer: Optional[Analyzer] = None,
+    ) -> Self:
+        """
+        Calcule l'index d'un corpus, dans le vocabulaire de ses index inversés (voir counts).
+        """
+        return cls.build(CorpusStatistics(cls.counts(corpus, substitutions, zones, analyzer)), rank=rank)
+
+    @staticmethod
+    def _normalize(vectors: numpy.ndarray) -> numpy.ndarray:
+        norms = numpy.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed(self, terms: Iterable[str]) -> numpy.ndarray:
+        """
+        Projette une requête (une liste de termes déjà normalisés) dans l'espace latent.
+        Les termes absents du vocabulaire sont ignorés.
+
+        Returns:
+            Le vecteur de la requête (float32, de norme 1, ou nul si aucun terme n'est connu).
+        """
+        counts = Counter(self.vocabulary_index[term] for term in terms if term in self.vocabulary_index)
+        if not counts:
+            return numpy.zeros(self.rank, dtype=numpy.float32)
+        columns = numpy.fromiter(counts.keys(), dtype=numpy.int64, count=len(counts))
+        weights = numpy.fromiter(counts.values(), dtype=numpy.float64, count=len(counts))
+        weights *= self.inverse_document_frequencies[columns]
+        return self._normalize(weights @ self.term_components[columns]).astype(numpy.float32)
+
+    def index_neighbors(self, **parameters) -> NearestNeighborsIndex:
+        """
+        Construit l'index approché des plus proches voisins des documents (étape hors ligne).
+
+        Parameters:
+            parameters: Les paramètres de NearestNeighborsIndex.build (n_lists, n_subspaces...).
+        """
+        self.neighbors = NearestNeighborsIndex.build(self.document_embeddings, **parameters)
+        return self.neighbors
+
+    def search(self, terms: Iterable[str], k: int = 10, exact: bool = False) -> List[Tuple[str, float]]:
+        """
+        Les k documents les plus proches de la requête dans l'espace latent (similarité cosinus).
+        La recherche est approchée si l'index des plus proches voisins a été construit.
+
+        Parameters:
+            terms: Les termes de la requête, dans le vocabulaire de l'index (voir SearchEngine.prepare).
+            k: Le nombre de documents à renvoyer.
+            exact: Si True, tous les vecteurs des documents sont parcourus, même si l'index approché existe.
+
+        Returns:
+            Les couples (document_id, similarité), par similarité décroissante.
+        """
+        query = self.embed(terms)
+        if k <= 0 or not query.any():
+            return []
+        if self.neighbors is not None and not exact:
+            rows, scores = self.neighbors.search(query, k)
+            return [(self.document_ids[row], float(score)) for row, score in zip(rows, scores)]
+        scores = self.document_embeddings @ query
+        if len(scores) > k:
+            top = numpy.argpartition(-scores, k - 1)[:k]
+        else:
+            top = numpy.arange(len(scores))
+        top = top[numpy.lexsort((top, -scores[top]))]
+        return [(self.document_ids[row], float(scores[row])) for row in top]
+
+    def save(self, folder: str) -> None:
+        """
+        Sauvegarde l'index dans un dossier (à côté des index inversés).
+        Les vecteurs des documents sont écrits en float32, dans un fichier .npy relu par numpy.memmap.
+        """
+        os.makedirs(folder, exist_ok=True)
+        embeddings = numpy.lib.format.open_memmap(
+            os.path.join(folder, self.DOCUMENTS_FILE), mode="w+", dtype=numpy.float32, shape=self.document_embeddings.shape
+        )
+        embeddings[:] = self.document_embeddings
+        embeddings.flush()
+        numpy.save(os.path.join(folder, self.TERMS_FILE), self.term_components)
+        pandas.DataFrame({"mot": self.vocabulary, "idf": self.inverse_document_frequencies}).to_csv(
+            os.path.join(folder, self.VOCABULARY_FILE), sep="\t", index=False, encoding="utf-8"
+        )
+        pandas.DataFrame({"document_id": self.document_ids}).to_csv(
+            os.path.join(folder, self.DOCUMENT_IDS_FILE), sep="\t", index=False, encoding="utf-8"
+        )
+        if self.neighbors is not None:
+            self.neighbors.save(folder)
+
+    @classmethod
+    def exists(cls, folder: str) -> bool:
+        return all(
+            os.path.exists(os.path.join(folder, file))
+            for file in [cls.DOCUMENTS_FILE, cls.TERMS_FILE, cls.VOCABULARY_FILE, cls.DOCUMENT_IDS_FILE]
+        )
+
+    @classmethod
+    def load(cls, folder: str) -> Self:
+        """
+        Charge un index sauvegardé par save (avec son index approché, s'il y a été sauvegardé).
+        Les vecteurs des documents restent sur le disque (numpy.memmap).
+        """
+        vocabulary = pandas.read_csv(
+            os.path.join(folder, cls.VOCABULARY_FILE), sep="\t", encoding="utf-8", na_filter=False, dtype={"mot": str}
+        )
+        document_ids = pandas.read_csv(
+            os.path.join(folder, cls.DOCUMENT_IDS_FILE), sep="\t", encoding="utf-8", na_filter=False, dtype=str
+        )
+        document_embeddings = numpy.load(os.path.join(folder, cls.DOCUMENTS_FILE), mmap_mode="r")
+        return cls(
+            document_ids=document_ids["document_id"].tolist(),
+            vocabulary=vocabulary["mot"].tolist(),
+            inverse_document_frequencies=vocabulary["idf"].to_numpy(dtype=numpy.float64),
+            term_components=numpy.load(os.path.join(folder, cls.TERMS_FILE)),
+            document_embeddings=document_embeddings,
+            neighbors=(
+                NearestNeighborsIndex.load(folder, document_embeddings) if NearestNeighborsIndex.exists(folder) else None
+            ),
+        )
@@ -0,0 +1,91 @@
+from typing import List, Tuple
+from functools import lru_cache
+
+import numpy
+
+from .base.corpus_statistics import CorpusStatistics
+
+
+class SimilarityIndex:
+    """
+    Index de similarité "plus comme celui-ci" entre les documents d'un corpus.
+
+    Chaque document est représenté par son vecteur TF-IDF normalisé (norme L2 = 1),
+    si bien que la similarité cosinus de deux documents est le produit scalaire de leurs vecteurs.
+    Les vecteurs sont aussi rangés par terme (listes de documents, comme un index inversé) :
+    les documents similaires à un document sont obtenus en accumulant les scores sur les listes
+    de ses seuls termes non nuls, sans parcourir tout le corpus.
+    """
+
+    def __init__(self, statistics: CorpusStatistics, cache_size: int = 256):
+        """
+        Parameters:
+            statistics: Les statistiques du corpus (voir Corpus.statistics), dont la matrice document-terme.
+            cache_size: Nombre de documents dont les résultats sont gardés en cache (les plus demandés).
+        """
+        matrix = statistics.matrix
+        self.document_ids: List[str] = matrix.document_ids
+        self.document_numbers = {doc_id: row for row, doc_id in enumerate(self.document_ids)}
+
+        # Vecteurs TF-IDF des documents (lignes de la matrice), normalisés
+        weights = matrix.data * statistics.inverse_document_frequencies[matrix.indices]
+        rows = matrix.rows
+        norms = numpy.sqrt(numpy.bincount(rows, weights=weights ** 2, minlength=len(self.document_ids)))
+        norms[norms == 0] = 1.0
+        self.indptr = matrix.indptr
+        self.indices = matrix.indices
+        self.weights = weights / norms[rows]
+
+        # Les mêmes valeurs rangées par terme (colonne) : terme -> (documents, poids)
+        order = numpy.argsort(self.indices, kind="stable")
+        self.term_indptr = numpy.zeros(len(matrix.vocabulary) + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(self.indices, minlength=len(matrix.vocabulary)), out=self.term_indptr[1:])
+        self.term_documents = rows[order]
+        self.term_weights = self.weights[order]
+
+        self._similar = lru_cache(maxsize=cache_size)(self._compute_similar)
+
+    def similar(self, document_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Les k documents les plus similaires au document (similarité cosinus des vecteurs TF-IDF),
+        le document lui-même exclu. Les résultats des documents les plus demandés sont mis en cache.
+        Lève une KeyError si le document n'est pas dans l'index.
+
+        Parameters:
+            document_id: L'identifiant du document source.
+            k: Le nombre de documents à renvoyer.
+
+        Returns:
+            Les couples (document_id, similarité), par similarité décroissante.
+        """
+        if document_id not in self.document_numbers:
+            raise KeyError(document_id)
+        if k <= 0:
+            return []
+        # Le cache garde un tuple : chaque appel reçoit sa propre liste
+        return list(self._similar(document_id, k))
+
+    def _compute_similar(self, document_id: str, k: int) -> Tuple[Tuple[str, float], ...]:
+        row = self.document_numbers[document_id]
+        start, end = self.indptr[row], self.indptr[row + 1]
+
+        # Accumulation sur les listes des termes non nuls du document (les termes présents partout ont un poids nul)
+        documents, contributions = [], []
+        for term, weight in zip(self.indices[start:end], self.weights[start:end]):
+            if weight == 0:
+                continue
+            term_start, term_end = self.term_indptr[term], self.term_indptr[term + 1]
+            documents.append(self.term_documents[term_start:term_end])
+            contributions.append(weight * self.term_weights[term_start:term_end])
+        if not documents:
+            return ()
+        documents, inverse = numpy.unique(numpy.concatenate(documents), return_inverse=True)
+        scores = numpy.bincount(inverse, weights=numpy.concatenate(contributions))
+
+        keep = (documents != row) & (scores > 0)
+        documents, scores = documents[keep], scores[keep]
+        if len(documents) > k:
+            top = numpy.argpartition(-scores, k - 1)[:k]
+            documents, scores = documents[top], scores[top]
+        order = numpy.lexsort((documents, -scores))
+        return tuple((self.document_ids[document], float(score)) for document, score in zip(documents[order], scores[order]))
@@ -0,0 +1,149 @@
+import unittest
+import math
+from index.transactions.base.token_metrics import TokenMetrics
+from index.transactions.corpus import Corpus
+from index.transactions.document import Document, Image
+
+METRICS = TokenMetrics({
+    "a.htm": {"le": 3, "chat": 2, "dort": 1},
+    "b.htm": {"le": 1, "chien": 4},
+    "c.htm": {"le": 2, "chat": 1},
+})
+
+
+class TestTokenMetrics(unittest.TestCase):
+    """
+    Vérifie les calculs vectorisés (matrice document-terme creuse) de TokenMetrics
+    sur un petit corpus dont les valeurs se calculent à la main.
+    """
+
+    def test_matrice(self):
+        matrix = METRICS.matrix
+        self.assertEqual(matrix.shape, (3, 4))
+        self.assertEqual(matrix.vocabulary, ["chat", "chien", "dort", "le"])
+        self.assertEqual(matrix.document_frequencies().tolist(), [2, 1, 1, 3])
+        self.assertEqual(matrix.collection_frequencies().tolist(), [3, 4, 1, 6])
+        self.assertEqual(matrix.document_lengths().tolist(), [6, 5, 3])
+
+    def test_term_frequencies(self):
+        tf = METRICS.term_frequencies
+        self.assertEqual(list(tf.columns), ["document_id", "mot", "tf"])
+        expected = [(doc_id, token, count) for doc_id, tokens in METRICS.items() for token, count in tokens.items()]
+        self.assertEqual(list(tf.itertuples(index=False, name=None)), expected)
+
+    def test_tfidf(self):
+        tfidf = {(doc_id, token): value for doc_id, token, value in METRICS.tfidf.itertuples(index=False, name=None)}
+        self.assertAlmostEqual(tfidf[("a.htm", "chat")], 2 * math.log10(3 / 2))
+        self.assertAlmostEqual(tfidf[("b.htm", "chien")], 4 * math.log10(3))
+        self.assertEqual(tfidf[("a.htm", "le")], 0.0)  # Présent dans tous les documents
+
+    def test_anti_dictionnaire(self):
+        self.assertEqual(list(METRICS.get_irrelevant_terms()), ["le"])
+        self.assertEqual(METRICS.build_anti_dict()["mot"].tolist(), ["le"])
+        self.assertEqual(list(TokenMetrics().get_irrelevant_terms()), [])
+        self.assertTrue(TokenMetrics().tfidf.empty)
+
+    def test_statistiques_partagees(self):
+        metrics = TokenMetrics({doc_id: dict(tokens) for doc_id, tokens in METRICS.items()})
+        statistics = metrics.statistics
+        metrics.tfidf, metrics.get_irrelevant_terms(), metrics.build_anti_dict()
+        self.assertIs(metrics.statistics, statistics)
+        self.assertEqual(statistics.n_documents, 3)
+        self.assertEqual(statistics.df("chat"), 2)
+        self.assertAlmostEqual(statistics.idf("chien"), math.log10(3))
+        self.assertEqual(statistics.idf("inconnu"), 0.0)
+
+        # Un document ajouté invalide les statistiques
+        metrics["d.htm"] = {"chat": 1, "le": 1}
+        self.assertIsNot(metrics.statistics, statistics)
+        self.assertEqual(metrics.statistics.n_documents, 4)
+        self.assertAlmostEqual(metrics.statistics.idf("chat"), math.log10(4 / 3))
+
+        # Les compteurs d'un document modifiés en place invalident aussi les statistiques
+        statistics = metrics.statistics
+        metrics["b.htm"]["chat"] = 2
+        self.assertEqual(metrics.statistics.df("chat"), 4)
+        metrics["a.htm"]["chat"] += 1
+        self.assertEqual(metrics.matrix.collection_frequencies()[metrics.matrix.vocabulary.index("chat")], 7)
+        del metrics["c.htm"]["chat"]
+        metrics["d.htm"].pop("chat")
+        self.assertEqual(metrics.statistics.df("chat"), 2)
+        metrics.setdefault("e.htm", {"chat": 1})["dort"] = 1
+        self.assertEqual(metrics.statistics.df("dort"), 2)
+        self.assertIsNot(metrics.statistics, statistics)
+        self.assertEqual(METRICS["a.htm"]["chat"], 2)  # Les dictionnaires donnés sont copiés
+
+
+class TestAgregatsIncrementaux(unittest.TestCase):
+    """
+    Vérifie le suivi des champs modifiés (seules les zones concernées sont recalculées)
+    et la mise à jour incrémentale des agrégats du corpus.
+    """
+
+    @staticmethod
+    def _corpus() -> Corpus:
+        return Corpus(documents=[
+            Document(fichier="a.htm", titre="Le chat", texte="Le chat dort", images=[Image(legende="Un chat")]),
+            Document(fichier="b.htm", titre="Le chien", texte="Le chien court"),
+            Document(fichier="c.htm", titre="Le chat", texte="Le chat mange"),
+        ])
+
+    def test_zones_modifiees(self):
+        doc = self._corpus().documents[0]
+        texte, legendes = doc.tokens["texte"], doc.tokens["legendes"]
+        doc.titre = "Le lion"
+        self.assertEqual(doc.tokens["titre"], {"le": 1, "lion": 1})
+        self.assertIs(doc.tokens["texte"], texte)  # Zone non modifiée : pas de nouvelle tokenisation
+        doc.images[0].legende = "Un lion"
+        doc.clear_cache(["images"])
+        self.assertEqual(doc.tokens["legendes"], {"un": 1, "lion": 1})
+        self.assertIs(doc.tokens["texte"], texte)
+        doc.fichier = "z.htm"
+        self.assertEqual(doc.document_id, "z.htm")
+
+    def test_agregats(self):
+        corpus = self._corpus()
+        for zones in [None, ["texte"], ["titre", "legendes"]]:
+            corpus.tokens(zones), corpus.token_index(zones), corpus.inverted_token_index(zones)
+
+        corpus.documents[1].texte = "Le chat court"
+        corpus.apply_filter(["titre"], lambda titre: titre.replace("chat", "lion"))
+        corpus.documents.append(Document(fichier="d.htm", titre="Le chat", texte="Le chien"))
+        del corpus.documents[0]
+        for zones in [None, ["texte"], ["titre", "legendes"]]:
+            with self.subTest(zones=zones):
+                fresh = Corpus(documents=[doc.model_copy(deep=True) for doc in corpus.documents])
+                fresh.clear_cache()
+                self.assertEqual(corpus.tokens(zones), fresh.tokens(zones))
+                self.assertEqual(corpus.token_index(zones), fresh.token_index(zones))
+                self.assertEqual(corpus.inverted_token_index(zones), fresh.inverted_token_index(zones))
+        self.assertEqual(corpus.inverted_token_index(["texte"])["chat"], ["b.htm", "c.htm"])
+
+        # Un document apparaît une fois par zone qui contient le token, comme dans la construction d'origine
+        for zones in [None, ["titre", "texte"]]:
+            with self.subTest(zones=zones):
+                expected = {}
+                for doc in corpus.documents:
+                    for zone, tokens in doc.tokens.items():
+                        if zones is None or zone in zones:
+                            for token in tokens:
+                                expected.setdefault(token, []).append(doc.document_id)
+                self.assertEqual(corpus.inverted_token_index(zones), expected)
+        self.assertEqual(corpus.inverted_token_index(["titre", "texte"])["le"], ["b.htm", "b.htm", "c.htm", "c.htm", "d.htm", "d.htm"])
+        self.assertEqual(corpus.tokens(["titre"])["lion"], 1)
+
+    def test_statistiques_apres_modification(self):
+        corpus = self._corpus()
+        statistics = corpus.statistics()
+        self.assertEqual(statistics.df("chat"), 2)
+        corpus.documents[0].texte = corpus.documents[0].titre = "lion"
+        self.assertEqual(corpus.token_index()["a.htm"], {"lion": 2, "un": 1, "chat": 1})
+        for statistics in [corpus.statistics(), corpus.token_index().statistics]:
+            self.assertEqual((statistics.df("lion"), statistics.df("chat")), (1, 2))
+        corpus.documents[0].images = []
+        self.assertEqual(corpus.statistics().df("chat"), 1)
+        self.assertIs(corpus.statistics(), corpus.statistics())  # Pas de recalcul sans modification
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
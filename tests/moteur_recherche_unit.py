@@ -0,0 +1,449 @@
+import unittest
+import os, tempfile, datetime
+import numpy
+from typing import Dict, Set
+from index.transactions.corpus import Corpus
+from index.transactions.document import Document
+from index.transactions.query import Query
+from index.transactions.lookup_tables import LookupTables
+from index.transactions.search_engine import SearchEngine
+from index.transactions.semantic import LatentSemanticIndex
+from index.transactions.neighbors import NearestNeighborsIndex
+from index.transactions.duplicates import DuplicateIndex
+from index.transactions.analyzer import Analyzer
+from index.transactions.query_modules.bm25 import BM25
+from index.transactions.base.inverted_index import InvertedIndex
+
+# --- Configuration des tests ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+XML_INITIAL_FILE = os.path.join(BASE_DIR, "output", "corpus_initial.xml")
+
+QUERIES = [
+    "Quels sont les articles parus entre le 3 mars 2013 et le 4 mai 2013 évoquant les etats unis ?",
+    "Je veux les articles de 2014 et de la rubrique Focus et parlant de la santé",
+    "Je souhaite les rubriques des articles parlant de nutrition ou de vin.",
+    "Je voudrais les articles avec des images dont le titre contient le mot croissance.",
+    "Liste des articles qui parlent soit du cnrs, soit des grandes écoles, mais pas de centrale paris.",
+    "Je souhaites avoir tout les articles donc la rubrique est focus ou Actualités Innovations et qui contiennent les mots chercheurs et paris.",
+    "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin",
+    "Je cherche les articles sur le changement et climatique publiés après 29/09/2011",
+    "articles parlant de recherche qui ne sont pas dans la rubrique Focus",
+    "articles avec des images parlant de énergie",
+]
+
+
+@unittest.skipIf(not os.path.exists(XML_INITIAL_FILE), f"Données de test manquantes: {XML_INITIAL_FILE}.")
+class TestSearchEngine(unittest.TestCase):
+    """
+    Vérifie que le SearchEngine (structures précalculées) et Query.search appelé directement
+    sur un dictionnaire de documents renvoient les documents d'un filtre naïf du corpus.
+    Les index sont construits sans lemmatisation pour ne pas dépendre de spaCy.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        with open(XML_INITIAL_FILE, "r", encoding="utf-8") as f:
+            cls.CORPUS = Corpus.model_validate_xml(f.read(), tags=SearchEngine.STORAGE_TAGS)
+        cls.INDEX: Dict[str, InvertedIndex] = {
+            zone: cls.CORPUS.inverted_token_index(zones=[zone]) for zone in SearchEngine.ZONES
+        }
+        cls.ENGINE = SearchEngine(cls.CORPUS, cls.INDEX, substitutions={}, fallback=lambda x: [x])
+        cls.DOCUMENTS = {doc.document_id: doc for doc in cls.CORPUS.documents}
+
+    def _ids(self, results):
+        return [r if isinstance(r, str) else r.document_id for r in results]
+
+    def _reference(self, query: Query) -> Set[str]:
+        """
+        Filtre naïf de corpus.documents, indépendant des index et des tables du moteur :
+        chaque critère de la requête préparée est vérifié document par document.
+        """
+        utc = datetime.timezone.utc
+        aware = lambda date: date.replace(tzinfo=utc) if date and date.tzinfo is None else date
+        periods = [Query._parse_excluded_period_str(period, utc) for period in query.excluded_date_periods]
+        flags = {
+            "has_image": lambda doc: any(img.url for img in doc.images),
+            "has_contact": lambda doc: bool(doc.contact and doc.contact.strip()),
+            "has_auteur": lambda doc: bool(doc.auteur and doc.auteur.strip()),
+            "has_legende": lambda doc: any(img.legende and img.legende.strip() for img in doc.images),
+        }
+
+        def contains(tokens, terms, operator):
+            operator = operator or "AND"
+            return (all if operator == "AND" else any)(term in tokens for term in terms)
+
+        expected = set()
+        for doc in self.CORPUS.documents:
+            texte, titre = doc.tokens.get("texte", {}), doc.tokens.get("titre", {})
+            rubrique = (doc.rubrique or "").lower()
+            date = aware(doc.date)
+            if query.content_terms and not contains(texte, query.content_terms, query.content_operator):
+                continue
+            if query.title_terms and not contains(titre, query.title_terms, query.title_operator):
+                continue
+            if query.rubric_terms:
+                operator = query.rubric_operator or ("OR" if len(query.rubric_terms) > 1 else "AND")
+                match = any if operator == "OR" else all
+                if not doc.rubrique or not match(term.lower() in rubrique for term in query.rubric_terms):
+                    continue
+            if any(expression.split() and all(word.lower() in texte for word in expression.split())
+                   for expression in query.negated_content_terms):
+                continue
+            if doc.rubrique and any(term.lower() in rubrique for term in query.negated_rubric_terms):
+                continue
+            if not all(has_flag(doc) for flag, has_flag in flags.items() if getattr(query, flag)):
+                continue
+            if query.date_start and (not date or date < aware(query.date_start)):
+                continue
+            if query.date_end and (not date or date > aware(query.date_end)):
+                continue
+            if date and any(period and period[0] <= date <= period[1] for period in periods):
+                continue
+            expected.add(doc.document_id)
+        return expected
+
+    def test_resultats_identiques(self):
+        queries = [Query.build(query_str) for query_str in QUERIES] + [
+            Query(content_terms=["recherche"], negated_content_terms=["centrale paris", "cnrs"]),
+            Query(content_terms=["chercheurs", "innovation"], content_operator="OR", negated_rubric_terms=["focus"]),
+            Query(title_terms=["énergie", "climat"], title_operator="OR", has_image=True),
+            Query(rubric_terms=["actualités", "innovations"], rubric_operator="AND"),
+            Query(date_start="2012-01-01", excluded_date_periods=["2012-06", "2013-01-01/2013-03-31"]),
+            Query(excluded_date_periods=["2012"], has_contact=True),
+            Query(content_terms=["paris"], has_auteur=True, has_legende=True, date_end="2013-12-31"),
+        ]
+        for query in queries:
+            with self.subTest(query=query.model_dump(exclude_defaults=True)):
+                query = self.ENGINE.prepare(query)
+                expected = self._reference(query)
+                if query.target_info == "rubriques":
+                    rubriques = {self.DOCUMENTS[doc_id].rubrique for doc_id in expected} - {None, ""}
+                    self.assertEqual(self.ENGINE.search(query, prepared=True), sorted(rubriques))
+                    query = query.model_copy(update={"target_info": "articles"})
+                actual = self.ENGINE.search(query, prepared=True)
+                self.assertSetEqual(set(self._ids(actual)), expected)
+                self.assertSetEqual(set(self._ids(query.search(self.DOCUMENTS, index=self.INDEX))), expected)
+        self.assertTrue(any(self._reference(self.ENGINE.prepare(query)) for query in queries))
+
+    def test_resultats_tries_par_date(self):
+        results = self.ENGINE.search("Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin")
+        dates = [doc.date for doc in results]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_numeros_dans_l_ordre_chronologique(self):
+        tables = self.ENGINE.tables
+        documents = tables.documents_of(tables.all_documents)
+        self.assertTrue(all(doc.date is None for doc in documents[:tables.dated_offset]))
+        dates = [doc.date for doc in documents[tables.dated_offset:]]
+        self.assertEqual(dates, sorted(dates))
+
+        query_str = "articles parlant de innovation"
+        hits = self.ENGINE.hits(query_str, ascending=True)
+        dates = [hit.document.date for hit in hits if hit.document.date]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(len(hits), len(self.ENGINE.search(query_str)))
+
+    def test_pagination(self):
+        query_str = "Je voudrais tous les bulletins écrits entre 2012 et 2013 mais pas au mois de juin"
+        expected = self._ids(self.ENGINE.search(query_str))
+        pages = []
+        for offset in range(0, len(expected), 7):
+            hits = self.ENGINE.hits(query_str, offset=offset, limit=7)
+            self.assertEqual(hits.total, len(expected))
+            pages.extend(hit.document_id for hit in hits)
+        self.assertEqual(pages, expected)
+        self.assertEqual(self._ids(self.ENGINE.search(query_str, offset=5, limit=3)), expected[5:8])
+
+        # Triés par date, seuls les documents de la page sont notés : mêmes scores que le calcul complet
+        query = self.ENGINE.prepare(Query.build("articles avec des images parlant de énergie"))
+        full = self.ENGINE.hits(query, prepared=True, order_by="pertinence")
+        scores = {hit.document_id: hit.score for hit in full}
+        page = self.ENGINE.hits(query, prepared=True, offset=2, limit=5)
+        self.assertEqual(len(page), 5)
+        for hit in page:
+            self.assertAlmostEqual(hit.score, scores[hit.document_id])
+        count = self.ENGINE.hits(query, prepared=True, limit=0)
+        self.assertEqual((len(count), count.total), (0, len(full)))
+
+    def test_tri_par_pertinence(self):
+        query_str = "articles avec des images parlant de énergie"
+        hits = self.ENGINE.hits(query_str, order_by="pertinence")
+        scores = [hit.score for hit in hits]
+        self.assertTrue(all(score > 0 for score in scores))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertSetEqual({hit.document_id for hit in hits}, set(self._ids(self.ENGINE.search(query_str))))
+
+    def test_score_bm25(self):
+        scorer = self.ENGINE.scorer
+        doc = self.CORPUS["69540.htm"]
+        number = self.ENGINE.tables.doc_numbers[doc.document_id]
+        tf = doc.tokens["texte"]["énergie"]
+        norm = scorer.k1 * (1 - scorer.b + scorer.b * scorer.lengths["texte"][number] / scorer.lengths["texte"].mean())
+        expected = scorer.idf("texte", "énergie") * tf * (scorer.k1 + 1) / (tf + norm)
+        scores = scorer.scores("texte", ["énergie", "énergie"], self.ENGINE.tables.all_documents)
+        self.assertAlmostEqual(scores[number], expected)
+
+    def test_top_k(self):
+        # Requête disjonctive sur des termes fréquents : le top-k (tri partiel) doit égaler le tri complet
+        query = Query(content_terms=["de", "la", "recherche", "énergie"], content_operator="OR")
+        full = self.ENGINE.hits(query, prepared=True, order_by="pertinence")
+        for offset, limit in [(0, 5), (3, 10), (0, len(full) + 10)]:
+            with self.subTest(offset=offset, limit=limit):
+                page = self.ENGINE.hits(query, prepared=True, order_by="pertinence", offset=offset, limit=limit)
+                self.assertEqual([hit.document_id for hit in page], [hit.document_id for hit in full[offset:offset + limit]])
+                for hit, expected in zip(page, full[offset:offset + limit]):
+                    self.assertAlmostEqual(hit.score, expected.score)
+
+        # Égalités à la limite du top-k : départagées par l'ordre des candidats, comme le tri stable
+        scores, numbers = numpy.array([1.0, 3.0, 2.0, 3.0, 2.0, 2.0]), numpy.array([5, 4, 3, 2, 1, 0])
+        self.assertEqual(BM25.top_k(scores, numbers, 3).tolist(), [3, 1, 5])
+        self.assertEqual(BM25.top_k(scores, numbers, 10).tolist(), numbers[numpy.argsort(-scores[numbers], kind="stable")].tolist())
+
+        # MaxScore : le terme de faible contribution maximale n'est lu que pour les documents du terme fort
+        scorer, size = self.ENGINE.scorer, len(self.ENGINE.tables)
+        strong = (numpy.arange(10), numpy.arange(10, 0, -1, dtype=numpy.float64), 10.0)
+        weak = (numpy.arange(size), numpy.full(size, 0.5), 0.5)
+        numbers = numpy.arange(size)[::-1]
+        calls = []
+        scores_of = scorer.scores_of
+        scorer.scores_of = lambda impacts, documents: calls.append(documents) or scores_of(impacts, documents)
+        try:
+            top, top_scores = scorer.max_score([weak, strong], numbers, 3)
+        finally:
+            del scorer.scores_of
+        self.assertEqual((top.tolist(), top_scores.tolist()), ([0, 1, 2], [10.5, 9.5, 8.5]))
+        self.assertTrue(calls and set(calls[0].tolist()) <= set(range(10)))
+        full = scorer.accumulate([weak, strong], self.ENGINE.tables.all_documents)
+        for k in [1, 3, 15, size + 1]:
+            top, top_scores = scorer.max_score([weak, strong], numbers, k)
+            self.assertEqual(top.tolist(), BM25.top_k(full, numbers, k).tolist())
+
+    def test_multi_champs(self):
+        engine = SearchEngine(self.CORPUS, self.INDEX, substitutions={}, fallback=lambda x: [x], multi_field=True)
+        # Un terme présent dans le titre (ou une légende) mais pas dans le texte du document
+        outside_text = lambda doc: (set(doc.tokens["titre"]) | set(doc.tokens["legendes"])) - set(doc.tokens["texte"])
+        doc = next(doc for doc in self.CORPUS.documents if outside_text(doc))
+        term = sorted(outside_text(doc))[0]
+        query = Query(content_terms=[term])
+        self.assertNotIn(doc.document_id, self._ids(self.ENGINE.search(query, prepared=True)))
+        hits = engine.hits(query, prepared=True, order_by="pertinence")
+        self.assertIn(doc.document_id, [hit.document_id for hit in hits])
+        self.assertTrue(all(hit.score > 0 for hit in hits))
+
+        # Les termes exclus restent cherchés dans le texte seulement
+        negated = Query(content_terms=[term], negated_content_terms=[term])
+        self.assertIn(doc.document_id, self._ids(engine.search(negated, prepared=True)))
+
+        query_str = "articles parlant de énergie"
+        self.assertLessEqual(set(self._ids(self.ENGINE.search(query_str))), set(self._ids(engine.search(query_str))))
+
+    def test_documents_similaires(self):
+        statistics = self.CORPUS.statistics()
+        matrix = statistics.matrix
+        source = self.CORPUS.documents[5].document_id
+
+        # Similarité cosinus calculée par un parcours complet, pour comparaison
+        vectors = {}
+        for i, doc_id in enumerate(matrix.document_ids):
+            start, end = matrix.indptr[i], matrix.indptr[i + 1]
+            vector = {
+                column: count * statistics.inverse_document_frequencies[column]
+                for column, count in zip(matrix.indices[start:end], matrix.data[start:end])
+            }
+            norm = sum(value ** 2 for value in vector.values()) ** 0.5 or 1.0
+            vectors[doc_id] = {column: value / norm for column, value in vector.items()}
+        expected = sorted(
+            ((doc_id, sum(value * vectors[source].get(column, 0.0) for column, value in vector.items()))
+             for doc_id, vector in vectors.items() if doc_id != source),
+            key=lambda pair: -pair[1],
+        )[:5]
+
+        hits = self.ENGINE.similar(source, k=5)
+        self.assertEqual([hit.document_id for hit in hits], [doc_id for doc_id, _ in expected])
+        for hit, (_, score) in zip(hits, expected):
+            self.assertAlmostEqual(hit.score, score)
+        cached = self.ENGINE.similarity.similar(source, 5)
+        cached.clear()  # Le résultat en cache n'est pas partagé avec l'appelant
+        self.assertEqual(self.ENGINE.similarity.similar(source, 5), [(hit.document_id, hit.score) for hit in hits])
+        with self.assertRaises(KeyError):
+            self.ENGINE.similarity.similar("inconnu.htm")
+
+    def test_recherche_semantique(self):
+        query = Query(content_terms=["santé"])
+        hits = self.ENGINE.semantic_hits(query, prepared=True, k=20)
+        self.assertEqual(len(hits), 20)
+        scores = [hit.score for hit in hits]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # L'espace latent retrouve aussi des articles qui ne contiennent pas le terme
+        words = lambda doc: {word for zone in doc.tokens.values() for word in zone}
+        self.assertTrue(any("santé" not in words(hit.document) for hit in hits))
+        self.assertEqual(self.ENGINE.semantic_hits(Query(content_terms=["inconnu"]), prepared=True), [])
+
+        with tempfile.TemporaryDirectory() as folder:
+            self.ENGINE.semantic.save(folder)
+            loaded = LatentSemanticIndex.load(folder)
+            self.assertIsInstance(loaded.document_embeddings, numpy.memmap)
+            self.assertEqual(loaded.search(["santé"], 20), self.ENGINE.semantic.search(["santé"], 20))
+            del loaded
+
+    def test_plus_proches_voisins_approches(self):
+        semantic = self.ENGINE.semantic
+        vectors = semantic.document_embeddings
+        neighbors = NearestNeighborsIndex.build(vectors)
+        # Rappel mesuré par rapport à la recherche exacte, les documents servant de requêtes
+        self.assertGreaterEqual(neighbors.recall(vectors[:50], k=10), 0.8)
+        self.assertEqual(neighbors.recall(vectors[:50], k=10, n_probe=neighbors.n_lists, rerank=len(vectors)), 1.0)
+
+        index = LatentSemanticIndex(
+            semantic.document_ids, semantic.vocabulary, semantic.inverse_document_frequencies,
+            semantic.term_components, vectors,
+        )
+        index.index_neighbors()
+        approximate = index.search(["santé"], 10)
+        self.assertEqual(len(approximate), 10)
+        self.assertEqual(index.search(["santé"], 10, exact=True), semantic.search(["santé"], 10))
+        with tempfile.TemporaryDirectory() as folder:
+            index.save(folder)
+            loaded = LatentSemanticIndex.load(folder)
+            self.assertIsNotNone(loaded.neighbors)
+            self.assertEqual(loaded.search(["santé"], 10), approximate)
+            del loaded
+
+    def test_quasi_doublons(self):
+        # Copies légèrement modifiées de quelques documents, comme un article réimprimé dans un autre numéro
+        documents = list(self.CORPUS.documents)
+        originals = documents[:50:10]
+        for i, original in enumerate(originals):
+            copy = original.model_copy(deep=True)
+            copy.fichier = f"copie{i}.htm"
+            words = copy.texte.split()
+            words[::40] = ["modifié"] * len(words[::40])
+            copy.texte = " ".join(words)
+            copy.clear_cache()
+            documents.append(copy)
+        corpus = Corpus(documents=documents)
+        duplicates = DuplicateIndex(corpus)
+        pairs = {(first, second) for first, second, _ in duplicates.duplicates()}
+        self.assertSetEqual(pairs, {(doc.document_id, f"copie{i}.htm") for i, doc in enumerate(originals)})
+        self.assertEqual(len(duplicates.group_members()), len(originals))
+
+        engine = SearchEngine(corpus, self.INDEX, substitutions={}, fallback=lambda x: [x])
+        engine.duplicates = duplicates
+        ids = [doc.document_id for doc in originals] + ["copie0.htm", "copie1.htm", documents[7].document_id]
+        self.assertEqual(duplicates.collapse(ids), ids[:5] + ids[7:])
+        query_str = "articles parlant de recherche"
+        hits = engine.hits(query_str, collapse_duplicates=True, limit=5)
+        collapsed = duplicates.collapse(engine.hits(query_str))
+        self.assertEqual(hits.total, len(collapsed))
+        self.assertEqual([hit.document_id for hit in hits], [hit.document_id for hit in collapsed[:5]])
+
+    def test_termes_anti_dictionnaire(self):
+        # Index construit par l'Analyzer : les mots de l'anti-dictionnaire ne sont pas indexés,
+        # et sont retirés des requêtes par la même chaîne
+        analyzer = Analyzer(stopwords=["les", "des", "de", "l"])
+        index = {zone: analyzer.inverted_index(self.CORPUS.documents, zones=[zone]) for zone in SearchEngine.ZONES}
+        engine = SearchEngine(self.CORPUS, index, substitutions={}, fallback=lambda x: [x], analyzer=analyzer)
+        expected = self._ids(engine.search(Query(content_terms=["recherche"])))
+        self.assertTrue(expected)
+        self.assertEqual(engine.prepare(Query(content_terms=["recherche", "Les"])).content_terms, ["recherche"])
+        self.assertEqual(self._ids(engine.search(Query(content_terms=["recherche", "les"]))), expected)
+        self.assertTrue(engine.search(Query(content_terms=["énergie", "des"])))
+        self.assertEqual(engine.prepare(Query(content_terms=["l'énergie"])).content_terms, ["énergie"])
+
+        # Une requête dont tous les termes sont dans l'anti-dictionnaire ne renvoie rien, et pas tout le corpus
+        for query in [Query(content_terms=["les", "des"]), Query(title_terms=["de"]), Query(content_terms=["les"], rubric_terms=["focus"])]:
+            with self.subTest(query=query.model_dump(exclude_defaults=True)):
+                self.assertEqual(engine.search(query), [])
+                self.assertEqual(len(engine.hits(query, order_by="pertinence", limit=5)), 0)
+        self.assertEqual(engine.prepare(Query(negated_content_terms=["les"])).negated_content_terms, [])
+
+        # BM25 compte les mêmes tokens que l'index : mêmes listes de documents, donc mêmes DF
+        scorer, doc_ids = engine.scorer, engine.tables.doc_ids
+        for zone in SearchEngine.ZONES:
+            with self.subTest(zone=zone):
+                self.assertEqual(set(scorer.postings[zone]), set(index[zone]))
+                for term, documents in index[zone].items():
+                    self.assertEqual(sorted(doc_ids[number] for number in scorer.postings[zone][term][0]), sorted(documents))
+                    self.assertEqual(scorer.document_frequency(zone, term), len(documents))
+        hits = engine.hits(Query(content_terms=["recherche"]), order_by="pertinence")
+        self.assertTrue(all(hit.score > 0 for hit in hits))
+
+        # L'index sémantique est construit dans le même vocabulaire que les index inversés
+        counts = LatentSemanticIndex.counts(self.CORPUS, zones=SearchEngine.ZONES, analyzer=analyzer)
+        self.assertFalse(any("les" in tokens for tokens in counts.values()))
+        self.assertEqual(set().union(*counts.values()), set().union(*(index[zone] for zone in SearchEngine.ZONES)))
+
+    def test_standardisation_requetes(self):
+        # Même standardisation qu'à l'indexation : les tirets et les apostrophes séparent les mots
+        self.assertEqual(SearchEngine.standardize("les Etats-Unis d’Amérique"), "les etats unis d amérique")
+        self.assertEqual(Analyzer().document_tokens(Document(fichier="a.htm", texte="États-Unis d’Amérique"))["texte"],
+                         Document(fichier="a.htm", texte="États-Unis d’Amérique").tokens["texte"])
+        engine = SearchEngine(self.CORPUS, self.INDEX, substitutions={"santé": "santé"}, fallback=lambda x: [x], correction=False)
+        self.assertEqual(engine.terms("Etats-Unis"), ["etats", "unis"])
+        self.assertEqual(engine.terms("aujourd’hui"), ["aujourd", "hui"])
+        self.assertEqual(SearchEngine(self.CORPUS, self.INDEX, substitutions={"etats unis": "usa"}).terms("Etats-Unis"), ["usa"])
+        query = engine.prepare(Query(content_terms=["états-unis"], negated_content_terms=["centre-ville"]))
+        self.assertEqual((query.content_terms, query.negated_content_terms), (["états", "unis"], ["centre ville"]))
+        self.assertSetEqual(
+            set(self._ids(engine.search(Query(content_terms=["états-unis"])))),
+            set(self._ids(engine.search(Query(content_terms=["états", "unis"])))),
+        )
+        self.assertEqual(engine.normalize("santte"), "santte")  # Pas de correction orthographique
+        self.assertEqual(SearchEngine(self.CORPUS, self.INDEX, substitutions={"santé": "santé"}, fallback=lambda x: [x]).normalize("santte"), "santé")
+
+    def test_attributs_documents(self):
+        # Les demandes de contact, d'auteur ou d'image légendée sont reconnues par QueryParser
+        for query_str, flag in [
+            ("articles sur l'énergie avec des images légendées", "has_legende"),
+            ("articles sur l'énergie avec des coordonnées", "has_contact"),
+            ("articles avec un auteur qui parlent d'énergie", "has_auteur"),
+        ]:
+            with self.subTest(query=query_str):
+                query = Query.build(query_str)
+                self.assertEqual(query.content_terms, ["énergie"])
+                self.assertEqual(
+                    {name for name in LookupTables.FLAGS if getattr(query, name)}, {flag}
+                )
+                hits = self.ENGINE.search(query_str)
+                self.assertTrue(all(LookupTables.FLAGS[flag](self.DOCUMENTS[doc_id]) for doc_id in self._ids(hits)))
+        self.assertFalse(Query.build("articles avec des images sur l'énergie").has_legende)
+
+    def test_corpus_getitem(self):
+        doc = self.CORPUS.documents[10]
+        self.assertIs(self.CORPUS[doc.document_id], doc)
+        self.assertIn(doc.document_id, self.CORPUS)
+        with self.assertRaises(IndexError):
+            self.CORPUS["inconnu.htm"]
+
+        # Un identifiant absent d'une table à jour ne la reconstruit pas ; un ajout ou un renommage la rend obsolète
+        corpus = Corpus(documents=[doc.model_copy(deep=True) for doc in self.CORPUS.documents[:20]])
+        corpus.clear_cache()
+        self.assertIn(corpus.documents[3].document_id, corpus)
+        positions = corpus._positions
+        self.assertNotIn("inconnu.htm", corpus)
+        self.assertIs(corpus._positions, positions)
+        corpus.documents.append(Document(fichier="ajout.htm"))
+        self.assertEqual(corpus.get("ajout.htm"), corpus.documents[-1])
+        corpus.documents[0].fichier = "renomme.htm"
+        self.assertIs(corpus["renomme.htm"], corpus.documents[0])
+        self.assertEqual(list(corpus.keys())[-1], "ajout.htm")
+
+        # Un document remplacé en place, sans changer la taille de la liste
+        replaced = corpus.documents[1].document_id
+        corpus.documents[1] = Document(fichier="remplace.htm")
+        self.assertIn("remplace.htm", corpus)
+        self.assertIs(corpus.get("remplace.htm"), corpus.documents[1])
+        self.assertNotIn(replaced, corpus)
+        corpus.documents[2:4] = [Document(fichier="tranche.htm")]
+        self.assertEqual(corpus["tranche.htm"], corpus.documents[2])
+        corpus.documents = [Document(fichier="nouveau.htm")]
+        self.assertEqual((list(corpus.keys()), "remplace.htm" in corpus), (["nouveau.htm"], False))
+        # Un autre document renommé hors du corpus ne rend pas sa table obsolète
+        positions = corpus._positions
+        Document(fichier="ailleurs.htm").fichier = "autre.htm"
+        self.assertNotIn("autre.htm", corpus)
+        self.assertIs(corpus._positions, positions)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
@@ -0,0 +1,175 @@
+import unittest
+import re, os, tempfile, weakref, gc
+import pandas
+from index.transactions.base.substitution_table import SubstitutionTable
+from index.transactions.base.normalization_cache import NormalizationCache
+from index.transactions.corpus import Corpus
+from index.transactions.document import Document, Image
+from index.transactions.analyzer import Analyzer
+
+SUBSTITUTIONS = pandas.DataFrame({
+    0: ["chercheurs", "Paris", "etats", "etats unis", "le", "grandes écoles"],
+    1: ["chercheur", "paris", "état", "usa", "", "grande école"],
+})
+
+
+class TestSubstitutions(unittest.TestCase):
+    """
+    Vérifie le moteur de substitution en un seul passage (SubstitutionTable),
+    qui remplace l'alternance d'expressions régulières de apply_substitutions.
+    """
+
+    def test_mots(self):
+        table = SubstitutionTable.from_dataframe(SUBSTITUTIONS)
+        self.assertEqual(table.apply("Les Chercheurs de PARIS, le 3 mars."), "Les chercheur de paris,  3 mars.")
+        self.assertEqual(table.apply("lecture parisienne"), "lecture parisienne")  # Mots entiers seulement
+        self.assertEqual(table.apply(""), "")
+
+    def test_expressions(self):
+        table = SubstitutionTable.from_dataframe(SUBSTITUTIONS)
+        # La plus longue clé l'emporte, le texte entre les mots de la clé doit être le même
+        self.assertEqual(table.apply("aux etats unis et aux etats  unis"), "aux usa et aux état  unis")
+        self.assertEqual(table.apply("Les grandes écoles, les grandes villes"), "Les grande école, les grandes villes")
+        self.assertEqual(table("etats"), "état")
+
+    def test_ponctuation(self):
+        # Les clés ponctuées sont comparées sur tout leur texte, sans écraser la clé sans ponctuation
+        table = SubstitutionTable({"l'": "", "l": "L", "aujourd'": "aujourd "})
+        self.assertEqual(table.apply("l'école"), "école")
+        self.assertEqual(table.apply("L'École et l école"), "École et L école")
+        self.assertEqual(table.apply("l' école"), "L' école")  # \b après l'apostrophe : un mot doit suivre
+        self.assertEqual(table.apply("aujourd'hui"), "aujourd hui")
+
+    def test_corpus(self):
+        corpus = Corpus(documents=[
+            Document(fichier="a.htm", titre="Etats Unis", texte="Le chercheurs de Paris", images=[Image(legende="le labo")]),
+        ])
+        corpus.apply_substitutions(["titre", "texte", "images.legende"], SUBSTITUTIONS)
+        document = corpus.documents[0]
+        self.assertEqual((document.titre, document.texte, document.images[0].legende), ("usa", " chercheur de paris", " labo"))
+        self.assertEqual(Corpus.substitution("Les chercheurs", SUBSTITUTIONS), "Les chercheur")
+
+    def test_parallele(self):
+        documents = [
+            Document(fichier=f"{i}.htm", titre="Etats Unis", texte=f"Les chercheurs de Paris {i}") for i in range(6)
+        ] + [Document(fichier="autre.htm", texte="rien à remplacer")]
+        serial, parallel = Corpus(documents=documents), Corpus(documents=[doc.model_copy(deep=True) for doc in documents])
+        serial.apply_substitutions(["titre", "texte"], SUBSTITUTIONS)
+        untouched = parallel.documents[-1].tokens
+        parallel.apply_substitutions(["titre", "texte"], SubstitutionTable.from_dataframe(SUBSTITUTIONS), processes=2)
+        self.assertEqual([doc.texte for doc in parallel.documents], [doc.texte for doc in serial.documents])
+        self.assertEqual(parallel.documents[0].tokens["titre"], {"usa": 1})
+        self.assertIs(parallel.documents[-1].tokens, untouched)  # Seuls les documents modifiés sont invalidés
+
+        # Une lambda ne peut pas être envoyée aux processus : le filtre est appliqué séquentiellement
+        parallel.apply_filter(["texte"], lambda texte: texte.upper(), processes=2)
+        self.assertEqual(parallel.documents[-1].texte, "RIEN À REMPLACER")
+
+    def test_vue(self):
+        corpus = Corpus(documents=[
+            Document(fichier="a.htm", titre="Etats Unis", texte="Les chercheurs", images=[Image(legende="Le labo"), Image(legende="x")]),
+        ])
+        view = corpus.view()
+        original, copy = corpus.documents[0], view.documents[0]
+        self.assertIs(copy.texte, original.texte)  # Champs partagés tant qu'ils ne sont pas modifiés
+        self.assertIs(copy.images, original.images)
+
+        view.apply_filter(["texte", "images.legende"], str.upper)
+        self.assertEqual((copy.texte, copy.images[0].legende), ("LES CHERCHEURS", "LE LABO"))
+        self.assertEqual((original.texte, original.images[0].legende), ("Les chercheurs", "Le labo"))
+        self.assertIs(copy.titre, original.titre)
+        self.assertEqual(copy.tokens["texte"], {"les": 1, "chercheurs": 1})
+        self.assertEqual(original.tokens["texte"], {"les": 1, "chercheurs": 1})
+        self.assertIsNot(copy.tokens, original.tokens)
+
+        view.apply_substitutions(["titre"], SUBSTITUTIONS)
+        self.assertEqual((copy.titre, original.titre), ("usa", "Etats Unis"))
+
+    def test_analyseur(self):
+        documents = [
+            Document(fichier="a.htm", titre="L'énergie des États-Unis", texte="Le soleil, les chercheurs et le vent."),
+            Document(fichier="b.htm", texte="Les chercheurs de l'école", images=[Image(legende="Le solaire")]),
+        ]
+        anti_dictionnaire = pandas.DataFrame({0: ["le", "les", "l", "de"], 1: ["", "", "", ""]})
+        replacements = {"chercheurs": "chercheur", "énergie": "énergie", "solaire": "soleil"}
+        analyzer = Analyzer(stopwords=anti_dictionnaire[0], replacements=replacements)
+
+        # Même résultat que les réécritures successives du corpus suivies de Document.tokens
+        corpus = Corpus(documents=[doc.model_copy(deep=True) for doc in documents])
+        standardize = lambda texte: re.sub(r"[^\w\s]", "", re.sub(r"['’-]", " ", texte.strip().lower()))
+        corpus.apply_filter(["texte", "titre", "images.legende"], standardize)
+        corpus.apply_substitutions(["texte", "titre", "images.legende"], anti_dictionnaire)
+        for original, rewritten in zip(documents, corpus.documents):
+            expected = {}
+            for zone, tokens in rewritten.tokens.items():
+                expected[zone] = {}
+                for token, count in tokens.items():
+                    token = replacements.get(token, token)
+                    expected[zone][token] = expected[zone].get(token, 0) + count
+            self.assertEqual(analyzer.document_tokens(original), expected)
+        self.assertEqual(documents[0].texte, "Le soleil, les chercheurs et le vent.")  # Texte d'origine intact
+
+        index = analyzer.inverted_index(documents, zones=["texte", "legendes"])
+        self.assertEqual(index["chercheur"], ["a.htm", "b.htm"])
+        self.assertEqual(index["soleil"], ["a.htm", "b.htm"])
+        self.assertNotIn("le", index)
+        self.assertEqual(analyzer.term("Chercheurs"), "chercheur")
+        self.assertIsNone(analyzer.term("Les"))
+
+    def test_cache_persistant(self):
+        calls = []
+        def normalize(word):
+            calls.append(word)
+            return [word[:4]] if word.isalpha() else []
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "lemmatized_cache.tsv")
+            cache = NormalizationCache(path, normalize, flush_every=2)
+            self.assertEqual(cache.get("chercheurs"), "cher")
+            self.assertEqual(cache("chercheurs"), ["cher"])
+            self.assertFalse(os.path.exists(path))  # Écriture différée jusqu'au lot suivant
+            self.assertEqual(cache.get("123"), "123")
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(calls, ["chercheurs", "123"])
+
+            # Un autre processus (ici une autre instance) relit le fichier sans recalculer
+            other = NormalizationCache(path, normalize)
+            self.assertEqual(other.get("chercheurs"), "cher")
+            other.update([("écoles", "école")])
+            cache.get("soleil")
+            cache.get("vent")  # Le fichier remplacé par l'autre instance est relu
+            self.assertEqual((cache.get("chercheurs"), cache.get("écoles")), ("cher", "école"))
+            self.assertEqual(calls, ["chercheurs", "123", "soleil", "vent"])
+
+            cache.flush()
+            self.assertEqual(
+                pandas.read_csv(path, sep="\t", header=None, na_filter=False).values.tolist(),
+                [["123", "123"], ["chercheurs", "cher"], ["soleil", "sole"], ["vent", "vent"], ["écoles", "école"]],
+            )
+            self.assertEqual([file for file in os.listdir(folder) if file.endswith(".tmp")], [])
+
+            # Normalisation par lots des seuls mots absents du cache (par exemple spacy_lemma_pairs)
+            batches = []
+            def normalize_many(words):
+                batches.append(words)
+                return [(word, word.upper()) for word in words if word != "rien"]
+            mapping = other.get_many(["vent", "mer", "mer", "rien"], normalize_many)
+            self.assertEqual(mapping, {"vent": "vent", "mer": "MER", "rien": "rien"})
+            self.assertEqual(batches, [["mer", "rien"]])
+            self.assertEqual(NormalizationCache(path, normalize).get("mer"), "MER")
+
+            # Sauvegarde de chaque nouveau mot (SearchEngine.from_folder) : rien n'est perdu si le processus est tué
+            immediate = NormalizationCache(path, normalize, flush_every=1)
+            immediate.get("marée")
+            self.assertEqual(NormalizationCache(path, normalize).get("marée"), "maré")
+            self.assertEqual(calls[-1], "marée")
+
+            # Le hook de fin de processus ne garde pas le cache en vie
+            reference = weakref.ref(cache)
+            del cache
+            gc.collect()
+            self.assertIsNone(reference())
+
+
+if __name__ == '__main__':
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)